@@ -0,0 +1,97 @@
+"""
+Per-market alert lookups on a SpreadAlert table of --rows alerts, with and
+without the (market_id, alert_threshold) index. Runs on a throwaway test
+database of the configured backend.
+
+    python -m benchmarks.alert_lookup [--rows 1000000] [--markets 200]
+"""
+import argparse
+import random
+import timeit
+
+from django.db import connection
+
+from spread.models import SpreadAlert
+
+from .payloads import market_ids
+
+
+def fill(rows: int, markets: list[str], batch_size: int = 50_000) -> None:
+    table = connection.ops.quote_name(SpreadAlert._meta.db_table)
+    sql = f"INSERT INTO {table} (market_id, alert_threshold) VALUES (%s, %s)"
+    with connection.cursor() as cursor:
+        for start in range(0, rows, batch_size):
+            cursor.executemany(
+                sql,
+                [
+                    (random.choice(markets), random.uniform(0.0, 1000.0))
+                    for _ in range(min(batch_size, rows - start))
+                ],
+            )
+
+
+def lookups(markets: list[str]) -> dict:
+    market_id = random.choice(markets)
+    low = random.uniform(0.0, 990.0)
+    return {
+        "market": SpreadAlert.objects.filter(market_id=market_id),
+        "market + threshold range": SpreadAlert.objects.filter(
+            market_id=market_id, alert_threshold__range=(low, low + 10.0)
+        ),
+    }
+
+
+def best_of(queryset_of, number: int) -> float:
+    def run():
+        list(queryset_of().values_list("pk", flat=True))
+
+    return min(timeit.repeat(run, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--markets", type=int, default=200)
+    args = parser.parse_args()
+
+    creation = connection.creation
+    old_name = creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        markets = market_ids(args.markets)
+        fill(args.rows, markets)
+        (index,) = [
+            index
+            for index in SpreadAlert._meta.indexes
+            if index.fields == ["market_id", "alert_threshold"]
+        ]
+        names = list(lookups(markets))
+        timings = {}
+        for indexed in (True, False):
+            if not indexed:
+                with connection.schema_editor() as editor:
+                    editor.remove_index(SpreadAlert, index)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"ANALYZE {connection.ops.quote_name(SpreadAlert._meta.db_table)}"
+                )
+            for name in names:
+                timings[name, indexed] = best_of(
+                    lambda: lookups(markets)[name], number=20
+                )
+            print(f"\n{'with' if indexed else 'without'} index:")
+            print(lookups(markets)["market + threshold range"].explain())
+    finally:
+        creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"\n{args.rows} alerts, {args.markets} markets")
+    print(f"{'lookup':<28}{'indexed':>12}{'full scan':>12}{'speedup':>10}")
+    for name in names:
+        indexed, scan = timings[name, True], timings[name, False]
+        print(
+            f"{name:<28}{indexed * 1e3:>10.3f}ms{scan * 1e3:>10.3f}ms"
+            f"{scan / indexed:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
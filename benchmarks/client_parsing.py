@@ -0,0 +1,82 @@
+"""
+Compares the BudaAPIClient response parsing paths on synthetic bodies:
+`json` (what `response.json()` did: decode to str, json.loads, walk the
+dicts) against the current one (orjson on the raw bytes, and order book
+levels read straight into float64 buffers).
+
+    python -m benchmarks.client_parsing [--levels 10000] [--markets 50]
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+
+import orjson
+
+from spread.clients.buda.types import Market
+from spread.clients.buda.types import OrderBook
+from spread.clients.buda.types import Ticker
+
+from .payloads import markets_body
+from .payloads import order_book_body
+from .payloads import tickers_body
+
+
+def best_of(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def peak_memory(function) -> int:
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--levels", type=int, default=10_000)
+    parser.add_argument("--markets", type=int, default=50)
+    args = parser.parse_args()
+
+    order_book = order_book_body(args.levels)
+    tickers = tickers_body(args.markets)
+    markets = markets_body(args.markets)
+
+    cases = {
+        f"order book ({args.levels} levels/side)": (
+            lambda: OrderBook.from_response(json.loads(order_book.decode())),
+            lambda: OrderBook.from_bytes(order_book),
+        ),
+        f"tickers ({args.markets})": (
+            lambda: [
+                Ticker.from_response(t) for t in json.loads(tickers.decode())["tickers"]
+            ],
+            lambda: [Ticker.from_response(t) for t in orjson.loads(tickers)["tickers"]],
+        ),
+        f"markets ({args.markets})": (
+            lambda: [
+                Market.from_response(m) for m in json.loads(markets.decode())["markets"]
+            ],
+            lambda: [Market.from_response(m) for m in orjson.loads(markets)["markets"]],
+        ),
+    }
+    print(
+        f"{'case':<32}{'json':>12}{'current':>12}{'speedup':>10}"
+        f"{'json peak':>12}{'current peak':>14}"
+    )
+    for name, (baseline, current) in cases.items():
+        assert baseline() == current()
+        before, after = best_of(baseline, 20), best_of(current, 20)
+        print(
+            f"{name:<32}{before * 1e3:>10.3f}ms{after * 1e3:>10.3f}ms"
+            f"{before / after:>9.1f}x"
+            f"{peak_memory(baseline) / 2**20:>9.2f}MiB"
+            f"{peak_memory(current) / 2**20:>11.2f}MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Local stand-in for the Buda API serving synthetic markets, tickers and
+order books with a configurable latency and error rate. Every call is
+counted per route and the counts are served at /_stats.
+
+    python -m benchmarks.fake_buda [--port 8001] [--markets 50]
+        [--levels 100] [--latency 0.05] [--jitter 0.02] [--error-rate 0]
+
+Point the API at it with BUDA_API_BASE_URL=http://127.0.0.1:8001/api/v2/
+"""
+import argparse
+import asyncio
+import random
+from collections import Counter
+
+import orjson
+from aiohttp import web
+
+from . import payloads
+
+
+class FakeBuda:
+    def __init__(
+        self,
+        markets: int = 50,
+        levels: int = 100,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+    ):
+        self.market_ids = payloads.market_ids(markets)
+        self.prices = {
+            market_id.lower(): 100.0 + i for i, market_id in enumerate(self.market_ids)
+        }
+        self.levels = levels
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = Counter()
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.degrade])
+        app.add_routes(
+            [
+                web.get("/api/v2/markets", self.markets),
+                web.get("/api/v2/markets/{market_id}", self.market),
+                web.get("/api/v2/markets/{market_id}/ticker", self.ticker),
+                web.get("/api/v2/markets/{market_id}/order_book", self.order_book),
+                web.get("/api/v2/tickers", self.tickers),
+                web.get("/_stats", self.stats),
+            ]
+        )
+        return app
+
+    @web.middleware
+    async def degrade(self, request: web.Request, handler):
+        if request.path == "/_stats":
+            return await handler(request)
+        resource = request.match_info.route.resource
+        self.calls[request.path if resource is None else resource.canonical] += 1
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if random.random() < self.error_rate:
+            return web.json_response({"message": "fake outage"}, status=503)
+        return await handler(request)
+
+    def _price(self, market_id: str) -> float:
+        # A small random walk around each market's price so spreads change
+        # between calls
+        return self.prices[market_id.lower()] * (1 + random.uniform(-0.001, 0.001))
+
+    def _market_id(self, request: web.Request) -> str:
+        market_id = request.match_info["market_id"].upper()
+        if market_id.lower() not in self.prices:
+            raise web.HTTPNotFound(
+                text='{"message": "Not found"}', content_type="application/json"
+            )
+        return market_id
+
+    @staticmethod
+    def _json(data: dict) -> web.Response:
+        return web.Response(body=orjson.dumps(data), content_type="application/json")
+
+    async def markets(self, request: web.Request) -> web.Response:
+        return self._json(
+            {"markets": [payloads.market(market_id) for market_id in self.market_ids]}
+        )
+
+    async def market(self, request: web.Request) -> web.Response:
+        market_id = self._market_id(request)
+        return self._json({"market": payloads.market(market_id)})
+
+    async def ticker(self, request: web.Request) -> web.Response:
+        market_id = self._market_id(request)
+        ticker = payloads.ticker(market_id, self._price(market_id))
+        return self._json({"ticker": ticker})
+
+    async def tickers(self, request: web.Request) -> web.Response:
+        tickers = [
+            payloads.ticker(market_id, self._price(market_id))
+            for market_id in self.market_ids
+        ]
+        return self._json({"tickers": tickers})
+
+    async def order_book(self, request: web.Request) -> web.Response:
+        market_id = self._market_id(request)
+        price = self._price(market_id)
+        order_book = payloads.order_book(market_id, self.levels, price)
+        return self._json({"order_book": order_book})
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return self._json(dict(self.calls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--markets", type=int, default=50)
+    parser.add_argument("--levels", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeBuda(
+        markets=args.markets,
+        levels=args.levels,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+    )
+    web.run_app(fake.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Load driver hitting every route of project/urls.py on a running API and
+reporting requests per second, p50/p99 latency and, against the fake Buda
+server, how many upstream calls the run took.
+
+    python -m benchmarks.fake_buda --latency 0.05 &
+    BUDA_API_BASE_URL=http://127.0.0.1:8001/api/v2/ \\
+        python manage.py runserver --noreload 8000 &
+    python -m benchmarks.load [--target http://127.0.0.1:8000]
+        [--buda http://127.0.0.1:8001] [--duration 10] [--concurrency 32]
+        [--markets 10] [--routes markets-spread ...] [--streams]
+
+Server-sent event routes are only hit with --streams, against an ASGI
+server with SPREAD_ASYNC_VIEWS=true (also set for this driver, as they are
+only routed then), and are timed until their first event.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import aiohttp
+import numpy as np
+from django.urls import reverse
+
+from .payloads import market_ids
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str
+    method: str
+    path: str
+    body: dict | None = None
+    stream: bool = False
+
+
+@dataclass
+class RouteStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+
+    def record(self, seconds: float, status: int | str) -> None:
+        self.latencies.append(seconds)
+        self.statuses[status] += 1
+
+    @property
+    def errors(self) -> int:
+        return sum(
+            count
+            for status, count in self.statuses.items()
+            if not isinstance(status, int) or status >= 400
+        )
+
+
+def build_routes(market_id: str, alert_ids: list[int], streams: bool) -> list[Route]:
+    market = {"pk": market_id}
+    alert = {"pk": random.choice(alert_ids)}
+    ids = "&".join(f"ids={alert_id}" for alert_id in alert_ids)
+    routes = [
+        Route("markets-list", "GET", reverse("markets-list")),
+        Route("markets-detail", "GET", reverse("markets-detail", kwargs=market)),
+        Route("markets-all-spreads", "GET", reverse("markets-all-spreads")),
+        Route("markets-spread", "GET", reverse("markets-spread", kwargs=market)),
+        Route(
+            "markets-order-book-spread",
+            "GET",
+            reverse("markets-order-book-spread", kwargs=market) + "?notional=1000",
+        ),
+        Route(
+            "markets-spread-history",
+            "GET",
+            reverse("markets-spread-history", kwargs=market),
+        ),
+        Route(
+            "spread-alerts-list",
+            "POST",
+            reverse("spread-alerts-list"),
+            body={"market_id": market_id, "alert_threshold": 1.0},
+        ),
+        Route(
+            "spread-alerts-detail", "GET", reverse("spread-alerts-detail", kwargs=alert)
+        ),
+        Route(
+            "spread-alerts-statuses",
+            "GET",
+            reverse("spread-alerts-statuses") + "?" + ids,
+        ),
+        Route("metrics", "GET", reverse("metrics")),
+        Route("schema", "GET", reverse("schema")),
+    ]
+    if streams:
+        routes += [
+            Route(
+                "markets-spread-stream",
+                "GET",
+                reverse("markets-spread-stream", kwargs=market),
+                stream=True,
+            ),
+            Route(
+                "spread-alerts-stream",
+                "GET",
+                reverse("spread-alerts-stream", kwargs=alert),
+                stream=True,
+            ),
+        ]
+    return routes
+
+
+async def create_alerts(
+    session: aiohttp.ClientSession, target: str, markets: list[str]
+) -> list[int]:
+    alert_ids = []
+    for market_id in markets:
+        async with session.post(
+            target + reverse("spread-alerts-list"),
+            json={"market_id": market_id, "alert_threshold": 1.0},
+        ) as response:
+            response.raise_for_status()
+            alert_ids.append((await response.json())["id"])
+    return alert_ids
+
+
+async def upstream_calls(session: aiohttp.ClientSession, buda: str | None) -> Counter:
+    if buda is None:
+        return Counter()
+    async with session.get(buda + "/_stats") as response:
+        return Counter(await response.json())
+
+
+async def send(session: aiohttp.ClientSession, target: str, route: Route) -> int | str:
+    try:
+        async with session.request(
+            route.method, target + route.path, json=route.body
+        ) as response:
+            if route.stream:
+                await response.content.readuntil(b"\n\n")
+            else:
+                await response.read()
+            return response.status
+    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+        return type(error).__name__
+
+
+async def worker(
+    session: aiohttp.ClientSession,
+    target: str,
+    schedule,
+    deadline: float,
+    stats: dict[str, RouteStats],
+) -> None:
+    while time.perf_counter() < deadline:
+        route = next(schedule)
+        start = time.perf_counter()
+        status = await send(session, target, route)
+        stats[route.name].record(time.perf_counter() - start, status)
+
+
+async def run(args) -> None:
+    timeout = aiohttp.ClientTimeout(total=30)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        markets = market_ids(args.markets)
+        alert_ids = await create_alerts(session, args.target, markets)
+        routes = [
+            route
+            for market_id in markets
+            for route in build_routes(market_id, alert_ids, args.streams)
+            if not args.routes or route.name in args.routes
+        ]
+        random.shuffle(routes)
+        schedule = itertools.cycle(routes)
+        stats = {route.name: RouteStats() for route in routes}
+
+        before = await upstream_calls(session, args.buda)
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *[
+                worker(session, args.target, schedule, deadline, stats)
+                for _ in range(args.concurrency)
+            ]
+        )
+        elapsed = time.perf_counter() - started
+        after = await upstream_calls(session, args.buda)
+
+    print(
+        f"{'route':<28}{'requests':>10}{'rps':>10}{'p50':>10}{'p99':>10}"
+        f"{'errors':>8}"
+    )
+    for name, route_stats in sorted(stats.items()):
+        latencies = np.array(route_stats.latencies) * 1e3
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0, 0)
+        print(
+            f"{name:<28}{len(latencies):>10}{len(latencies) / elapsed:>10.1f}"
+            f"{p50:>8.1f}ms{p99:>8.1f}ms{route_stats.errors:>8}"
+        )
+    total = sum(len(route_stats.latencies) for route_stats in stats.values())
+    print(f"{'total':<28}{total:>10}{total / elapsed:>10.1f}")
+
+    if args.buda is not None:
+        print(f"\n{'upstream route':<40}{'calls':>10}{'per request':>14}")
+        for route, calls in sorted((after - before).items()):
+            print(f"{route:<40}{calls:>10}{calls / max(total, 1):>14.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", default="http://127.0.0.1:8000")
+    parser.add_argument("--buda", help="fake Buda server to read call counts from")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--markets", type=int, default=10)
+    parser.add_argument(
+        "--routes", nargs="*", help="route names to hit, all by default"
+    )
+    parser.add_argument(
+        "--streams", action="store_true", help="also hit the server-sent event routes"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
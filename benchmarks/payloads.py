@@ -0,0 +1,65 @@
+"""
+Synthetic Buda API payloads shaped like the real ones, shared by the
+parsing benchmarks and the fake Buda server.
+"""
+import random
+
+import orjson
+
+
+def market_ids(markets: int) -> list[str]:
+    return [f"M{i}-CLP" for i in range(markets)]
+
+
+def market(market_id: str) -> dict:
+    base_currency = market_id.split("-")[0]
+    return {
+        "id": market_id,
+        "name": market_id.lower(),
+        "base_currency": base_currency,
+        "quote_currency": "CLP",
+        "minimum_order_amount": ["0.001", base_currency],
+        "taker_fee": "0.8",
+        "maker_fee": "0.4",
+        "max_orders_per_minute": 100,
+        "maker_discount_percentage": "0.0",
+        "taker_discount_percentage": "0.0",
+        "disabled": False,
+    }
+
+
+def ticker(market_id: str, price: float = 100.0) -> dict:
+    return {
+        "market_id": market_id,
+        "last_price": [f"{price:.2f}", "CLP"],
+        "min_ask": [f"{price * 1.01:.2f}", "CLP"],
+        "max_bid": [f"{price * 0.99:.2f}", "CLP"],
+        "volume": ["500.0", market_id.split("-")[0]],
+        "price_variation_24h": "0.05",
+        "price_variation_7d": "0.1",
+    }
+
+
+def order_book(market_id: str, levels: int, price: float = 50_000.0) -> dict:
+    asks = [[f"{price + i * 0.5:.2f}", f"{random.random():.8f}"] for i in range(levels)]
+    bids = [
+        [f"{price - 1 - i * 0.5:.2f}", f"{random.random():.8f}"] for i in range(levels)
+    ]
+    return {"asks": asks, "bids": bids, "market_id": market_id}
+
+
+def order_book_body(levels: int) -> bytes:
+    return orjson.dumps({"order_book": order_book("BTC-CLP", levels)})
+
+
+def tickers_body(markets: int) -> bytes:
+    tickers = [
+        ticker(market_id, 100 + i) for i, market_id in enumerate(market_ids(markets))
+    ]
+    return orjson.dumps({"tickers": tickers})
+
+
+def markets_body(markets: int) -> bytes:
+    return orjson.dumps(
+        {"markets": [market(market_id) for market_id in market_ids(markets)]}
+    )
@@ -0,0 +1,93 @@
+"""
+Micro-benchmarks of the response path after the upstream call: building
+MarketSpread/SpreadAlertTracking from tickers and rendering them and
+markets, through the DRF serializers and JSONRenderer against the
+precompiled FastJSONRenderer encoders.
+
+    python -m benchmarks.serialization [--markets 200]
+"""
+import argparse
+import timeit
+from datetime import datetime, timezone
+
+from rest_framework.renderers import JSONRenderer
+
+from spread.clients.buda.types import Market
+from spread.clients.buda.types import Ticker
+from spread.renderers import FastJSONRenderer
+from spread.serializers import MarketSerializer
+from spread.serializers import MarketSpreadDataSerializer
+from spread.serializers import SpreadAlertTrackingSerializer
+from spread.services.types import MarketSpread
+from spread.services.types import SpreadAlertStatus
+from spread.services.types import SpreadAlertTracking
+
+from . import payloads
+
+
+def best_of(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--markets", type=int, default=200)
+    args = parser.parse_args()
+
+    market_ids = payloads.market_ids(args.markets)
+    now = datetime.now(timezone.utc)
+    tickers = [
+        Ticker.from_response(payloads.ticker(market_id, 100 + i))
+        for i, market_id in enumerate(market_ids)
+    ]
+    markets = [
+        Market.from_response(payloads.market(market_id)) for market_id in market_ids
+    ]
+    spreads = [MarketSpread.from_ticker(ticker, now) for ticker in tickers]
+    trackings = [
+        SpreadAlertTracking(
+            alert_id=str(i),
+            market_id=spread.market_id,
+            threshold=1.0,
+            spread=spread.spread_amount,
+            status=SpreadAlertStatus.from_difference(spread.spread_amount, 1.0),
+        )
+        for i, spread in enumerate(spreads)
+    ]
+    drf, fast = JSONRenderer(), FastJSONRenderer()
+
+    cases = {
+        f"MarketSpread.from_ticker ({args.markets})": (
+            None,
+            lambda: [MarketSpread.from_ticker(ticker, now) for ticker in tickers],
+        ),
+        f"render spreads ({args.markets})": (
+            lambda: drf.render(MarketSpreadDataSerializer(spreads, many=True).data),
+            lambda: fast.render(spreads),
+        ),
+        f"render markets ({args.markets})": (
+            lambda: drf.render(MarketSerializer(markets, many=True).data),
+            lambda: fast.render(markets),
+        ),
+        f"render alert trackings ({args.markets})": (
+            lambda: drf.render(
+                SpreadAlertTrackingSerializer(trackings, many=True).data
+            ),
+            lambda: fast.render(trackings),
+        ),
+    }
+    print(f"{'case':<36}{'serializer':>12}{'current':>12}{'speedup':>10}")
+    for name, (baseline, current) in cases.items():
+        after = best_of(current, 20)
+        if baseline is None:
+            print(f"{name:<36}{'':>12}{after * 1e3:>10.3f}ms")
+            continue
+        before = best_of(baseline, 20)
+        print(
+            f"{name:<36}{before * 1e3:>10.3f}ms{after * 1e3:>10.3f}ms"
+            f"{before / after:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
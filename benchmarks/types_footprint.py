@@ -0,0 +1,199 @@
+"""
+Per-object memory and construction time of the client and service types,
+before (the previous plain dataclasses, copied below) and after (the
+current frozen slotted ones). Memory is the tracemalloc growth per
+instance while keeping N of them alive; construction time is the best of
+9 timeit runs.
+
+    python -m benchmarks.types_footprint [--count 10000]
+"""
+import argparse
+import gc
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from dataclasses import fields
+from datetime import datetime, timezone
+from typing import Any
+
+from spread.clients.buda.types import Market
+from spread.clients.buda.types import Order
+from spread.clients.buda.types import OrderBook
+from spread.clients.buda.types import Ticker
+from spread.services.types import MarketSpread
+from spread.services.types import SpreadAlertStatus
+from spread.services.types import SpreadAlertTracking
+
+
+@dataclass
+class PlainOrder:
+    price: float
+    amount: float
+
+
+@dataclass
+class PlainMoneyAmount:
+    amount: float
+    currency: str
+
+    def __post_init__(self):
+        self.amount = float(self.amount)
+
+
+@dataclass
+class PlainMarket:
+    id: str
+    name: str
+    base_currency: str
+    quote_currency: str
+    minimum_order_amount: PlainMoneyAmount
+    taker_fee: str
+    maker_fee: str
+    max_orders_per_minute: str
+    maker_discount_percentage: str
+    taker_discount_percentage: str
+    disabled: bool
+
+    @classmethod
+    def from_response(cls, response: dict[Any, Any]):
+        data = {k.name: response[k.name] for k in fields(cls)}
+        data["minimum_order_amount"] = PlainMoneyAmount(*data["minimum_order_amount"])
+        return cls(**data)
+
+
+@dataclass
+class PlainTicker:
+    market_id: str
+    last_price: PlainMoneyAmount
+    min_ask: PlainMoneyAmount
+    max_bid: PlainMoneyAmount
+    volume: PlainMoneyAmount
+    price_variation_24h: float
+    price_variation_7d: float
+
+    @classmethod
+    def from_response(cls, data: dict[Any, Any]):
+        return cls(
+            market_id=data["market_id"],
+            last_price=PlainMoneyAmount(*data["last_price"]),
+            min_ask=PlainMoneyAmount(*data["min_ask"]),
+            max_bid=PlainMoneyAmount(*data["max_bid"]),
+            volume=PlainMoneyAmount(*data["volume"]),
+            price_variation_24h=float(data["price_variation_24h"]),
+            price_variation_7d=float(data["price_variation_7d"]),
+        )
+
+
+@dataclass
+class PlainSpreadAlertTracking:
+    alert_id: str
+    market_id: str
+    threshold: float
+    spread: float
+    status: SpreadAlertStatus
+
+
+@dataclass
+class PlainMarketSpread:
+    market_id: str
+    spread_amount: float
+    updated_at: datetime | None = None
+
+    @classmethod
+    def from_ticker(cls, ticker, updated_at: datetime | None = None):
+        spread_amount = ticker.min_ask.amount - ticker.max_bid.amount
+        if spread_amount <= 0:
+            spread_amount = 0
+        return cls(ticker.market_id, spread_amount, updated_at)
+
+
+TICKER = {
+    "market_id": "BTC-CLP",
+    "last_price": ["100.0", "CLP"],
+    "min_ask": ["101.0", "CLP"],
+    "max_bid": ["99.0", "CLP"],
+    "volume": ["500.0", "BTC"],
+    "price_variation_24h": "0.05",
+    "price_variation_7d": "0.1",
+}
+MARKET = {
+    "id": "BTC-CLP",
+    "name": "btc-clp",
+    "base_currency": "BTC",
+    "quote_currency": "CLP",
+    "minimum_order_amount": ["0.001", "BTC"],
+    "taker_fee": "0.8",
+    "maker_fee": "0.4",
+    "max_orders_per_minute": "100",
+    "maker_discount_percentage": "0.0",
+    "taker_discount_percentage": "0.0",
+    "disabled": False,
+}
+NOW = datetime.now(timezone.utc)
+ORDER_BOOK = OrderBook.from_response(
+    {"order_book": {"asks": [["101.0", "1.5"]], "bids": [["99.0", "2.5"]]}}
+)
+TICKER_INSTANCE = Ticker.from_response(TICKER)
+PLAIN_TICKER_INSTANCE = PlainTicker.from_response(TICKER)
+ORDER_BOOK_LEVEL = ORDER_BOOK.asks.prices[0], ORDER_BOOK.asks.amounts[0]
+
+# name: (before, after)
+CASES = {
+    "Order": (
+        lambda: PlainOrder(float(ORDER_BOOK_LEVEL[0]), float(ORDER_BOOK_LEVEL[1])),
+        lambda: Order(float(ORDER_BOOK_LEVEL[0]), float(ORDER_BOOK_LEVEL[1])),
+    ),
+    "Ticker.from_response": (
+        lambda: PlainTicker.from_response(TICKER),
+        lambda: Ticker.from_response(TICKER),
+    ),
+    "Market.from_response": (
+        lambda: PlainMarket.from_response(MARKET),
+        lambda: Market.from_response(MARKET),
+    ),
+    "MarketSpread.from_ticker": (
+        lambda: PlainMarketSpread.from_ticker(PLAIN_TICKER_INSTANCE, NOW),
+        lambda: MarketSpread.from_ticker(TICKER_INSTANCE, NOW),
+    ),
+    "SpreadAlertTracking": (
+        lambda: PlainSpreadAlertTracking(
+            1, "BTC-CLP", 1.0, 2.0, SpreadAlertStatus.GREATER
+        ),
+        lambda: SpreadAlertTracking(1, "BTC-CLP", 1.0, 2.0, SpreadAlertStatus.GREATER),
+    ),
+}
+
+
+def bytes_per_instance(build, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        instances = [build() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    # The list holding them is not part of the instances
+    return (after - before) / len(instances) - 8
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'type':<26}{'bytes/object':>22}{'construction':>24}")
+    for name, (before, after) in CASES.items():
+        memory = [bytes_per_instance(build, args.count) for build in (before, after)]
+        time = [
+            min(timeit.repeat(build, number=args.count, repeat=9)) / args.count * 1e9
+            for build in (before, after)
+        ]
+        print(
+            f"{name:<26}{memory[0]:>12.0f} ->{memory[1]:>6.0f}"
+            f"{time[0]:>12.0f}ns ->{time[1]:>6.0f}ns"
+        )
+
+
+if __name__ == "__main__":
+    main()
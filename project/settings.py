@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -46,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "spread.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -79,12 +82,35 @@ WSGI_APPLICATION = "project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# SQLite by default. Any other backend is set through DATABASE_ENGINE and
+# the connection variables, e.g. django.db.backends.postgresql (which needs
+# psycopg installed). Connections are kept for CONN_MAX_AGE seconds and
+# checked before being reused.
+DATABASE_ENGINE = os.getenv("DATABASE_ENGINE", "django.db.backends.sqlite3")
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "ENGINE": DATABASE_ENGINE,
+        "NAME": os.getenv("DATABASE_NAME", BASE_DIR / "db.sqlite3"),
+        "USER": os.getenv("DATABASE_USER", ""),
+        "PASSWORD": os.getenv("DATABASE_PASSWORD", ""),
+        "HOST": os.getenv("DATABASE_HOST", ""),
+        "PORT": os.getenv("DATABASE_PORT", ""),
+        "CONN_MAX_AGE": int(os.getenv("DATABASE_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": (
+            os.getenv("DATABASE_CONN_HEALTH_CHECKS", "true").lower() == "true"
+        ),
     }
 }
+if DATABASE_ENGINE == "django.db.backends.sqlite3":
+    # Seconds a write waits on a locked database before failing
+    DATABASES["default"]["OPTIONS"] = {
+        "timeout": float(os.getenv("DATABASE_SQLITE_TIMEOUT", "20"))
+    }
+
+# Write-ahead logging on SQLite, so requests keep reading while the collector
+# writes alert statuses. For single-node deployments only: WAL needs every
+# process on the same host.
+DATABASE_SQLITE_WAL = os.getenv("DATABASE_SQLITE_WAL", "true").lower() == "true"
 
 
 # Password validation
@@ -129,10 +155,105 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
-BUDA_API_BASE_URL = "https://www.buda.com/api/v2/"
+BUDA_API_BASE_URL = os.getenv("BUDA_API_BASE_URL", "https://www.buda.com/api/v2/")
+
+# Pooled connections to the Buda API, shared by the whole worker process
+BUDA_API_CONNECTION_LIMIT = 100
+BUDA_API_DNS_CACHE_TTL = 300
+BUDA_API_KEEPALIVE_TIMEOUT = 30
+
+# Upstream request budget of the worker process: requests per second (0
+# disables the rate limit), burst size and requests in flight at once
+BUDA_API_RATE_LIMIT = float(os.getenv("BUDA_API_RATE_LIMIT", "20"))
+BUDA_API_RATE_LIMIT_BURST = int(os.getenv("BUDA_API_RATE_LIMIT_BURST", "20"))
+BUDA_API_MAX_CONCURRENCY = int(os.getenv("BUDA_API_MAX_CONCURRENCY", "10"))
+
+# Seconds allowed per Buda API call, overridden by endpoint name, and retries
+# of failed GETs with a jittered exponential backoff
+BUDA_API_TIMEOUT = float(os.getenv("BUDA_API_TIMEOUT", "3"))
+BUDA_API_TIMEOUTS = {"MARKETS": 10.0, "ORDER_BOOK": 10.0, "TICKERS": 5.0}
+BUDA_API_RETRIES = 2
+BUDA_API_RETRY_BACKOFF = 0.1
+BUDA_API_RETRY_MAX_BACKOFF = 1.0
+
+# Consecutive upstream failures that open the circuit breaker, and seconds it
+# fails fast before letting a trial request through
+BUDA_API_CIRCUIT_FAILURE_THRESHOLD = 5
+BUDA_API_CIRCUIT_RESET_TIMEOUT = 30.0
+
+# Tickers are served from memory for TTL seconds, then served stale for up to
+# MAX_STALE seconds while they are refreshed in the background, or up to
+# MAX_STALE_IF_ERROR seconds while Buda is failing
+SPREAD_TICKER_CACHE_TTL = 2.0
+SPREAD_TICKER_CACHE_MAX_STALE = 30.0
+SPREAD_TICKER_CACHE_MAX_STALE_IF_ERROR = 300.0
+SPREAD_TICKER_CACHE_MAX_SIZE = 512
+
+# The market catalogue is kept in memory and refetched every N seconds
+SPREAD_MARKET_REGISTRY_REFRESH_INTERVAL = 300.0
+
+# Background poller refreshing every ticker each SPREAD_POLLER_INTERVAL seconds
+# so spreads are read from an in-memory snapshot. Markets listed in
+# SPREAD_POLLER_MARKET_INTERVALS are also polled on their own interval.
+SPREAD_POLLER_ENABLED = os.getenv("SPREAD_POLLER_ENABLED", "false").lower() == "true"
+SPREAD_POLLER_INTERVAL = 5.0
+SPREAD_POLLER_MARKET_INTERVALS = {}
+
+# Live spread streams: each market is polled once every INTERVAL seconds for
+# all of its subscribers, a comment is sent after HEARTBEAT idle seconds and at
+# most MAX_PENDING updates are buffered for a slow subscriber
+SPREAD_STREAM_INTERVAL = 1.0
+SPREAD_STREAM_HEARTBEAT = 15.0
+SPREAD_STREAM_MAX_PENDING = 8
+
+# Spread history written by `manage.py collect_market_data`: raw samples plus
+# 1m/1h rollups refreshed every ROLLUP_INTERVAL seconds
+SPREAD_HISTORY_DIR = Path(os.getenv("SPREAD_HISTORY_DIR", BASE_DIR / "spread_history"))
+SPREAD_HISTORY_ROLLUP_INTERVAL = 60.0
+SPREAD_HISTORY_DEFAULT_RANGE = timedelta(days=1)
+
+# Memory-mapped ring of the latest spreads, written by `manage.py
+# collect_market_data` and read by every worker (disabled when unset, a tmpfs
+# path such as /dev/shm/spread.ring is preferred). Records older than MAX_AGE
+# seconds are ignored so a stopped collector falls back to the ticker cache.
+SPREAD_RING_BUFFER_PATH = os.getenv("SPREAD_RING_BUFFER_PATH")
+SPREAD_RING_BUFFER_CAPACITY = 4096
+SPREAD_RING_BUFFER_MAX_AGE = 30.0
+
+# Upper bound on the alert ids accepted by the batch status endpoint
+SPREAD_ALERT_STATUS_MAX_IDS = 1000
+
+# Page size of the list endpoints, which are paginated by default only for
+# alerts and otherwise when a limit or cursor is given
+SPREAD_LIST_PAGE_SIZE = 100
+SPREAD_LIST_MAX_PAGE_SIZE = 1000
+
+# Upper bound on the alerts accepted by the bulk create endpoint
+SPREAD_ALERT_BULK_MAX_ITEMS = 5000
+
+# The collector materializes alert statuses on every poll, writing in batches
+# of BATCH_SIZE rows. Its threshold index is rebuilt from the table every
+# RELOAD_INTERVAL seconds, dropping deleted alerts. Stored statuses of a market
+# not evaluated for STATUS_MAX_AGE seconds are ignored and tracked live instead.
+SPREAD_ALERT_BATCH_SIZE = 500
+SPREAD_ALERT_INDEX_RELOAD_INTERVAL = 300.0
+SPREAD_ALERT_STATUS_MAX_AGE = 30.0
+
+# Latency histograms of views and hot-path stages, served at /metrics in the
+# Prometheus text format. Off, the instrumentation is not installed at all.
+SPREAD_METRICS_ENABLED = os.getenv("SPREAD_METRICS_ENABLED", "false").lower() == "true"
+
+# Route the API to the async (adrf) viewsets, meant to be served through
+# project.asgi with an ASGI server such as uvicorn
+SPREAD_ASYNC_VIEWS = os.getenv("SPREAD_ASYNC_VIEWS", "false").lower() == "true"
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "spread.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "EXCEPTION_HANDLER": "spread.exceptions.exception_handler",
 }
 
 SPECTACULAR_SETTINGS = {
@@ -140,4 +261,7 @@ SPECTACULAR_SETTINGS = {
     "DESCRIPTION": "Spreads for Buda markets",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
+    # adrf's viewset base class carries a docstring that would otherwise
+    # become the description of every async endpoint
+    "DISABLE_DOCSTRING_DESCRIPTIONS": True,
 }
@@ -14,6 +14,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from django.urls import include
@@ -22,18 +23,44 @@ from rest_framework.routers import SimpleRouter
 
 from spread.views import MarketViewSet
 from spread.views import SpreadAlertViewSet
+from spread.views import AsyncMarketViewSet
+from spread.views import AsyncSpreadAlertViewSet
+from spread.views import market_spread_stream
+from spread.views import metrics
+from spread.views import spread_alert_stream
 
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 
 router = SimpleRouter()
 
-router.register(r"markets", MarketViewSet, basename="markets")
-router.register(r"spread-alerts", SpreadAlertViewSet, basename="spread-alerts")
+if settings.SPREAD_ASYNC_VIEWS:
+    router.register(r"markets", AsyncMarketViewSet, basename="markets")
+    router.register(r"spread-alerts", AsyncSpreadAlertViewSet, basename="spread-alerts")
+else:
+    router.register(r"markets", MarketViewSet, basename="markets")
+    router.register(r"spread-alerts", SpreadAlertViewSet, basename="spread-alerts")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include(router.urls)),
+    path("metrics", metrics, name="metrics"),
     path("api/v1/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/v1/docs/", SpectacularSwaggerView.as_view(), name="api-docs"),
 ]
+
+# Server-sent events hold a worker for the whole connection and are buffered
+# whole by WSGI, so they are only served along with the async views
+if settings.SPREAD_ASYNC_VIEWS:
+    urlpatterns += [
+        path(
+            "api/v1/markets/<str:pk>/spread/stream/",
+            market_spread_stream,
+            name="markets-spread-stream",
+        ),
+        path(
+            "api/v1/spread-alerts/<int:pk>/stream/",
+            spread_alert_stream,
+            name="spread-alerts-stream",
+        ),
+    ]
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SpreadConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "spread"
+
+    def ready(self):
+        from . import signals  # noqa: F401
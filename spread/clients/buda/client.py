@@ -1,14 +1,23 @@
 from enum import Enum
 from functools import cached_property
+from functools import partial
 
 import aiohttp
+import orjson
 
+from .limiter import UpstreamLimiter
+from .resilience import CircuitBreaker
+from .resilience import retry
 from .types import OrderBook
 from .types import Market
 from .types import Ticker
 
 from django.conf import settings
 
+from spread.metrics import timed
+
+_loads = timed("orjson.loads")(orjson.loads)
+
 
 class BudaAPIEndpoint(str, Enum):
     MARKETS = "markets"
@@ -19,11 +28,26 @@ class BudaAPIEndpoint(str, Enum):
 
 
 class BudaAPIClient:
-    def __init__(self):
+    def __init__(
+        self,
+        session: aiohttp.ClientSession | None = None,
+        limiter: UpstreamLimiter | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
         self.base_url = settings.BUDA_API_BASE_URL
+        self.timeout = settings.BUDA_API_TIMEOUT
+        self.timeouts = settings.BUDA_API_TIMEOUTS
+        self.retries = settings.BUDA_API_RETRIES
+        self.retry_backoff = settings.BUDA_API_RETRY_BACKOFF
+        self.retry_max_backoff = settings.BUDA_API_RETRY_MAX_BACKOFF
+        self._session = session
+        self.limiter = limiter
+        self.breaker = breaker
 
     @cached_property
-    def async_session(self):
+    def async_session(self) -> aiohttp.ClientSession:
+        if self._session is not None:
+            return self._session
         return aiohttp.ClientSession()
 
     async def get(
@@ -31,18 +55,51 @@ class BudaAPIClient:
         endpoint: BudaAPIEndpoint,
         **path_params,
     ) -> dict:
+        return _loads(await self.get_bytes(endpoint, **path_params))
+
+    async def get_bytes(
+        self,
+        endpoint: BudaAPIEndpoint,
+        **path_params,
+    ) -> bytes:
         return await self.make_request("GET", endpoint, path_params)
 
+    @timed()
     async def make_request(
         self,
         method: str,
         endpoint: BudaAPIEndpoint,
         path_params: dict,
-    ) -> dict:
+    ) -> bytes:
         url = self.build_url(endpoint, path_params)
-        async with self.async_session.request(method, url) as response:
+        timeout = self.timeouts.get(endpoint.name, self.timeout)
+        call = partial(self.send, method, url, aiohttp.ClientTimeout(total=timeout))
+        if method == "GET":
+            # Only idempotent requests are retried
+            call = partial(
+                retry, call, self.retries, self.retry_backoff, self.retry_max_backoff
+            )
+        if self.breaker is not None:
+            # Fail fast instead of queueing behind the limiter
+            self.breaker.check()
+            call = partial(self.breaker.call, call)
+        if self.limiter is None:
+            return await call()
+        # Concurrent GETs of the same URL share one upstream call
+        key = url if method == "GET" else None
+        return await self.limiter.request(call, key=key)
+
+    @timed()
+    async def send(
+        self,
+        method: str,
+        url: str,
+        timeout: aiohttp.ClientTimeout | None = None,
+    ) -> bytes:
+        async with self.async_session.request(method, url, timeout=timeout) as response:
             response.raise_for_status()
-            return await response.json()
+            # Raw body, decoded by the caller without an intermediate str
+            return await response.read()
 
     def build_url(
         self,
@@ -57,18 +114,22 @@ class BudaAPIClient:
         return [Market.from_response(market_data) for market_data in data["markets"]]
 
     async def get_order_book(self, market_id: str) -> OrderBook:
-        order_book_data = await self.get(
-            BudaAPIEndpoint.ORDER_BOOK, market_id=market_id
-        )
-        return OrderBook.from_response(order_book_data)
+        body = await self.get_bytes(BudaAPIEndpoint.ORDER_BOOK, market_id=market_id)
+        return OrderBook.from_bytes(body)
 
     async def get_ticker(self, market_id: str) -> Ticker:
         ticker_data = await self.get(BudaAPIEndpoint.TICKER, market_id=market_id)
         return Ticker.from_response(ticker_data["ticker"])
 
+    async def get_tickers(self) -> list[Ticker]:
+        data = await self.get(BudaAPIEndpoint.TICKERS)
+        return [Ticker.from_response(ticker_data) for ticker_data in data["tickers"]]
+
     async def get_market(self, market_id: str) -> Market:
         data = await self.get(BudaAPIEndpoint.MARKET, market_id=market_id)
         return Market.from_response(data["market"])
 
     async def close(self) -> None:
-        await self.async_session.close()
+        # A session handed in by the caller is shared, its owner closes it
+        if self._session is None:
+            await self.async_session.close()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import TypeVar
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class LimiterStats:
+    requests: int = 0
+    coalesced: int = 0
+    # Requests currently waiting for a concurrency slot or a token
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    waited: int = 0
+    wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.waited += 1
+        self.wait_time += seconds
+        self.max_wait_time = max(self.max_wait_time, seconds)
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, with bursts of up to
+    `burst`. Callers past the budget reserve the next token and sleep until
+    it is due, so they are let through in arrival order.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._tokens = float(burst)
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        elapsed = now - self._updated_at
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        """Takes a token and returns the seconds until it can be used."""
+        self._refill()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class UpstreamLimiter:
+    """
+    Gate in front of every request to the Buda API, meant to live on the
+    client runtime loop so all clients of the process share it.
+
+    Requests with the same key share one in-flight call. Distinct calls
+    wait for one of `max_concurrency` slots and then for a token of the
+    rate limit; without a rate only the concurrency is bounded.
+    """
+
+    def __init__(
+        self,
+        rate: float | None,
+        burst: int,
+        max_concurrency: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.clock = clock
+        self.stats = LimiterStats()
+        self._bucket = TokenBucket(rate, burst, clock) if rate else None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+
+    async def request(
+        self,
+        call: Callable[[], Awaitable[T]],
+        key: Hashable | None = None,
+    ) -> T:
+        self.stats.requests += 1
+        if key is None:
+            return await self._limited(call)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._shared(key, call))
+            task.add_done_callback(self._forget_error)
+            self._in_flight[key] = task
+        else:
+            self.stats.coalesced += 1
+        # A caller going away does not cancel the call others are awaiting
+        return await asyncio.shield(task)
+
+    async def _shared(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        try:
+            return await self._limited(call)
+        finally:
+            del self._in_flight[key]
+
+    async def _limited(self, call: Callable[[], Awaitable[T]]) -> T:
+        queued_at = self.clock()
+        self.stats.queue_depth += 1
+        self.stats.max_queue_depth = max(
+            self.stats.max_queue_depth, self.stats.queue_depth
+        )
+        try:
+            await self._semaphore.acquire()
+            try:
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self.stats.queue_depth -= 1
+        self.stats.record_wait(self.clock() - queued_at)
+        try:
+            return await call()
+        finally:
+            self._semaphore.release()
+
+    @staticmethod
+    def _forget_error(task: asyncio.Task) -> None:
+        # Every caller of a shared call may have gone away already
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+import aiohttp
+
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Raised instead of calling Buda while the circuit breaker is open."""
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Whether the error means Buda is degraded: timeouts, connection errors,
+    5xx and 429 responses. Other 4xx responses are answers to the request.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+async def retry(
+    call: Callable[[], Awaitable[T]],
+    retries: int,
+    backoff: float,
+    max_backoff: float,
+) -> T:
+    """
+    Calls again after upstream failures, up to `retries` times. Waits are
+    drawn uniformly up to an exponential bound (full jitter) so callers
+    failing together do not retry together.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await call()
+        except Exception as error:
+            if attempt == retries or not is_upstream_failure(error):
+                raise
+        await asyncio.sleep(random.uniform(0, min(max_backoff, backoff * 2**attempt)))
+
+
+class CircuitBreaker:
+    """
+    Fails fast after `failure_threshold` consecutive upstream failures.
+
+    Once `reset_timeout` seconds have passed a single trial call goes
+    through: its success closes the circuit, its failure keeps it open for
+    another `reset_timeout`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._trial or self.clock() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def check(self) -> None:
+        """Raises CircuitOpenError unless a call may go through."""
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial):
+            raise CircuitOpenError("Buda API circuit breaker is open")
+
+    async def call(self, call: Callable[[], Awaitable[T]]) -> T:
+        self.check()
+        self._trial = self.opened_at is not None
+        try:
+            result = await call()
+        except Exception as error:
+            # Any answer from Buda, even an error response, means it is up
+            self._record(healthy=not is_upstream_failure(error))
+            raise
+        except BaseException:
+            self._trial = False
+            raise
+        self._record(healthy=True)
+        return result
+
+    def _record(self, healthy: bool) -> None:
+        self._trial = False
+        if healthy:
+            self.failures = 0
+            self.opened_at = None
+            return
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
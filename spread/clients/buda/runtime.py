@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+import aiohttp
+
+from django.conf import settings
+
+from spread.metrics import timed
+
+from .client import BudaAPIClient
+from .limiter import UpstreamLimiter
+from .resilience import CircuitBreaker
+
+
+T = TypeVar("T")
+
+
+class BudaClientRuntime:
+    """
+    Long-lived asyncio loop running in a daemon thread, owning a pooled
+    aiohttp session, the upstream limiter and the circuit breaker shared by
+    every BudaAPIClient of the process.
+
+    Sync code submits coroutines with `run`, which blocks the calling
+    thread until the coroutine completes on the runtime loop. Async code
+    awaits `arun` instead, which suspends the caller on its own loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._limiter: UpstreamLimiter | None = None
+        self._breaker: CircuitBreaker | None = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        self.start()
+        return self._session
+
+    @property
+    def limiter(self) -> UpstreamLimiter:
+        self.start()
+        return self._limiter
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        self.start()
+        return self._breaker
+
+    def client(self) -> BudaAPIClient:
+        self.start()
+        return BudaAPIClient(
+            session=self._session, limiter=self._limiter, breaker=self._breaker
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        with self._lock:
+            if self.running:
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever,
+                name="buda-client-runtime",
+                daemon=True,
+            )
+            thread.start()
+            self._session = asyncio.run_coroutine_threadsafe(
+                self._open_session(), loop
+            ).result()
+            self._limiter = UpstreamLimiter(
+                rate=settings.BUDA_API_RATE_LIMIT,
+                burst=settings.BUDA_API_RATE_LIMIT_BURST,
+                max_concurrency=settings.BUDA_API_MAX_CONCURRENCY,
+            )
+            self._breaker = CircuitBreaker(
+                failure_threshold=settings.BUDA_API_CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.BUDA_API_CIRCUIT_RESET_TIMEOUT,
+            )
+            self._loop = loop
+            self._thread = thread
+
+    @timed()
+    async def _open_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=settings.BUDA_API_CONNECTION_LIMIT,
+            limit_per_host=settings.BUDA_API_CONNECTION_LIMIT,
+            ttl_dns_cache=settings.BUDA_API_DNS_CACHE_TTL,
+            keepalive_timeout=settings.BUDA_API_KEEPALIVE_TIMEOUT,
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    @staticmethod
+    async def _close(session: aiohttp.ClientSession) -> None:
+        # Background jobs (cache refreshes, pollers) are cancelled before
+        # the session they use goes away
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await session.close()
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result()
+
+    async def arun(self, coro: Coroutine[Any, Any, T]) -> T:
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if not self.running:
+                return
+            loop, thread, session = self._loop, self._thread, self._session
+            self._loop = self._thread = self._session = None
+            self._limiter = self._breaker = None
+            asyncio.run_coroutine_threadsafe(self._close(session), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+runtime = BudaClientRuntime()
+
+atexit.register(runtime.shutdown)
@@ -1,45 +1,178 @@
 from __future__ import annotations
 
+import re
+from collections.abc import Sequence
 from dataclasses import dataclass
-from dataclasses import fields
-from typing import Self, Any
+from itertools import chain
+from typing import Self, Any, overload
 
+import numpy as np
+import orjson
 
-@dataclass
+from spread.metrics import timed
+
+# Opening of an array value right after its key, group 1 matches when the
+# array is empty
+ARRAY_START = re.compile(rb"\s*:\s*\[(\s*\])?")
+
+
+@dataclass(frozen=True, slots=True)
 class Order:
     price: float
     amount: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MoneyAmount:
     amount: float
     currency: str
 
     def __post_init__(self):
-        self.amount = float(self.amount)
+        # Frozen, so the conversion goes around the generated __setattr__
+        object.__setattr__(self, "amount", float(self.amount))
+
+    @classmethod
+    def from_response(cls, data: list[str]) -> Self:
+        amount, currency = data
+        return cls(amount, currency)
+
+
+class OrderBookSide(Sequence[Order]):
+    """
+    Price levels of one side of an order book, stored as two contiguous
+    float64 arrays. Levels are kept in the order Buda returns them
+    (ascending prices for asks, descending for bids); indexing builds
+    `Order` views on demand and slicing returns array views.
+    """
+
+    __slots__ = ("prices", "amounts", "descending")
+
+    def __init__(self, prices: np.ndarray, amounts: np.ndarray, descending: bool):
+        self.prices = prices
+        self.amounts = amounts
+        self.descending = descending
+
+    @classmethod
+    def from_levels(cls, levels: list[list[str]], descending: bool) -> Self:
+        # Flatten [price, amount] pairs straight into one float64 buffer
+        parsed = np.fromiter(
+            chain.from_iterable(levels), dtype=np.float64, count=2 * len(levels)
+        ).reshape(-1, 2)
+        return cls.from_pairs(parsed, descending)
+
+    @classmethod
+    def from_pairs(cls, pairs: np.ndarray, descending: bool) -> Self:
+        # Columns of the (n, 2) buffer are strided views, copied out so each
+        # side is scanned and searched over contiguous memory
+        return cls(
+            np.ascontiguousarray(pairs[:, 0]),
+            np.ascontiguousarray(pairs[:, 1]),
+            descending,
+        )
+
+    @classmethod
+    def from_json(cls, levels: bytes, descending: bool) -> Self:
+        """
+        Side read from the raw JSON array of ["price", "amount"] pairs: the
+        punctuation is stripped and numpy parses the numbers directly into a
+        float64 buffer, without building any per-level Python object.
+        """
+        numbers = levels.translate(None, b'"[] \t\r\n')
+        parsed = np.fromstring(numbers, dtype=np.float64, sep=",")
+        if parsed.size != (numbers.count(b",") + 1 if numbers else 0):
+            raise ValueError("Malformed order book levels")
+        if parsed.size % 2:
+            raise ValueError("Unpaired order book level")
+        return cls.from_pairs(parsed.reshape(-1, 2), descending)
+
+    def __len__(self) -> int:
+        return self.prices.size
+
+    @overload
+    def __getitem__(self, index: int) -> Order:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> OrderBookSide:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return type(self)(self.prices[index], self.amounts[index], self.descending)
+        return Order(float(self.prices[index]), float(self.amounts[index]))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, OrderBookSide):
+            return NotImplemented
+        return (
+            self.descending == other.descending
+            and np.array_equal(self.prices, other.prices)
+            and np.array_equal(self.amounts, other.amounts)
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(levels={len(self)})"
+
+    def top(self, n: int) -> OrderBookSide:
+        return self[:n]
+
+    def index_of(self, price: float) -> int | None:
+        """Position of the level at `price` in O(log n), None if absent."""
+        # Bids are searched through their reversed view, which is ascending
+        # and, unlike negating the prices, copies nothing
+        prices = self.prices[::-1] if self.descending else self.prices
+        index = int(np.searchsorted(prices, price))
+        if index == len(self) or prices[index] != price:
+            return None
+        return len(self) - 1 - index if self.descending else index
+
+    def amount_at(self, price: float) -> float:
+        index = self.index_of(price)
+        return 0.0 if index is None else float(self.amounts[index])
 
 
 @dataclass
 class OrderBook:
-    asks: list[Order]
-    bids: list[Order]
+    asks: OrderBookSide
+    bids: OrderBookSide
 
     @classmethod
     def from_response(cls, data: dict[Any, Any]) -> Self:
         return cls(
-            asks=[
-                Order(float(price), float(amount))
-                for price, amount in data["order_book"]["asks"]
-            ],
-            bids=[
-                Order(float(price), float(amount))
-                for price, amount in data["order_book"]["bids"]
-            ],
+            asks=OrderBookSide.from_levels(
+                data["order_book"]["asks"], descending=False
+            ),
+            bids=OrderBookSide.from_levels(data["order_book"]["bids"], descending=True),
         )
 
+    @classmethod
+    @timed()
+    def from_bytes(cls, body: bytes) -> Self:
+        """
+        Order book straight from the response body, cutting each side's
+        array out of the bytes. Bodies laid out differently than expected
+        go through a full JSON parse instead.
+        """
+        try:
+            return cls(
+                asks=OrderBookSide.from_json(_array_after(body, b'"asks"'), False),
+                bids=OrderBookSide.from_json(_array_after(body, b'"bids"'), True),
+            )
+        except ValueError:
+            return cls.from_response(orjson.loads(body))
 
-@dataclass
+
+def _array_after(body: bytes, key: bytes) -> bytes:
+    """Raw items of the array of arrays following `key` in a JSON body."""
+    match = ARRAY_START.match(body, body.index(key) + len(key))
+    if match is None:
+        raise ValueError(f"No array after {key!r}")
+    if match.group(1):
+        return b""
+    return body[match.end() : body.index(b"]]", match.end()) + 1]
+
+
+@dataclass(frozen=True, slots=True)
 class Market:
     id: str
     name: str
@@ -54,13 +187,24 @@ class Market:
     disabled: bool
 
     @classmethod
-    def from_response(cls, response: dict[Any, Any]) -> Self:
-        data = {k.name: response[k.name] for k in fields(cls)}
-        data["minimum_order_amount"] = MoneyAmount(*data["minimum_order_amount"])
-        return cls(**data)
+    @timed()
+    def from_response(cls, data: dict[Any, Any]) -> Self:
+        return cls(
+            data["id"],
+            data["name"],
+            data["base_currency"],
+            data["quote_currency"],
+            MoneyAmount.from_response(data["minimum_order_amount"]),
+            data["taker_fee"],
+            data["maker_fee"],
+            data["max_orders_per_minute"],
+            data["maker_discount_percentage"],
+            data["taker_discount_percentage"],
+            data["disabled"],
+        )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Ticker:
     market_id: str
     last_price: MoneyAmount
@@ -71,13 +215,14 @@ class Ticker:
     price_variation_7d: float
 
     @classmethod
+    @timed()
     def from_response(cls, data: dict[Any, Any]) -> Self:
         return cls(
-            market_id=data["market_id"],
-            last_price=MoneyAmount(*data["last_price"]),
-            min_ask=MoneyAmount(*data["min_ask"]),
-            max_bid=MoneyAmount(*data["max_bid"]),
-            volume=MoneyAmount(*data["volume"]),
-            price_variation_24h=float(data["price_variation_24h"]),
-            price_variation_7d=float(data["price_variation_7d"]),
+            data["market_id"],
+            MoneyAmount.from_response(data["last_price"]),
+            MoneyAmount.from_response(data["min_ask"]),
+            MoneyAmount.from_response(data["max_bid"]),
+            MoneyAmount.from_response(data["volume"]),
+            float(data["price_variation_24h"]),
+            float(data["price_variation_7d"]),
         )
@@ -0,0 +1,126 @@
+import hashlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_cache_control
+from django.utils.cache import quote_etag
+from django.utils.http import http_date
+
+from .clients.buda.types import Market
+from .services.markets import market_registry
+from .services.types import MarketSpread
+
+
+@dataclass(frozen=True)
+class Version:
+    etag: str
+    last_modified: datetime | None = None
+
+
+def spread_version(spread: MarketSpread) -> Version | None:
+    if spread.updated_at is None:
+        return None
+    return Version(
+        f"{spread.market_id.lower()}@{spread.updated_at.timestamp()}",
+        spread.updated_at,
+    )
+
+
+def spreads_version(spreads: list[MarketSpread]) -> Version | None:
+    if not spreads or any(spread.updated_at is None for spread in spreads):
+        return None
+    digest = hashlib.md5()
+    for spread in spreads:
+        digest.update(f"{spread.market_id}@{spread.updated_at.timestamp()};".encode())
+    return Version(digest.hexdigest(), max(spread.updated_at for spread in spreads))
+
+
+def markets_version(markets: list[Market] | Market) -> Version | None:
+    # Any market is served from the registry, so its version covers them all
+    if market_registry.digest is None:
+        return None
+    return Version(market_registry.digest, market_registry.updated_at)
+
+
+def _add_headers(response: HttpResponse, version: Version, max_age: float):
+    response.headers["ETag"] = quote_etag(version.etag)
+    if version.last_modified is not None:
+        response.headers["Last-Modified"] = http_date(version.last_modified.timestamp())
+    patch_cache_control(response, max_age=int(max_age))
+    return response
+
+
+def _not_modified(request, version: Version | None, max_age: float):
+    if version is None:
+        return None
+    last_modified = None
+    if version.last_modified is not None:
+        last_modified = int(version.last_modified.timestamp())
+    response = get_conditional_response(
+        request, etag=quote_etag(version.etag), last_modified=last_modified
+    )
+    if response is None:
+        return None
+    return _add_headers(response, version, max_age)
+
+
+def conditional(
+    peek: Callable[..., Any | None],
+    version_of: Callable[[Any], Version | None],
+    max_age: float,
+):
+    """
+    Conditional GET for a viewset action serving dataclasses.
+
+    `peek` gets the action arguments and returns the data the action would
+    serve when it is already in memory, or None when it takes an upstream
+    call. A request whose If-None-Match/If-Modified-Since matches that
+    data's version gets a 304 before the action runs; successful responses
+    get its ETag, Last-Modified and a Cache-Control max-age.
+    """
+
+    def check(request, args, kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        data = peek(*args, **kwargs)
+        if data is None:
+            return None
+        return _not_modified(request, version_of(data), max_age)
+
+    def tag(request, response):
+        if request.method in ("GET", "HEAD") and response.status_code == 200:
+            version = version_of(response.data)
+            if version is not None:
+                _add_headers(response, version, max_age)
+        return response
+
+    def decorator(action):
+        if iscoroutinefunction(action):
+
+            @wraps(action)
+            async def wrapper(self, request, *args, **kwargs):
+                not_modified = check(request, args, kwargs)
+                if not_modified is not None:
+                    return not_modified
+                response = await action(self, request, *args, **kwargs)
+                return tag(request, response)
+
+        else:
+
+            @wraps(action)
+            def wrapper(self, request, *args, **kwargs):
+                not_modified = check(request, args, kwargs)
+                if not_modified is not None:
+                    return not_modified
+                response = action(self, request, *args, **kwargs)
+                return tag(request, response)
+
+        return wrapper
+
+    return decorator
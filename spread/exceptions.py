@@ -0,0 +1,25 @@
+from aiohttp import ClientResponseError
+from django.http import Http404
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from .clients.buda.resilience import CircuitOpenError
+from .clients.buda.resilience import is_upstream_failure
+
+
+class UpstreamUnavailable(APIException):
+    status_code = 503
+    default_detail = "Buda API is unavailable, try again later."
+    default_code = "upstream_unavailable"
+
+
+def exception_handler(exc, context):
+    """
+    DRF exception handler answering failures of the Buda API with a 503
+    and markets unknown to Buda with a 404 instead of a server error.
+    """
+    if isinstance(exc, CircuitOpenError) or is_upstream_failure(exc):
+        exc = UpstreamUnavailable()
+    elif isinstance(exc, ClientResponseError) and exc.status == 404:
+        exc = Http404()
+    return drf_exception_handler(exc, context)
@@ -0,0 +1,182 @@
+import base64
+import dataclasses
+from bisect import bisect_right
+from collections.abc import Callable
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any
+
+import orjson
+
+from django.conf import settings
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.serializers import CharField
+from rest_framework.serializers import IntegerField
+from rest_framework.serializers import Serializer
+
+from .renderers import current_timezone
+from .renderers import projected_encoder
+
+
+def encode_cursor(key: Any) -> str:
+    # Unpadded, to be passed as a query parameter as is
+    return base64.urlsafe_b64encode(orjson.dumps(key)).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        return orjson.loads(base64.urlsafe_b64decode(cursor + padding))
+    except ValueError:
+        raise ValidationError("Invalid cursor")
+
+
+def page(results: list, next_key: Any | None) -> dict:
+    return {
+        "results": results,
+        "next": None if next_key is None else encode_cursor(next_key),
+    }
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pages of `results` with the cursor of the `next` one, as `page` builds
+    them. Set as a view's pagination_class so the schema describes its list
+    responses as such; the pages themselves are built by the views.
+    """
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results", "next"],
+            "properties": {
+                "results": schema,
+                "next": {"type": "string", "nullable": True},
+            },
+        }
+
+
+class OptionalKeysetPagination(KeysetPagination):
+    """
+    Schema of the `listing` actions, whose list is only served as pages when
+    a limit or cursor is given.
+    """
+
+    def get_paginated_response_schema(self, schema):
+        return {"oneOf": [schema, super().get_paginated_response_schema(schema)]}
+
+
+class ListQuerySerializer(Serializer):
+    """
+    Pagination and projection of a list action. `fields` is a comma
+    separated subset of the names in the `fields` context entry, given back
+    in that order.
+    """
+
+    cursor_type: type = str
+
+    cursor = CharField(required=False)
+    limit = IntegerField(
+        min_value=1, max_value=settings.SPREAD_LIST_MAX_PAGE_SIZE, required=False
+    )
+
+    def get_fields(self):
+        # "fields" would shadow Serializer.fields as a class attribute
+        fields = super().get_fields()
+        fields["fields"] = CharField(required=False)
+        return fields
+
+    def validate_cursor(self, cursor):
+        key = decode_cursor(cursor)
+        if not isinstance(key, self.cursor_type):
+            raise ValidationError("Invalid cursor")
+        return key
+
+    def validate_fields(self, fields):
+        names = {name.strip() for name in fields.split(",")} - {""}
+        known = self.context["fields"]
+        unknown = names.difference(known)
+        if unknown:
+            raise ValidationError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        if not names:
+            raise ValidationError("Must name at least one field")
+        return tuple(name for name in known if name in names)
+
+
+def paginate(
+    items: list, key: Callable[[Any], Any], after: Any | None, limit: int
+) -> tuple[list, Any | None]:
+    """Page of `items` ordered by `key`, after the `after` key if given."""
+    items = sorted(items, key=key)
+    if after is not None:
+        items = items[bisect_right(items, after, key=key) :]
+    next_key = key(items[limit - 1]) if len(items) > limit else None
+    return items[:limit], next_key
+
+
+def listing(
+    query_class: type[ListQuerySerializer],
+    dataclass_type: type,
+    key: Callable[[Any], Any],
+    filters: dict[str, Callable[[Any, Any], bool]],
+):
+    """
+    Filters, keyset pagination and field projection for a viewset action
+    serving a list of `dataclass_type` instances.
+
+    `filters` maps query parameters of `query_class` to predicates of an
+    item and the parameter value. With `limit` or `cursor` the items are
+    ordered by `key`, which must be unique, and served as a page of
+    `results` with the cursor of the `next` one; otherwise the list keeps
+    its shape. With `fields` only those attributes of each item are
+    encoded. Meant to wrap `conditional`, so a page is tagged with the
+    version of the whole list.
+    """
+    names = tuple(field.name for field in dataclasses.fields(dataclass_type))
+
+    def validate(request):
+        query = query_class(data=request.query_params, context={"fields": names})
+        query.is_valid(raise_exception=True)
+        return query.validated_data
+
+    def shape(query, response):
+        items = getattr(response, "data", None)
+        if response.status_code != 200 or not isinstance(items, list):
+            return response
+        for name, matches in filters.items():
+            value = query.get(name)
+            if value is not None:
+                items = [item for item in items if matches(item, value)]
+        paginated = "cursor" in query or "limit" in query
+        if paginated:
+            limit = query.get("limit", settings.SPREAD_LIST_PAGE_SIZE)
+            items, next_key = paginate(items, key, query.get("cursor"), limit)
+        if "fields" in query:
+            encode = projected_encoder(dataclass_type, query["fields"])
+            tz = current_timezone()
+            items = [encode(item, tz) for item in items]
+        response.data = page(items, next_key) if paginated else items
+        return response
+
+    def decorator(action):
+        if iscoroutinefunction(action):
+
+            @wraps(action)
+            async def wrapper(self, request, *args, **kwargs):
+                query = validate(request)
+                response = await action(self, request, *args, **kwargs)
+                return shape(query, response)
+
+        else:
+
+            @wraps(action)
+            def wrapper(self, request, *args, **kwargs):
+                query = validate(request)
+                response = action(self, request, *args, **kwargs)
+                return shape(query, response)
+
+        return wrapper
+
+    return decorator
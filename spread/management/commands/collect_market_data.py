@@ -0,0 +1,69 @@
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from spread.clients.buda.runtime import runtime
+from spread.services.alert_evaluation import AlertEvaluator
+from spread.services.history import record_tickers
+from spread.services.history import spread_history
+from spread.services.poller import MarketDataPoller
+from spread.services.ring_buffer import open_ring_buffer_writer
+from spread.services.ring_buffer import to_records
+from spread.services.types import MarketSpread
+
+
+class Command(BaseCommand):
+    help = (
+        "Polls Buda tickers, appends every spread sample to the history store "
+        "and the shared ring buffer, materializes the status of the alerts "
+        "whose threshold was crossed, and rolls the history up periodically. "
+        "Run a single instance per store."
+    )
+
+    def handle(self, *args, **options):
+        ring_buffer = open_ring_buffer_writer()
+        evaluator = AlertEvaluator.from_settings()
+        # The ORM can't run on the event loop, and a single thread keeps the
+        # evaluations in poll order
+        alerts_executor = ThreadPoolExecutor(max_workers=1)
+
+        def publish(tickers):
+            record_tickers(tickers)
+            if ring_buffer is not None:
+                ring_buffer.append(to_records(tickers))
+            spreads = [
+                MarketSpread.from_ticker(cached.ticker, cached.updated_at)
+                for cached in tickers
+            ]
+            evaluation = alerts_executor.submit(evaluator.evaluate, spreads)
+            evaluation.add_done_callback(self.report_evaluation)
+
+        poller = MarketDataPoller.from_settings(on_publish=publish)
+        self.stdout.write(f"Recording spread history in {spread_history.root}")
+        if ring_buffer is not None:
+            self.stdout.write(f"Publishing latest spreads to {ring_buffer.path}")
+        try:
+            runtime.run(self.collect(poller))
+        finally:
+            alerts_executor.shutdown(cancel_futures=True)
+
+    def report_evaluation(self, evaluation: Future) -> None:
+        if evaluation.cancelled():
+            return
+        error = evaluation.exception()
+        if error is not None:
+            self.stderr.write(f"Alert evaluation failed: {error!r}")
+        elif changes := evaluation.result():
+            self.stdout.write(f"{len(changes)} alert status changes")
+
+    async def collect(self, poller: MarketDataPoller) -> None:
+        polling = asyncio.create_task(poller.run())
+        try:
+            while True:
+                await asyncio.sleep(settings.SPREAD_HISTORY_ROLLUP_INTERVAL)
+                await asyncio.to_thread(spread_history.rollup_all)
+        finally:
+            polling.cancel()
@@ -0,0 +1,211 @@
+"""
+Process-local latency metrics in the Prometheus text format.
+
+With SPREAD_METRICS_ENABLED off, `timed` hands back the function it
+decorates untouched and the middleware removes itself, so instrumented
+code runs exactly as it would without the instrumentation.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import TypeVar
+
+from django.conf import settings
+
+
+F = TypeVar("F", bound=Callable)
+
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # Per label values: observations per bucket (the last one is +Inf)
+        # followed by their sum
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def samples(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for label_values, values in sorted(series.items()):
+            labels = ",".join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.labels, label_values)
+            )
+            count = 0
+            for bound, observations in zip(self.buckets + (float("inf"),), values):
+                count += observations
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f'{self.name}_bucket{{{labels},le="{le}"}} {count}'
+            yield f"{self.name}_sum{{{labels}}} {values[-1]!r}"
+            yield f"{self.name}_count{{{labels}}} {count}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+stage_seconds = Histogram(
+    "spread_stage_seconds",
+    "Time spent in each stage of serving a spread.",
+    ("stage",),
+)
+
+request_seconds = Histogram(
+    "spread_request_seconds",
+    "Latency of API requests until the response headers.",
+    ("view", "method", "status"),
+)
+
+
+def timed(stage: str | None = None) -> Callable[[F], F]:
+    """
+    Records each call of the decorated function, sync or async, in the
+    `spread_stage_seconds` histogram under `stage`, its qualified name by
+    default.
+    """
+
+    def decorator(func: F) -> F:
+        if not settings.SPREAD_METRICS_ENABLED:
+            return func
+        label = stage or func.__qualname__
+        observe = stage_seconds.observe
+        clock = time.perf_counter
+
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    observe(clock() - start, label)
+
+        else:
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    observe(clock() - start, label)
+
+        return wrapper
+
+    return decorator
+
+
+def _metric(name: str, kind: str, description: str, value: float) -> Iterator[str]:
+    yield f"# HELP {name} {description}"
+    yield f"# TYPE {name} {kind}"
+    yield f"{name} {value!r}"
+
+
+def _upstream_samples() -> Iterator[str]:
+    from .clients.buda.runtime import runtime
+    from .services.spread import ticker_cache
+
+    cache = ticker_cache.stats
+    yield from _metric(
+        "spread_ticker_cache_hits_total", "counter", "Fresh cache hits.", cache.hits
+    )
+    yield from _metric(
+        "spread_ticker_cache_stale_total",
+        "counter",
+        "Stale entries served.",
+        cache.stale,
+    )
+    yield from _metric(
+        "spread_ticker_cache_misses_total", "counter", "Cache misses.", cache.misses
+    )
+    if not runtime.running:
+        return
+    limiter = runtime.limiter.stats
+    yield from _metric(
+        "spread_upstream_queue_depth",
+        "gauge",
+        "Buda requests waiting for the limiter.",
+        limiter.queue_depth,
+    )
+    yield from _metric(
+        "spread_upstream_requests_total",
+        "counter",
+        "Buda requests submitted to the limiter.",
+        limiter.requests,
+    )
+    yield from _metric(
+        "spread_upstream_coalesced_requests_total",
+        "counter",
+        "Buda requests served by another in-flight request.",
+        limiter.coalesced,
+    )
+    yield from _metric(
+        "spread_upstream_wait_seconds_total",
+        "counter",
+        "Time Buda requests waited for the limiter.",
+        limiter.wait_time,
+    )
+    yield from _metric(
+        "spread_upstream_circuit_open",
+        "gauge",
+        "Whether the Buda circuit breaker is failing fast.",
+        int(runtime.breaker.state == "open"),
+    )
+
+
+def render() -> str:
+    lines = [*request_seconds.samples(), *stage_seconds.samples()]
+    lines.extend(_upstream_samples())
+    return "\n".join(lines) + "\n"
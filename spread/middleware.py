@@ -0,0 +1,49 @@
+import time
+
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import request_seconds
+
+
+class MetricsMiddleware:
+    """
+    Records the latency of every request in the `spread_request_seconds`
+    histogram, labelled by view name, method and status. Django drops the
+    middleware altogether while SPREAD_METRICS_ENABLED is off.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SPREAD_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    def observe(request, response, seconds: float) -> None:
+        # Route names keep the label set bounded, whatever paths are requested
+        match = request.resolver_match
+        view = match.view_name if match is not None else "unmatched"
+        request_seconds.observe(
+            seconds, view, request.method, str(response.status_code)
+        )
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:23
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SpreadAlert",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("market_id", models.TextField()),
+                (
+                    "alert_threshold",
+                    models.FloatField(
+                        validators=[django.core.validators.MinValueValidator(0.0)]
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "spread alert",
+                "verbose_name_plural": "spread alerts",
+            },
+        ),
+    ]
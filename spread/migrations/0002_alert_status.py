@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("spread", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="spreadalert",
+            name="evaluated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="spreadalert",
+            name="last_spread",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="spreadalert",
+            name="status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("GRATER", "GREATER"),
+                    ("SMALLER", "SMALLER"),
+                    ("EQUAL", "EQUAL"),
+                ],
+                max_length=7,
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="SpreadAlertStatusChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "previous_status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("GRATER", "GREATER"),
+                            ("SMALLER", "SMALLER"),
+                            ("EQUAL", "EQUAL"),
+                        ],
+                        max_length=7,
+                        null=True,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("GRATER", "GREATER"),
+                            ("SMALLER", "SMALLER"),
+                            ("EQUAL", "EQUAL"),
+                        ],
+                        max_length=7,
+                    ),
+                ),
+                ("spread", models.FloatField()),
+                ("changed_at", models.DateTimeField()),
+                (
+                    "alert",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="status_changes",
+                        to="spread.spreadalert",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "spread alert status change",
+                "verbose_name_plural": "spread alert status changes",
+                "indexes": [
+                    models.Index(
+                        fields=["alert", "changed_at"],
+                        name="spread_spre_alert_i_427738_idx",
+                    )
+                ],
+            },
+        ),
+    ]
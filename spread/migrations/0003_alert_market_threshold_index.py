@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("spread", "0002_alert_status"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="spreadalert",
+            index=models.Index(
+                fields=["market_id", "alert_threshold"],
+                name="spread_spre_market__3d140a_idx",
+            ),
+        ),
+    ]
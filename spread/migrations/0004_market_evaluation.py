@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("spread", "0003_alert_market_threshold_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MarketEvaluation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("market_id", models.TextField(unique=True)),
+                ("spread", models.FloatField()),
+                ("evaluated_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "market evaluation",
+                "verbose_name_plural": "market evaluations",
+            },
+        ),
+        migrations.RemoveField(
+            model_name="spreadalert",
+            name="last_spread",
+        ),
+        migrations.RenameField(
+            model_name="spreadalert",
+            old_name="evaluated_at",
+            new_name="status_changed_at",
+        ),
+    ]
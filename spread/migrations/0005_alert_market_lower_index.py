@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:30
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("spread", "0004_market_evaluation"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="spreadalert",
+            index=models.Index(
+                django.db.models.functions.text.Lower("market_id"),
+                models.F("id"),
+                name="spread_alert_market_lower_idx",
+            ),
+        ),
+    ]
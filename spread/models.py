@@ -1,12 +1,66 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 
+from .services.types import SpreadAlertStatus
+
+
+STATUS_CHOICES = [(status.value, status.name) for status in SpreadAlertStatus]
+
 
 class SpreadAlert(models.Model):
     market_id = models.TextField()
     alert_threshold = models.FloatField(validators=[MinValueValidator(0.0)])
+    # Materialized by the alert evaluator whenever the status changes, null
+    # until the alert is first evaluated. Only current while the evaluation
+    # of its market is, see MarketEvaluation.
+    status = models.CharField(
+        max_length=7, choices=STATUS_CHOICES, null=True, blank=True
+    )
+    status_changed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         verbose_name = _("spread alert")
         verbose_name_plural = _("spread alerts")
+        indexes = [
+            # Per-market alert scans, optionally narrowed to a threshold range
+            models.Index(fields=["market_id", "alert_threshold"]),
+            # Case-insensitive market filter of the alert list, in id order
+            models.Index(
+                Lower("market_id"), "id", name="spread_alert_market_lower_idx"
+            ),
+        ]
+
+
+class SpreadAlertStatusChange(models.Model):
+    alert = models.ForeignKey(
+        SpreadAlert, on_delete=models.CASCADE, related_name="status_changes"
+    )
+    previous_status = models.CharField(
+        max_length=7, choices=STATUS_CHOICES, null=True, blank=True
+    )
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES)
+    spread = models.FloatField()
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("spread alert status change")
+        verbose_name_plural = _("spread alert status changes")
+        indexes = [models.Index(fields=["alert", "changed_at"])]
+
+
+class MarketEvaluation(models.Model):
+    """
+    Last spread of a market the alert evaluator ran on, rewritten every
+    round. Alert statuses of the market are current as of `evaluated_at`.
+    """
+
+    # Lowercased, as markets are matched case-insensitively
+    market_id = models.TextField(unique=True)
+    spread = models.FloatField()
+    evaluated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("market evaluation")
+        verbose_name_plural = _("market evaluations")
@@ -1,27 +1,90 @@
 from spread.services.types import MarketSpread
 from spread.services.types import SpreadAlertTracking
+from spread.services.order_book import OrderBookSpread
+from spread.services.history import RESOLUTIONS
+from spread.services.history import SpreadHistoryPoint
 
 from spread.models import SpreadAlert
 
 from rest_framework_dataclasses.serializers import DataclassSerializer
 from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import Serializer
+from rest_framework.serializers import BooleanField
+from rest_framework.serializers import CharField
+from rest_framework.serializers import ChoiceField
+from rest_framework.serializers import DateTimeField
+from rest_framework.serializers import DictField
+from rest_framework.serializers import FloatField
+from rest_framework.serializers import IntegerField
+from rest_framework.serializers import ListField
 from rest_framework.exceptions import ValidationError
 
+from django.conf import settings
+from django.utils import timezone
+
+from spread.services.markets import get_markets
 from spread.services.markets import market_exists
 
 from spread.clients.buda.types import Market
 
+from spread.listing import ListQuerySerializer
+
 
 class MarketSerializer(DataclassSerializer):
     class Meta:
         dataclass = Market
 
 
+class MarketListQuerySerializer(ListQuerySerializer):
+    quote_currency = CharField(required=False)
+    base_currency = CharField(required=False)
+    disabled = BooleanField(required=False, allow_null=True, default=None)
+
+
 class MarketSpreadDataSerializer(DataclassSerializer):
     class Meta:
         dataclass = MarketSpread
 
 
+class MarketSpreadListQuerySerializer(ListQuerySerializer):
+    quote_currency = CharField(required=False)
+
+
+class OrderBookSpreadSerializer(DataclassSerializer):
+    class Meta:
+        dataclass = OrderBookSpread
+
+
+class OrderBookSpreadQuerySerializer(Serializer):
+    notional = FloatField(min_value=0.0, default=0.0)
+    depth_bps = FloatField(min_value=0.0, default=10.0)
+
+
+class SpreadHistoryPointSerializer(DataclassSerializer):
+    class Meta:
+        dataclass = SpreadHistoryPoint
+
+
+class SpreadHistoryQuerySerializer(Serializer):
+    to = DateTimeField(required=False)
+    resolution = ChoiceField(choices=RESOLUTIONS, default="1m")
+
+    def get_fields(self):
+        # "from" is a keyword, so it can't be declared as a class attribute
+        fields = super().get_fields()
+        fields["from"] = DateTimeField(required=False)
+        return fields
+
+    def validate(self, attrs):
+        end = attrs.get("to") or timezone.now()
+        start = attrs.pop("from", None) or end - settings.SPREAD_HISTORY_DEFAULT_RANGE
+        if start > end:
+            raise ValidationError({"from": "Must not be later than 'to'"})
+        attrs["start"], attrs["end"] = start, end
+        attrs.pop("to", None)
+        return attrs
+
+
 class SpreadAlertCreateSerializer(ModelSerializer):
     class Meta:
         model = SpreadAlert
@@ -39,12 +102,65 @@ class SpreadAlertSerializer(ModelSerializer):
         fields = ["id", "market_id", "alert_threshold"]
 
     def validate_market_id(self, market_id):
-        if not market_exists(market_id):
+        # Bulk creation checks every item against a single catalogue load
+        market_ids = self.context.get("market_ids")
+        if market_ids is None:
+            exists = market_exists(market_id)
+        else:
+            exists = market_id.lower() in market_ids
+        if not exists:
             msg = "Cannot track spread for non-existing market"
             raise ValidationError(msg)
         return market_id
 
 
+class SpreadAlertBulkCreateSerializer(Serializer):
+    alerts = ListField(
+        child=DictField(),
+        min_length=1,
+        max_length=settings.SPREAD_ALERT_BULK_MAX_ITEMS,
+    )
+
+    def validate_alerts(self, alerts):
+        """
+        Validates each alert on its own, so invalid ones are reported by
+        position instead of rejecting the whole batch.
+        """
+        context = {"market_ids": {market.id.lower() for market in get_markets()}}
+        valid, errors = [], []
+        for index, data in enumerate(alerts):
+            item = SpreadAlertSerializer(data=data, context=context)
+            if item.is_valid():
+                valid.append(SpreadAlert(**item.validated_data))
+            else:
+                errors.append({"index": index, "errors": item.errors})
+        return {"valid": valid, "errors": errors}
+
+
+class SpreadAlertListQuerySerializer(ListQuerySerializer):
+    cursor_type = int
+
+    market_id = CharField(required=False)
+
+
+class SpreadAlertBulkErrorSerializer(Serializer):
+    index = IntegerField()
+    errors = DictField()
+
+
+class SpreadAlertBulkResultSerializer(Serializer):
+    created = SpreadAlertSerializer(many=True)
+    errors = SpreadAlertBulkErrorSerializer(many=True)
+
+
 class SpreadAlertTrackingSerializer(DataclassSerializer):
     class Meta:
         dataclass = SpreadAlertTracking
+
+
+class SpreadAlertStatusQuerySerializer(Serializer):
+    ids = ListField(
+        child=IntegerField(min_value=1),
+        min_length=1,
+        max_length=settings.SPREAD_ALERT_STATUS_MAX_IDS,
+    )
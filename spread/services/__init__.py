@@ -1,8 +1,12 @@
+from .spread import aget_all_spreads
+from .spread import aget_market_spread
 from .spread import get_all_spreads
 from .spread import get_market_spread
 
 
 __all__ = [
+    "aget_all_spreads",
+    "aget_market_spread",
     "get_all_spreads",
     "get_market_spread",
 ]
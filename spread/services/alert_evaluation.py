@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import transaction
+
+from ..models import MarketEvaluation
+from ..models import SpreadAlert
+from ..models import SpreadAlertStatusChange
+from .threshold_index import ThresholdIndex
+from .types import MarketSpread
+from .types import SpreadAlertStatus
+
+
+class AlertEvaluator:
+    """
+    Materializes the status of every alert from successive market spreads.
+
+    The last evaluated spread of each market is kept in memory. When it
+    moves, only the alerts with a threshold between the old and the new
+    spread can change status, so only those rows are read; the ones that
+    did change are written back with a single bulk_update along with their
+    status change log. Alerts created since the previous round are picked
+    up by id and evaluated once whatever the spread moved.
+
+    Every round also upserts the MarketEvaluation of each market, which
+    carries its current spread and tells readers how fresh the stored
+    statuses are without touching the alert rows.
+    """
+
+    def __init__(
+        self,
+        reload_interval: float,
+        batch_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.reload_interval = reload_interval
+        self.batch_size = batch_size
+        self.clock = clock
+        # Own index rather than the process-wide one: alerts are created by
+        # other processes, whose signals never reach this one
+        self.index = ThresholdIndex()
+        self._spreads: dict[str, float] = {}
+        self._last_alert_id = 0
+        self._loaded_at: float | None = None
+
+    @classmethod
+    def from_settings(cls) -> AlertEvaluator:
+        return cls(
+            reload_interval=settings.SPREAD_ALERT_INDEX_RELOAD_INTERVAL,
+            batch_size=settings.SPREAD_ALERT_BATCH_SIZE,
+        )
+
+    def _load(self) -> None:
+        alerts = list(
+            SpreadAlert.objects.values_list("pk", "market_id", "alert_threshold")
+        )
+        self.index.load(alerts)
+        if self._loaded_at is None:
+            # Later reloads leave new alerts to be picked up, and evaluated,
+            # as such
+            self._last_alert_id = max((alert[0] for alert in alerts), default=0)
+        self._loaded_at = self.clock()
+
+    def _new_alert_ids(self) -> set[int]:
+        if (
+            self._loaded_at is None
+            or self.clock() - self._loaded_at > self.reload_interval
+        ):
+            # Deleted alerts only leave the index on a full reload
+            self._load()
+        alerts = SpreadAlert.objects.filter(pk__gt=self._last_alert_id).values_list(
+            "pk", "market_id", "alert_threshold"
+        )
+        new_ids = set()
+        for alert_id, market_id, threshold in alerts:
+            self.index.add(alert_id, market_id, threshold)
+            new_ids.add(alert_id)
+            self._last_alert_id = max(self._last_alert_id, alert_id)
+        return new_ids
+
+    def _candidates(self, spreads: dict[str, float]) -> set[int]:
+        candidates = set()
+        for market_id, spread in spreads.items():
+            previous = self._spreads.get(market_id)
+            if previous is None:
+                # First spread of the market, every stored status is checked
+                crossed = self.index.alerts(market_id)
+            else:
+                crossed = self.index.crossings(market_id, previous, spread)
+            candidates.update(alert_id for _, alert_id in crossed)
+        return candidates
+
+    def _fetch(self, alert_ids: list[int]) -> Iterable[SpreadAlert]:
+        # Batched to stay under the database's bound parameter limit
+        for start in range(0, len(alert_ids), self.batch_size):
+            yield from SpreadAlert.objects.filter(
+                pk__in=alert_ids[start : start + self.batch_size]
+            ).only("market_id", "alert_threshold", "status")
+
+    def evaluate(
+        self, market_spreads: Iterable[MarketSpread]
+    ) -> list[SpreadAlertStatusChange]:
+        """Stores the alerts whose status changed and returns their changes."""
+        spreads = {
+            spread.market_id.lower(): float(spread.spread_amount)
+            for spread in market_spreads
+        }
+        candidates = self._new_alert_ids() | self._candidates(spreads)
+        self._spreads.update(spreads)
+        now = datetime.now(timezone.utc)
+        if not candidates:
+            self._mark_evaluated(spreads, now)
+            return []
+
+        changed, changes = [], []
+        for alert in self._fetch(sorted(candidates)):
+            spread = self._spreads.get(alert.market_id.lower())
+            if spread is None:
+                continue
+            status = SpreadAlertStatus.from_difference(spread, alert.alert_threshold)
+            if alert.status == status.value:
+                continue
+            changes.append(
+                SpreadAlertStatusChange(
+                    alert=alert,
+                    previous_status=alert.status,
+                    status=status.value,
+                    spread=spread,
+                    changed_at=now,
+                )
+            )
+            alert.status = status.value
+            alert.status_changed_at = now
+            changed.append(alert)
+
+        # A single transaction, so an evaluation never vouches for statuses
+        # that were not written
+        with transaction.atomic():
+            SpreadAlert.objects.bulk_update(
+                changed,
+                ["status", "status_changed_at"],
+                batch_size=self.batch_size,
+            )
+            SpreadAlertStatusChange.objects.bulk_create(
+                changes, batch_size=self.batch_size
+            )
+            self._mark_evaluated(spreads, now)
+        return changes
+
+    def _mark_evaluated(self, spreads: dict[str, float], now: datetime) -> None:
+        MarketEvaluation.objects.bulk_create(
+            [
+                MarketEvaluation(market_id=market_id, spread=spread, evaluated_at=now)
+                for market_id, spread in spreads.items()
+            ],
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=["market_id"],
+            update_fields=["spread", "evaluated_at"],
+        )
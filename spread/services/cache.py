@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from aiohttp import ClientError
+
+from spread.clients.buda.types import Ticker
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+
+
+@dataclass
+class CachedTicker:
+    ticker: Ticker
+    updated_at: datetime
+    fetched_at: float
+
+
+class TickerCache:
+    """
+    Per-market ticker cache meant to live on the client runtime loop.
+
+    Fresh entries are served for `ttl` seconds. Past that and up to
+    `max_stale` seconds they are still served while a single background
+    refresh runs (stale-while-revalidate). When the refresh of an older
+    entry fails it is still served up to `max_stale_if_error` seconds past
+    the ttl. Concurrent misses for the same market share one upstream
+    request and the least recently used entries are evicted past `max_size`.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[Ticker]],
+        ttl: float,
+        max_stale: float,
+        max_size: int,
+        max_stale_if_error: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_size = max_size
+        self.max_stale_if_error = max_stale_if_error
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, CachedTicker] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        # Markets of the last put_all, served as a whole by peek_all
+        self._all: list[str] | None = None
+
+    async def get(self, market_id: str) -> CachedTicker:
+        entry = self._entries.get(market_id)
+        if entry is not None:
+            age = self.clock() - entry.fetched_at
+            if age <= self.ttl:
+                self.stats.hits += 1
+                self._entries.move_to_end(market_id)
+                return entry
+            if age <= self.ttl + self.max_stale:
+                self.stats.stale += 1
+                self._entries.move_to_end(market_id)
+                self._refresh(market_id)
+                return entry
+        self.stats.misses += 1
+        try:
+            return await asyncio.shield(self._refresh(market_id))
+        except (ClientError, asyncio.TimeoutError):
+            if entry is None or age > self.ttl + self.max_stale_if_error:
+                raise
+            self.stats.stale += 1
+            return entry
+
+    def peek(self, market_id: str) -> CachedTicker | None:
+        """Fresh entry of the market if there is one, without side effects."""
+        entry = self._entries.get(market_id)
+        if entry is None or self.clock() - entry.fetched_at > self.ttl:
+            return None
+        return entry
+
+    def put(self, market_id: str, ticker: Ticker) -> CachedTicker:
+        entry = CachedTicker(
+            ticker=ticker,
+            updated_at=datetime.now(timezone.utc),
+            fetched_at=self.clock(),
+        )
+        self._entries[market_id] = entry
+        self._entries.move_to_end(market_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return entry
+
+    def put_all(self, tickers: list[Ticker]) -> list[CachedTicker]:
+        """Stores the tickers of every market, as one list for peek_all."""
+        entries = [self.put(ticker.market_id, ticker) for ticker in tickers]
+        self._all = [ticker.market_id for ticker in tickers]
+        return entries
+
+    def peek_all(self) -> list[CachedTicker] | None:
+        """
+        Entries of the last put_all while every one of them is fresh, so the
+        same list is served, and versioned, until the ttl runs out.
+        """
+        if self._all is None:
+            return None
+        entries = []
+        for market_id in self._all:
+            entry = self.peek(market_id)
+            if entry is None:
+                return None
+            entries.append(entry)
+        return entries
+
+    def clear(self) -> None:
+        """
+        Drops every entry along with the refreshes in flight, which are
+        cancelled so they do not store a ticker fetched before the clear.
+        May be called from outside the loop the refreshes run on.
+        """
+        tasks = list(self._in_flight.values())
+        self._in_flight.clear()
+        for task in tasks:
+            if not task.done():
+                task.get_loop().call_soon_threadsafe(task.cancel)
+        self._entries.clear()
+        self._all = None
+        self.stats = CacheStats()
+
+    def _refresh(self, market_id: str) -> asyncio.Task:
+        task = self._in_flight.get(market_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load(market_id))
+            task.add_done_callback(self._forget_refresh_error)
+            self._in_flight[market_id] = task
+        return task
+
+    async def _load(self, market_id: str) -> CachedTicker:
+        task = asyncio.current_task()
+        try:
+            ticker = await self.fetch(market_id)
+        finally:
+            # Unless the cache was cleared meanwhile, and possibly another
+            # refresh of the market started since
+            current = self._in_flight.get(market_id) is task
+            if current:
+                del self._in_flight[market_id]
+        if not current:
+            return CachedTicker(ticker, datetime.now(timezone.utc), self.clock())
+        return self.put(market_id, ticker)
+
+    @staticmethod
+    def _forget_refresh_error(task: asyncio.Task) -> None:
+        # Background refreshes have no awaiter, a failure just keeps the
+        # stale entry around until the next attempt.
+        if not task.cancelled():
+            task.exception()
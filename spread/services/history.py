@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from django.conf import settings
+
+from ..metrics import timed
+from .cache import CachedTicker
+from .types import MarketSpread
+
+
+RAW = "raw"
+ROLLUP_WIDTHS = {"1m": 60, "1h": 3600}
+RESOLUTIONS = (RAW, *ROLLUP_WIDTHS)
+
+RAW_COLUMNS = ("timestamp", "spread")
+ROLLUP_COLUMNS = ("timestamp", "open", "high", "low", "close", "mean", "count")
+
+MARKET_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+COLUMN_DTYPE = np.dtype("<f8")
+
+
+class ColumnTable:
+    """
+    Append-only table stored as one little-endian float64 file per column,
+    sorted by its timestamp column. There is a single writer; readers map
+    the files and ignore a trailing row that is only partially written.
+    Such a row, left behind by a writer that died mid-append, is cut off
+    before the next append so the columns stay aligned.
+    """
+
+    def __init__(self, path: Path, columns: tuple[str, ...]):
+        self.path = path
+        self.columns = columns
+
+    def _column_path(self, column: str) -> Path:
+        return self.path / f"{column}.f8"
+
+    def __len__(self) -> int:
+        sizes = []
+        for column in self.columns:
+            try:
+                sizes.append(self._column_path(column).stat().st_size)
+            except FileNotFoundError:
+                return 0
+        return min(sizes) // COLUMN_DTYPE.itemsize
+
+    def append(self, rows: dict[str, np.ndarray]) -> None:
+        if not len(rows["timestamp"]):
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        size = len(self) * COLUMN_DTYPE.itemsize
+        for column in self.columns:
+            with open(self._column_path(column), "ab") as column_file:
+                # Readers never map past the shortest column, so nothing
+                # they read is truncated
+                column_file.truncate(size)
+                column_file.write(np.asarray(rows[column], COLUMN_DTYPE).tobytes())
+
+    def _read_column(self, column: str, start: int, end: int) -> np.ndarray:
+        if start >= end:
+            return np.empty(0, COLUMN_DTYPE)
+        return np.memmap(
+            self._column_path(column),
+            dtype=COLUMN_DTYPE,
+            mode="r",
+            offset=start * COLUMN_DTYPE.itemsize,
+            shape=(end - start,),
+        )
+
+    def slice(self, start: int, end: int) -> dict[str, np.ndarray]:
+        return {
+            column: self._read_column(column, start, end) for column in self.columns
+        }
+
+    def between(self, start: float, end: float) -> dict[str, np.ndarray]:
+        """Rows with start <= timestamp < end, found by binary search."""
+        timestamps = self._read_column("timestamp", 0, len(self))
+        first = int(np.searchsorted(timestamps, start, side="left"))
+        last = int(np.searchsorted(timestamps, end, side="left"))
+        return self.slice(first, last)
+
+    def last_timestamp(self) -> float | None:
+        size = len(self)
+        if not size:
+            return None
+        return float(self._read_column("timestamp", size - 1, size)[0])
+
+
+def _aggregate(rows: dict[str, np.ndarray], width: int) -> dict[str, np.ndarray]:
+    """Group OHLC rows into buckets `width` seconds wide."""
+    buckets = np.floor_divide(rows["timestamp"], width) * width
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    counts = np.add.reduceat(rows["count"], starts)
+    weighted = np.add.reduceat(rows["mean"] * rows["count"], starts)
+    return {
+        "timestamp": buckets[starts],
+        "open": rows["open"][starts],
+        "high": np.maximum.reduceat(rows["high"], starts),
+        "low": np.minimum.reduceat(rows["low"], starts),
+        "close": rows["close"][ends],
+        "mean": weighted / counts,
+        "count": counts,
+    }
+
+
+def _raw_as_rollup(rows: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    spreads = rows["spread"]
+    return {
+        "timestamp": rows["timestamp"],
+        "open": spreads,
+        "high": spreads,
+        "low": spreads,
+        "close": spreads,
+        "mean": spreads,
+        "count": np.ones_like(spreads),
+    }
+
+
+@dataclass
+class SpreadHistoryPoint:
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    mean: float
+    count: int
+
+
+class SpreadHistoryStore:
+    """
+    Spread samples of every market under `root/<market>/raw`, rolled up
+    into 1 minute and 1 hour OHLC tiers under `root/<market>/<tier>`.
+    A query only reads the tier of the requested resolution.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _table(self, market_id: str, resolution: str) -> ColumnTable:
+        if not MARKET_ID_PATTERN.match(market_id):
+            raise ValueError(f"Invalid market id {market_id!r}")
+        columns = RAW_COLUMNS if resolution == RAW else ROLLUP_COLUMNS
+        return ColumnTable(self.root / market_id.lower() / resolution, columns)
+
+    def markets(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+
+    def append(self, market_id: str, timestamps, spreads) -> None:
+        self._table(market_id, RAW).append({"timestamp": timestamps, "spread": spreads})
+
+    def record(self, spreads: list[tuple[MarketSpread, datetime]]) -> None:
+        for spread, updated_at in spreads:
+            self.append(
+                spread.market_id, [updated_at.timestamp()], [spread.spread_amount]
+            )
+
+    def rollup(self, market_id: str, now: float | None = None) -> None:
+        """Aggregate every bucket that closed since the last rollup."""
+        now = time.time() if now is None else now
+        source = self._table(market_id, RAW)
+        for resolution, width in ROLLUP_WIDTHS.items():
+            target = self._table(market_id, resolution)
+            last = target.last_timestamp()
+            start = -np.inf if last is None else last + width
+            end = (now // width) * width
+            rows = source.between(start, end)
+            if source.columns == RAW_COLUMNS:
+                rows = _raw_as_rollup(rows)
+            if len(rows["timestamp"]):
+                target.append(_aggregate(rows, width))
+            source = target
+
+    def rollup_all(self, now: float | None = None) -> None:
+        for market_id in self.markets():
+            self.rollup(market_id, now)
+
+    def query(
+        self, market_id: str, start: datetime, end: datetime, resolution: str
+    ) -> list[SpreadHistoryPoint]:
+        rows = self._table(market_id, resolution).between(
+            start.timestamp(), end.timestamp()
+        )
+        if resolution == RAW:
+            rows = _raw_as_rollup(rows)
+        return [
+            SpreadHistoryPoint(
+                datetime.fromtimestamp(timestamp, timezone.utc),
+                open_,
+                high,
+                low,
+                close,
+                mean,
+                int(count),
+            )
+            for timestamp, open_, high, low, close, mean, count in zip(
+                *(rows[column].tolist() for column in ROLLUP_COLUMNS)
+            )
+        ]
+
+
+spread_history = SpreadHistoryStore(settings.SPREAD_HISTORY_DIR)
+
+
+def record_tickers(tickers: list[CachedTicker]) -> None:
+    spread_history.record(
+        [
+            (MarketSpread.from_ticker(cached.ticker), cached.updated_at)
+            for cached in tickers
+        ]
+    )
+
+
+@timed()
+def get_spread_history(
+    market_id: str, start: datetime, end: datetime, resolution: str
+) -> list[SpreadHistoryPoint]:
+    return spread_history.query(market_id, start, end, resolution)
@@ -1,44 +1,155 @@
-from spread.clients.buda import BudaAPIClient
-from spread.clients.buda.types import Market
-
 import asyncio
-from aiohttp.client_exceptions import ClientResponseError
+import hashlib
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+from aiohttp import ClientError
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+
+from spread.clients.buda.runtime import runtime
+from spread.clients.buda.types import Market
+from spread.metrics import timed
 
 
 class ObjectDoesNotExist(Exception):
     ...
 
 
+class MarketRegistry:
+    """
+    In-process copy of the Buda market catalogue.
+
+    The catalogue is fetched on first use and refreshed once it is older
+    than `refresh_interval` seconds. Lookups are case-insensitive, like
+    the upstream API. If a refresh fails the previous catalogue is kept.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._markets: MappingProxyType[str, Market] = MappingProxyType({})
+        self._next_refresh: float | None = None
+        # Digest of the catalogue contents, the same in every process
+        self.digest: str | None = None
+        self.updated_at: datetime | None = None
+
+    @property
+    def expired(self) -> bool:
+        return self._next_refresh is None or self.clock() >= self._next_refresh
+
+    def load(self, markets: list[Market]) -> None:
+        self._markets = MappingProxyType(
+            {market.id.lower(): market for market in markets}
+        )
+        self.digest = hashlib.md5(repr(markets).encode()).hexdigest()
+        self.updated_at = datetime.now(timezone.utc)
+        self._next_refresh = self.clock() + self.refresh_interval
+
+    def clear(self) -> None:
+        with self._lock:
+            self._markets = MappingProxyType({})
+            self._next_refresh = None
+            self.digest = None
+            self.updated_at = None
+
+    def refresh(self, fetch: Callable[[], list[Market]]) -> None:
+        with self._lock:
+            if not self.expired:
+                return
+            try:
+                markets = fetch()
+            except (ClientError, asyncio.TimeoutError):
+                if self._next_refresh is None:
+                    raise
+                self._next_refresh = self.clock() + self.refresh_interval
+                return
+            self.load(markets)
+
+    def all(self) -> list[Market]:
+        return list(self._markets.values())
+
+    def get(self, market_id: str) -> Market | None:
+        return self._markets.get(market_id.lower())
+
+    def __contains__(self, market_id: str) -> bool:
+        return market_id.lower() in self._markets
+
+
+market_registry = MarketRegistry(
+    refresh_interval=settings.SPREAD_MARKET_REGISTRY_REFRESH_INTERVAL,
+)
+
+
+def _fetch_markets() -> list[Market]:
+    client = runtime.client()
+    return runtime.run(client.get_markets())
+
+
+def _load_market_registry() -> MarketRegistry:
+    if market_registry.expired:
+        market_registry.refresh(_fetch_markets)
+    return market_registry
+
+
+@timed()
 def get_markets() -> list[Market]:
-    client = BudaAPIClient()
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        markets = loop.run_until_complete(client.get_markets())
-        loop.run_until_complete(client.close())
-    finally:
-        loop.close()
-    return markets
+    return _load_market_registry().all()
 
 
+@timed()
 def get_market(market_id) -> Market:
-    client = BudaAPIClient()
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        market = loop.run_until_complete(client.get_market(market_id))
-        loop.run_until_complete(client.close())
-    except ClientResponseError as exc:
-        if exc.status == 404:
-            raise ObjectDoesNotExist from exc
-    finally:
-        loop.close()
+    market = _load_market_registry().get(market_id)
+    if market is None:
+        raise ObjectDoesNotExist
     return market
 
 
 def market_exists(market_id: str) -> bool:
-    try:
-        get_market(market_id)
-    except ObjectDoesNotExist:
-        return False
-    return True
+    return market_id in _load_market_registry()
+
+
+def peek_markets() -> list[Market] | None:
+    """Markets if the catalogue is loaded and fresh, without fetching it."""
+    if market_registry.expired:
+        return None
+    return market_registry.all()
+
+
+def peek_market(market_id: str) -> Market | None:
+    if market_registry.expired:
+        return None
+    return market_registry.get(market_id)
+
+
+async def _aload_market_registry() -> MarketRegistry:
+    if market_registry.expired:
+        refresh = sync_to_async(market_registry.refresh, thread_sensitive=False)
+        await refresh(_fetch_markets)
+    return market_registry
+
+
+@timed()
+async def aget_markets() -> list[Market]:
+    return (await _aload_market_registry()).all()
+
+
+@timed()
+async def aget_market(market_id) -> Market:
+    market = (await _aload_market_registry()).get(market_id)
+    if market is None:
+        raise ObjectDoesNotExist
+    return market
+
+
+async def amarket_exists(market_id: str) -> bool:
+    return market_id in await _aload_market_registry()
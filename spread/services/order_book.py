@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from spread.clients.buda.runtime import runtime
+from spread.clients.buda.types import OrderBook
+from spread.metrics import timed
+
+from .markets import aget_market
+from .markets import get_market
+
+
+@dataclass
+class OrderBookSpread:
+    market_id: str
+    best_ask: float | None
+    best_bid: float | None
+    spread_amount: float | None
+    notional: float
+    effective_ask: float | None
+    effective_bid: float | None
+    effective_spread_amount: float | None
+    depth_bps: float
+    ask_depth: float
+    bid_depth: float
+
+
+def _fill_price(
+    prices: np.ndarray, amounts: np.ndarray, notional: float
+) -> float | None:
+    """
+    Volume weighted price paid for `notional` (quote currency) walking the
+    levels in order, or None when the book is not deep enough.
+    """
+    if notional <= 0 or prices.size == 0:
+        return None
+    cumulative_notional = np.cumsum(prices * amounts)
+    last = int(np.searchsorted(cumulative_notional, notional))
+    if last == prices.size:
+        return None
+    filled_notional = cumulative_notional[last - 1] if last else 0.0
+    filled_amount = amounts[:last].sum()
+    filled_amount += (notional - filled_notional) / prices[last]
+    return notional / filled_amount
+
+
+@timed()
+def compute_order_book_spread(
+    market_id: str,
+    order_book: OrderBook,
+    notional: float,
+    depth_bps: float,
+) -> OrderBookSpread:
+    # Asks come sorted by ascending price and bids by descending price
+    ask_prices, ask_amounts = order_book.asks.prices, order_book.asks.amounts
+    bid_prices, bid_amounts = order_book.bids.prices, order_book.bids.amounts
+
+    best_ask = float(ask_prices[0]) if ask_prices.size else None
+    best_bid = float(bid_prices[0]) if bid_prices.size else None
+    spread_amount = None
+    ask_depth = bid_depth = 0.0
+    if best_ask is not None and best_bid is not None:
+        spread_amount = max(best_ask - best_bid, 0.0)
+        mid = (best_ask + best_bid) / 2
+        band = mid * depth_bps / 10_000
+        asks_in_band = np.searchsorted(ask_prices, mid + band, side="right")
+        # Bids at or above the band, counted from the top of their reversed
+        # view, which is ascending and, unlike negating the prices, copies
+        # nothing
+        bids_in_band = bid_prices.size - np.searchsorted(bid_prices[::-1], mid - band)
+        ask_depth = float(ask_amounts[:asks_in_band].sum())
+        bid_depth = float(bid_amounts[:bids_in_band].sum())
+
+    effective_ask = _fill_price(ask_prices, ask_amounts, notional)
+    effective_bid = _fill_price(bid_prices, bid_amounts, notional)
+    effective_spread_amount = None
+    if effective_ask is not None and effective_bid is not None:
+        effective_spread_amount = max(effective_ask - effective_bid, 0.0)
+
+    return OrderBookSpread(
+        market_id=market_id,
+        best_ask=best_ask,
+        best_bid=best_bid,
+        spread_amount=spread_amount,
+        notional=notional,
+        effective_ask=effective_ask,
+        effective_bid=effective_bid,
+        effective_spread_amount=effective_spread_amount,
+        depth_bps=depth_bps,
+        ask_depth=ask_depth,
+        bid_depth=bid_depth,
+    )
+
+
+@timed()
+def get_order_book_spread(
+    market_id: str, notional: float, depth_bps: float
+) -> OrderBookSpread:
+    market = get_market(market_id)
+    client = runtime.client()
+    order_book = runtime.run(client.get_order_book(market.id))
+    return compute_order_book_spread(market.id, order_book, notional, depth_bps)
+
+
+@timed()
+async def aget_order_book_spread(
+    market_id: str, notional: float, depth_bps: float
+) -> OrderBookSpread:
+    market = await aget_market(market_id)
+    client = runtime.client()
+    order_book = await runtime.arun(client.get_order_book(market.id))
+    return compute_order_book_spread(market.id, order_book, notional, depth_bps)
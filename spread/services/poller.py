@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+from aiohttp import ClientError
+
+from django.conf import settings
+
+from spread.clients.buda.runtime import runtime
+from spread.clients.buda.types import Ticker
+
+from .cache import CachedTicker
+
+
+ALL_MARKETS = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MarketDataSnapshot:
+    """
+    Immutable view of the last known ticker of every market, keyed by
+    lower-cased market id. A new snapshot is published on every poll.
+    """
+
+    tickers: Mapping[str, CachedTicker] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+    version: int = 0
+    published_at: float | None = None
+
+    @property
+    def age(self) -> float | None:
+        if self.published_at is None:
+            return None
+        return time.monotonic() - self.published_at
+
+    def get(self, market_id: str) -> CachedTicker | None:
+        return self.tickers.get(market_id.lower())
+
+    def merge(self, tickers: list[Ticker]) -> MarketDataSnapshot:
+        now = time.monotonic()
+        updated_at = datetime.now(timezone.utc)
+        entries = dict(self.tickers)
+        for ticker in tickers:
+            entries[ticker.market_id.lower()] = CachedTicker(ticker, updated_at, now)
+        return MarketDataSnapshot(
+            tickers=MappingProxyType(entries),
+            version=self.version + 1,
+            published_at=now,
+        )
+
+
+class MarketDataPoller:
+    """
+    Refreshes every ticker through the bulk endpoint each `interval`
+    seconds and, on top of that, polls the markets listed in
+    `market_intervals` on their own (shorter) schedule. Each poll publishes
+    a new snapshot that readers pick up without any I/O.
+    """
+
+    def __init__(
+        self,
+        fetch_all: Callable[[], Awaitable[list[Ticker]]],
+        fetch_one: Callable[[str], Awaitable[Ticker]],
+        interval: float,
+        market_intervals: Mapping[str, float] | None = None,
+        on_publish: Callable[[list[CachedTicker]], None] | None = None,
+    ):
+        self.fetch_all = fetch_all
+        self.fetch_one = fetch_one
+        self.interval = interval
+        self.market_intervals = dict(market_intervals or {})
+        self.on_publish = on_publish
+        self.snapshot = MarketDataSnapshot()
+        self._task: asyncio.Task | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(
+        cls, on_publish: Callable[[list[CachedTicker]], None] | None = None
+    ) -> MarketDataPoller:
+        return cls(
+            fetch_all=_fetch_all_tickers,
+            fetch_one=_fetch_ticker,
+            interval=settings.SPREAD_POLLER_INTERVAL,
+            market_intervals=settings.SPREAD_POLLER_MARKET_INTERVALS,
+            on_publish=on_publish,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self._task = runtime.run(self._spawn())
+
+    def stop(self) -> None:
+        with self._lock:
+            if self.running:
+                runtime.loop.call_soon_threadsafe(self._task.cancel)
+            self._task = None
+
+    async def _spawn(self) -> asyncio.Task:
+        return asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        # (due, position, market_id): position breaks ties between jobs
+        # due at the same time without comparing market ids to None
+        jobs = [ALL_MARKETS, *self.market_intervals]
+        schedule = [
+            (0.0, position, market_id) for position, market_id in enumerate(jobs)
+        ]
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        while True:
+            due, position, market_id = heapq.heappop(schedule)
+            await asyncio.sleep(max(0.0, start + due - loop.time()))
+            try:
+                await self.poll(market_id)
+            except Exception:
+                # poll only absorbs upstream errors, anything else is logged
+                # here so one bad payload or subscriber does not end polling
+                logger.exception("Polling %s failed", market_id or "all markets")
+            interval = self.market_intervals.get(market_id, self.interval)
+            heapq.heappush(schedule, (due + interval, position, market_id))
+
+    async def poll(self, market_id: str | None = ALL_MARKETS) -> None:
+        try:
+            if market_id is ALL_MARKETS:
+                tickers = await self.fetch_all()
+            else:
+                tickers = [await self.fetch_one(market_id)]
+        except (ClientError, asyncio.TimeoutError):
+            # Keep serving the previous snapshot, the next poll retries
+            return
+        self.snapshot = self.snapshot.merge(tickers)
+        if self.on_publish is not None:
+            self.on_publish([self.snapshot.get(ticker.market_id) for ticker in tickers])
+
+
+async def _fetch_all_tickers() -> list[Ticker]:
+    client = runtime.client()
+    return await client.get_tickers()
+
+
+async def _fetch_ticker(market_id: str) -> Ticker:
+    client = runtime.client()
+    return await client.get_ticker(market_id)
+
+
+market_data_poller = MarketDataPoller.from_settings()
+
+
+def get_snapshot() -> MarketDataSnapshot | None:
+    """
+    Current market data snapshot, or None when polling is disabled. The
+    poller is started on first use in each worker process.
+    """
+    if not settings.SPREAD_POLLER_ENABLED:
+        return None
+    if not market_data_poller.running:
+        market_data_poller.start()
+    return market_data_poller.snapshot
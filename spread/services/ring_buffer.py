@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from django.conf import settings
+
+from .cache import CachedTicker
+from .types import MarketSpread
+
+
+MAGIC = b"SPRDRING"
+VERSION = 1
+
+# magic, version, capacity, records written so far
+HEADER = struct.Struct("<8sIIQ")
+HEADER_SIZE = 64
+WRITTEN_OFFSET = 16
+
+RECORD = np.dtype(
+    [
+        ("seq", "<u8"),
+        ("market_id", "S16"),
+        ("bid", "<f8"),
+        ("ask", "<f8"),
+        ("spread", "<f8"),
+        ("timestamp", "<f8"),
+    ]
+)
+SEQ = struct.Struct("<Q")
+FIELDS = struct.Struct("<16sdddd")
+
+
+@dataclass
+class SpreadRecord:
+    market_id: str
+    bid: float
+    ask: float
+    spread: float
+    timestamp: float
+
+    def to_market_spread(self) -> MarketSpread:
+        return MarketSpread(
+            self.market_id,
+            self.spread,
+            datetime.fromtimestamp(self.timestamp, timezone.utc),
+        )
+
+
+class SpreadRingBuffer:
+    """
+    Fixed-size ring of fixed-width spread records in a memory-mapped file.
+
+    One process appends (see `manage.py collect_market_data`) and every
+    worker maps the same file read-only. Each slot is guarded by its own
+    sequence number, odd while the slot is being written, so readers can
+    discard records that changed under them without taking any lock.
+    """
+
+    def __init__(self, path: Path, buffer: mmap.mmap, capacity: int, inode: int):
+        self.path = path
+        self.buffer = buffer
+        self.capacity = capacity
+        # Lets readers notice the writer replaced the file
+        self.inode = inode
+        self.records = np.frombuffer(
+            buffer, dtype=RECORD, count=capacity, offset=HEADER_SIZE
+        )
+
+    @classmethod
+    def create(cls, path: Path, capacity: int) -> SpreadRingBuffer:
+        """
+        Writer side. A compatible existing ring is reused so readers keep
+        their mapping, anything else is replaced atomically.
+        """
+        try:
+            ring_buffer = cls.open(path, writable=True)
+        except (FileNotFoundError, ValueError):
+            pass
+        else:
+            if ring_buffer.capacity == capacity:
+                return ring_buffer
+            ring_buffer.close()
+        size = HEADER_SIZE + capacity * RECORD.itemsize
+        staging = Path(f"{path}.{os.getpid()}")
+        with open(staging, "w+b") as ring_file:
+            ring_file.truncate(size)
+            buffer = mmap.mmap(ring_file.fileno(), size)
+            inode = os.fstat(ring_file.fileno()).st_ino
+        HEADER.pack_into(buffer, 0, MAGIC, VERSION, capacity, 0)
+        os.replace(staging, path)
+        return cls(path, buffer, capacity, inode)
+
+    @classmethod
+    def open(cls, path: Path, writable: bool = False) -> SpreadRingBuffer:
+        with open(path, "r+b" if writable else "rb") as ring_file:
+            stat = os.fstat(ring_file.fileno())
+            size = stat.st_size
+            if size < HEADER_SIZE:
+                raise ValueError(f"{path} is not a spread ring buffer")
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            buffer = mmap.mmap(ring_file.fileno(), 0, access=access)
+        magic, version, capacity, _ = HEADER.unpack_from(buffer, 0)
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or size != HEADER_SIZE + capacity * RECORD.itemsize
+        ):
+            buffer.close()
+            raise ValueError(f"{path} is not a spread ring buffer")
+        return cls(path, buffer, capacity, stat.st_ino)
+
+    @property
+    def written(self) -> int:
+        return SEQ.unpack_from(self.buffer, WRITTEN_OFFSET)[0]
+
+    def append(self, records: list[SpreadRecord]) -> None:
+        written = self.written
+        for record in records:
+            market_id = record.market_id.upper().encode()
+            if len(market_id) > RECORD["market_id"].itemsize:
+                continue
+            offset = HEADER_SIZE + (written % self.capacity) * RECORD.itemsize
+            SEQ.pack_into(self.buffer, offset, 2 * written + 1)
+            FIELDS.pack_into(
+                self.buffer,
+                offset + SEQ.size,
+                market_id,
+                record.bid,
+                record.ask,
+                record.spread,
+                record.timestamp,
+            )
+            SEQ.pack_into(self.buffer, offset, 2 * written + 2)
+            written += 1
+            SEQ.pack_into(self.buffer, WRITTEN_OFFSET, written)
+
+    def _stable(self, slots: np.ndarray | slice = slice(None)) -> np.ndarray:
+        """
+        Copies the given slots out of the mapping, dropping those that were
+        empty, being written, or rewritten while they were copied.
+        """
+        before = self.records["seq"][slots].copy()
+        records = self.records[slots].copy()
+        # A slot rewritten at any point of the copy has moved on by now
+        after = self.records["seq"][slots]
+        stable = (before == after) & (before % 2 == 0) & (before > 0)
+        return records[stable]
+
+    def latest(self, max_age: float | None = None) -> dict[str, SpreadRecord]:
+        """Newest record of every market, skipping those older than max_age."""
+        records = self._stable()
+        if max_age is not None:
+            records = records[records["timestamp"] >= time.time() - max_age]
+        records = records[np.argsort(records["seq"])[::-1]]
+        _, newest = np.unique(records["market_id"], return_index=True)
+        return {
+            record.market_id.lower(): record
+            for record in map(self._to_record, records[np.sort(newest)])
+        }
+
+    def get(self, market_id: str, max_age: float | None = None) -> SpreadRecord | None:
+        slots = np.flatnonzero(self.records["market_id"] == market_id.upper().encode())
+        records = self._stable(slots)
+        if max_age is not None:
+            records = records[records["timestamp"] >= time.time() - max_age]
+        if not records.size:
+            return None
+        return self._to_record(records[np.argmax(records["seq"])])
+
+    @staticmethod
+    def _to_record(record: np.void) -> SpreadRecord:
+        return SpreadRecord(
+            record["market_id"].decode(),
+            float(record["bid"]),
+            float(record["ask"]),
+            float(record["spread"]),
+            float(record["timestamp"]),
+        )
+
+    def close(self) -> None:
+        # Concurrent readers of a replaced ring see it empty from here on
+        self.records = self.records[:0].copy()
+        try:
+            self.buffer.close()
+        except BufferError:
+            # A read still holds a view of the mapping, which is unmapped
+            # once that view is gone
+            pass
+
+
+_reader: SpreadRingBuffer | None = None
+_reader_lock = threading.Lock()
+
+
+def get_ring_buffer() -> SpreadRingBuffer | None:
+    """
+    Read-only view of the shared ring buffer, or None when it is disabled
+    or its writer has not created it yet.
+    """
+    global _reader
+    path = settings.SPREAD_RING_BUFFER_PATH
+    if path is None:
+        return None
+    try:
+        inode = os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+    if _reader is None or _reader.inode != inode:
+        with _reader_lock:
+            if _reader is None or _reader.inode != inode:
+                try:
+                    reader = SpreadRingBuffer.open(path)
+                except (FileNotFoundError, ValueError):
+                    return None
+                if _reader is not None:
+                    _reader.close()
+                _reader = reader
+    return _reader
+
+
+def open_ring_buffer_writer() -> SpreadRingBuffer | None:
+    if settings.SPREAD_RING_BUFFER_PATH is None:
+        return None
+    return SpreadRingBuffer.create(
+        settings.SPREAD_RING_BUFFER_PATH, settings.SPREAD_RING_BUFFER_CAPACITY
+    )
+
+
+def get_ring_buffer_spread(market_id: str) -> MarketSpread | None:
+    ring_buffer = get_ring_buffer()
+    if ring_buffer is None:
+        return None
+    record = ring_buffer.get(market_id, settings.SPREAD_RING_BUFFER_MAX_AGE)
+    return None if record is None else record.to_market_spread()
+
+
+def get_ring_buffer_spreads() -> list[MarketSpread] | None:
+    ring_buffer = get_ring_buffer()
+    if ring_buffer is None:
+        return None
+    records = ring_buffer.latest(settings.SPREAD_RING_BUFFER_MAX_AGE)
+    return [record.to_market_spread() for record in records.values()] or None
+
+
+def to_records(tickers: list[CachedTicker]) -> list[SpreadRecord]:
+    return [
+        SpreadRecord(
+            cached.ticker.market_id,
+            cached.ticker.max_bid.amount,
+            cached.ticker.min_ask.amount,
+            MarketSpread.from_ticker(cached.ticker).spread_amount,
+            cached.updated_at.timestamp(),
+        )
+        for cached in tickers
+    ]
@@ -1,30 +1,191 @@
 import asyncio
+from collections.abc import Iterable
+
+from aiohttp import ClientError
+
+from django.conf import settings
 
 from spread.clients.buda import BudaAPIClient
+from spread.clients.buda.types import Ticker
+from spread.clients.buda.runtime import runtime
+from spread.metrics import timed
+from .cache import CachedTicker
+from .cache import TickerCache
+from .poller import get_snapshot
+from .ring_buffer import get_ring_buffer_spread
+from .ring_buffer import get_ring_buffer_spreads
 from .types import MarketSpread
 
 
+async def _fetch_ticker(market_id: str) -> Ticker:
+    client = runtime.client()
+    return await client.get_ticker(market_id)
+
+
+ticker_cache = TickerCache(
+    fetch=_fetch_ticker,
+    ttl=settings.SPREAD_TICKER_CACHE_TTL,
+    max_stale=settings.SPREAD_TICKER_CACHE_MAX_STALE,
+    max_size=settings.SPREAD_TICKER_CACHE_MAX_SIZE,
+    max_stale_if_error=settings.SPREAD_TICKER_CACHE_MAX_STALE_IF_ERROR,
+)
+
+
+def _stored_spread(market_id: str) -> MarketSpread | None:
+    """
+    Spread already collected by a poller, either the one of this process
+    or the collector publishing to the shared ring buffer.
+    """
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        cached = snapshot.get(market_id)
+        if cached is not None:
+            return MarketSpread.from_ticker(cached.ticker, cached.updated_at)
+    return get_ring_buffer_spread(market_id)
+
+
+def _stored_spreads() -> list[MarketSpread] | None:
+    snapshot = get_snapshot()
+    if snapshot is not None and snapshot.tickers:
+        return [
+            MarketSpread.from_ticker(cached.ticker, cached.updated_at)
+            for cached in snapshot.tickers.values()
+        ]
+    return get_ring_buffer_spreads()
+
+
+def _from_cached(cached: CachedTicker) -> MarketSpread:
+    return MarketSpread.from_ticker(cached.ticker, cached.updated_at)
+
+
+@timed()
 def get_market_spread(market_id: str) -> MarketSpread:
-    client = BudaAPIClient()
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    spread = _stored_spread(market_id)
+    if spread is None:
+        spread = _from_cached(runtime.run(ticker_cache.get(market_id)))
+    return spread
+
+
+def peek_market_spread(market_id: str) -> MarketSpread | None:
+    """Spread of the market if it can be served without an upstream call."""
+    spread = _stored_spread(market_id)
+    if spread is None:
+        cached = ticker_cache.peek(market_id)
+        spread = None if cached is None else _from_cached(cached)
+    return spread
+
+
+def peek_all_spreads() -> list[MarketSpread] | None:
+    spreads = _stored_spreads()
+    if spreads is None:
+        cached_tickers = ticker_cache.peek_all()
+        if cached_tickers is not None:
+            spreads = list(map(_from_cached, cached_tickers))
+    return spreads
+
+
+def _split_stored_hits(
+    market_ids: Iterable[str],
+) -> tuple[dict[str, MarketSpread], list[str]]:
+    found, missing = {}, []
+    for market_id in dict.fromkeys(market_ids):
+        spread = _stored_spread(market_id)
+        if spread is None:
+            missing.append(market_id)
+        else:
+            found[market_id] = spread
+    return found, missing
+
+
+async def _get_cached_tickers(market_ids: list[str]) -> dict[str, CachedTicker]:
+    """
+    Ticker of each market through the cache. Markets whose ticker fails
+    are left out so one failing market does not fail the others, unless
+    all of them fail.
+    """
+    results = await asyncio.gather(
+        *[ticker_cache.get(market_id) for market_id in market_ids],
+        return_exceptions=True,
+    )
+    cached_tickers = {
+        market_id: result
+        for market_id, result in zip(market_ids, results)
+        if not isinstance(result, BaseException)
+    }
+    if results and not cached_tickers:
+        raise results[0]
+    return cached_tickers
+
+
+def _from_cached_tickers(
+    cached_tickers: dict[str, CachedTicker]
+) -> dict[str, MarketSpread]:
+    return {
+        market_id: _from_cached(cached) for market_id, cached in cached_tickers.items()
+    }
+
+
+@timed()
+def get_market_spreads(market_ids: Iterable[str]) -> dict[str, MarketSpread]:
+    """
+    Spread of each distinct market id, fetching every market at most once.
+    Markets whose spread can not be fetched are missing from the result.
+    """
+    found, missing = _split_stored_hits(market_ids)
+    if missing:
+        cached_tickers = runtime.run(_get_cached_tickers(missing))
+        found.update(_from_cached_tickers(cached_tickers))
+    return found
+
+
+async def _get_cached_tickers_per_market(client: BudaAPIClient) -> list[CachedTicker]:
+    markets = await client.get_markets()
+    cached_tickers = await _get_cached_tickers([market.id for market in markets])
+    return list(cached_tickers.values())
+
+
+async def _get_all_cached_tickers(client: BudaAPIClient) -> list[CachedTicker]:
+    cached_tickers = ticker_cache.peek_all()
+    if cached_tickers is not None:
+        return cached_tickers
     try:
-        ticker = loop.run_until_complete(client.get_ticker(market_id))
-        loop.run_until_complete(client.close())
-    finally:
-        loop.close()
-    return MarketSpread.from_ticker(ticker)
+        tickers = await client.get_tickers()
+    except (ClientError, asyncio.TimeoutError):
+        return await _get_cached_tickers_per_market(client)
+    return ticker_cache.put_all(tickers)
 
 
+@timed()
 def get_all_spreads() -> list[MarketSpread]:
-    client = BudaAPIClient()
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        markets = loop.run_until_complete(client.get_markets())
-        tasks = [client.get_ticker(market.id) for market in markets]
-        tickers = loop.run_until_complete(asyncio.gather(*tasks))
-        loop.run_until_complete(client.close())
-    finally:
-        loop.close()
-    return [MarketSpread.from_ticker(ticker) for ticker in tickers]
+    spreads = _stored_spreads()
+    if spreads is None:
+        client = runtime.client()
+        spreads = list(map(_from_cached, runtime.run(_get_all_cached_tickers(client))))
+    return spreads
+
+
+@timed()
+async def aget_market_spread(market_id: str) -> MarketSpread:
+    spread = _stored_spread(market_id)
+    if spread is None:
+        spread = _from_cached(await runtime.arun(ticker_cache.get(market_id)))
+    return spread
+
+
+@timed()
+async def aget_all_spreads() -> list[MarketSpread]:
+    spreads = _stored_spreads()
+    if spreads is None:
+        client = runtime.client()
+        cached_tickers = await runtime.arun(_get_all_cached_tickers(client))
+        spreads = list(map(_from_cached, cached_tickers))
+    return spreads
+
+
+@timed()
+async def aget_market_spreads(market_ids: Iterable[str]) -> dict[str, MarketSpread]:
+    found, missing = _split_stored_hits(market_ids)
+    if missing:
+        cached_tickers = await runtime.arun(_get_cached_tickers(missing))
+        found.update(_from_cached_tickers(cached_tickers))
+    return found
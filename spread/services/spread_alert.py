@@ -1,15 +1,36 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+import numpy as np
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef
+from django.db.models import QuerySet
+from django.db.models import Subquery
+from django.db.models.functions import Lower
+
 from .spread import get_market_spread
+from .spread import get_market_spreads
+from .spread import aget_market_spread
+from .spread import aget_market_spreads
 
+from .types import MarketSpread
 from .types import SpreadAlertStatus
 from .types import SpreadAlertTracking
+from .threshold_index import threshold_index
 
+from ..models import MarketEvaluation
 from ..models import SpreadAlert
+from ..metrics import timed
 
 
-def get_alert_status(spread_alert: SpreadAlert) -> SpreadAlertTracking:
-    market_spread = get_market_spread(spread_alert.market_id)
+def _track(
+    spread_alert: SpreadAlert, market_spread: MarketSpread
+) -> SpreadAlertTracking:
     status = SpreadAlertStatus.from_difference(
         market_spread.spread_amount,
         spread_alert.alert_threshold,
@@ -21,3 +42,176 @@ def get_alert_status(spread_alert: SpreadAlert) -> SpreadAlertTracking:
         float(market_spread.spread_amount),
         status,
     )
+
+
+def _track_many(
+    spread_alerts: list[SpreadAlert], market_spreads: dict[str, MarketSpread]
+) -> list[SpreadAlertTracking]:
+    # Alerts of markets whose spread could not be fetched are left out
+    spread_alerts = [
+        alert for alert in spread_alerts if alert.market_id in market_spreads
+    ]
+    count = len(spread_alerts)
+    spreads = np.fromiter(
+        (market_spreads[alert.market_id].spread_amount for alert in spread_alerts),
+        dtype=np.float64,
+        count=count,
+    )
+    thresholds = np.fromiter(
+        (alert.alert_threshold for alert in spread_alerts),
+        dtype=np.float64,
+        count=count,
+    )
+    statuses = SpreadAlertStatus.from_differences(spreads, thresholds)
+    return [
+        SpreadAlertTracking(
+            alert.pk, alert.market_id, alert.alert_threshold, spread, status
+        )
+        for alert, spread, status in zip(spread_alerts, spreads.tolist(), statuses)
+    ]
+
+
+def with_evaluated_spread(alerts: QuerySet[SpreadAlert]) -> QuerySet[SpreadAlert]:
+    """
+    Annotates the alerts with `evaluated_spread`, the spread their market was
+    last evaluated with if that was at most SPREAD_ALERT_STATUS_MAX_AGE
+    seconds ago, so the stored status is read in the same query as the alert.
+    """
+    oldest = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.SPREAD_ALERT_STATUS_MAX_AGE
+    )
+    evaluation = MarketEvaluation.objects.filter(
+        market_id=Lower(OuterRef("market_id")), evaluated_at__gte=oldest
+    )
+    return alerts.annotate(evaluated_spread=Subquery(evaluation.values("spread")))
+
+
+def _stored(spread_alert: SpreadAlert) -> SpreadAlertTracking | None:
+    """
+    Status materialized by the alert evaluator, if it has run on the alert
+    and recently enough on its market. The spread is the one it was
+    evaluated with. Alerts not loaded through `with_evaluated_spread` have
+    none.
+    """
+    spread = getattr(spread_alert, "evaluated_spread", None)
+    if spread_alert.status is None or spread is None:
+        return None
+    return SpreadAlertTracking(
+        spread_alert.pk,
+        spread_alert.market_id,
+        spread_alert.alert_threshold,
+        spread,
+        SpreadAlertStatus(spread_alert.status),
+    )
+
+
+def _split_stored(
+    spread_alerts: list[SpreadAlert],
+) -> tuple[dict[int, SpreadAlertTracking], list[SpreadAlert]]:
+    stored, pending = {}, []
+    for alert in spread_alerts:
+        tracking = _stored(alert)
+        if tracking is None:
+            pending.append(alert)
+        else:
+            stored[alert.pk] = tracking
+    return stored, pending
+
+
+def _merge(
+    spread_alerts: list[SpreadAlert],
+    stored: dict[int, SpreadAlertTracking],
+    tracked: list[SpreadAlertTracking],
+) -> list[SpreadAlertTracking]:
+    stored.update((tracking.alert_id, tracking) for tracking in tracked)
+    return [stored[alert.pk] for alert in spread_alerts if alert.pk in stored]
+
+
+@timed()
+def get_alert_status(spread_alert: SpreadAlert) -> SpreadAlertTracking:
+    tracking = _stored(spread_alert)
+    if tracking is None:
+        tracking = _track(spread_alert, get_market_spread(spread_alert.market_id))
+    return tracking
+
+
+@timed()
+async def aget_alert_status(spread_alert: SpreadAlert) -> SpreadAlertTracking:
+    tracking = _stored(spread_alert)
+    if tracking is None:
+        market_spread = await aget_market_spread(spread_alert.market_id)
+        tracking = _track(spread_alert, market_spread)
+    return tracking
+
+
+@timed()
+def get_alert_statuses(
+    spread_alerts: Iterable[SpreadAlert],
+) -> list[SpreadAlertTracking]:
+    """
+    Status of many alerts at once. Alerts not evaluated yet, or not
+    recently, are tracked live: each market spread is fetched once and every
+    threshold is classified in a single vectorized pass. Alerts of markets
+    whose spread can not be fetched are left out, the error is only raised
+    when none can.
+    """
+    spread_alerts = list(spread_alerts)
+    stored, pending = _split_stored(spread_alerts)
+    market_spreads = get_market_spreads(alert.market_id for alert in pending)
+    return _merge(spread_alerts, stored, _track_many(pending, market_spreads))
+
+
+@timed()
+async def aget_alert_statuses(
+    spread_alerts: Iterable[SpreadAlert],
+) -> list[SpreadAlertTracking]:
+    spread_alerts = list(spread_alerts)
+    stored, pending = _split_stored(spread_alerts)
+    market_spreads = await aget_market_spreads(alert.market_id for alert in pending)
+    return _merge(spread_alerts, stored, _track_many(pending, market_spreads))
+
+
+def _index_alerts(spread_alerts: list[SpreadAlert]) -> None:
+    for alert in spread_alerts:
+        threshold_index.add(alert.pk, alert.market_id, alert.alert_threshold)
+
+
+@timed()
+def create_alerts(spread_alerts: list[SpreadAlert]) -> list[SpreadAlert]:
+    """
+    Inserts many alerts in batches within a single transaction. bulk_create
+    sends no post_save, so the threshold index is updated here instead.
+    """
+    with transaction.atomic():
+        created = SpreadAlert.objects.bulk_create(
+            spread_alerts, batch_size=settings.SPREAD_ALERT_BATCH_SIZE
+        )
+        if threshold_index.loaded:
+            transaction.on_commit(partial(_index_alerts, created))
+    return created
+
+
+@timed()
+def list_alerts(
+    fields: tuple[str, ...],
+    limit: int,
+    cursor: int | None = None,
+    market_id: str | None = None,
+) -> tuple[list[dict], int | None]:
+    """
+    Alerts by id after `cursor`, reading only the requested columns so no
+    model instance is built. Returns them along with the id to continue
+    from, if there are more.
+    """
+    alerts = SpreadAlert.objects.order_by("pk")
+    if market_id is not None:
+        # Matches spread_alert_market_lower_idx, which also keeps the ids of
+        # each market in order; iexact compiles to a LIKE no index serves
+        alerts = alerts.alias(market=Lower("market_id")).filter(
+            market=market_id.lower()
+        )
+    if cursor is not None:
+        alerts = alerts.filter(pk__gt=cursor)
+    rows = list(alerts.values_list("pk", *fields)[: limit + 1])
+    next_id = rows[limit - 1][0] if len(rows) > limit else None
+    return [dict(zip(fields, row[1:])) for row in rows[:limit]], next_id
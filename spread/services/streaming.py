@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from aiohttp import ClientError
+
+from django.conf import settings
+
+from .spread import aget_market_spread
+from .spread_alert import _track
+from .types import MarketSpread
+from .types import SpreadAlertStatus
+from .types import SpreadAlertTracking
+
+from ..models import SpreadAlert
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    Bounded mailbox of one stream consumer. Only the latest values matter,
+    so when a slow consumer lets it fill up the oldest update is dropped.
+    """
+
+    def __init__(self, max_pending: int):
+        self.queue: asyncio.Queue[MarketSpread] = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+
+    def push(self, spread: MarketSpread) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(spread)
+
+    async def get(self, timeout: float) -> MarketSpread | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MarketFeed:
+    """
+    Single upstream reader for one market, shared by all its subscribers.
+    Spreads are polled every `interval` seconds and only published to the
+    subscribers when the amount changes.
+    """
+
+    def __init__(
+        self,
+        market_id: str,
+        fetch: Callable[[str], Awaitable[MarketSpread]],
+        interval: float,
+    ):
+        self.market_id = market_id
+        self.fetch = fetch
+        self.interval = interval
+        self.subscriptions: set[Subscription] = set()
+        self.latest: MarketSpread | None = None
+        self._task = asyncio.create_task(self.run())
+
+    def subscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.add(subscription)
+        if self.latest is not None:
+            subscription.push(self.latest)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def stop(self) -> None:
+        self._task.cancel()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                spread = await self.fetch(self.market_id)
+            except (ClientError, asyncio.TimeoutError):
+                # A failed poll is retried on the next tick, subscribers
+                # keep the last value they got
+                spread = None
+            except Exception:
+                # Same for anything else, which would otherwise end the feed
+                # and leave its subscribers waiting on heartbeats forever
+                logger.exception("Polling the spread of %s failed", self.market_id)
+                spread = None
+            if spread is not None and (
+                self.latest is None or spread.spread_amount != self.latest.spread_amount
+            ):
+                self.latest = spread
+                for subscription in self.subscriptions:
+                    subscription.push(spread)
+            await asyncio.sleep(self.interval)
+
+
+class SpreadStreamHub:
+    """Keeps one MarketFeed per market while it has subscribers."""
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[MarketSpread]],
+        interval: float,
+        max_pending: int,
+    ):
+        self.fetch = fetch
+        self.interval = interval
+        self.max_pending = max_pending
+        self.feeds: dict[str, MarketFeed] = {}
+
+    def subscribe(self, market_id: str) -> tuple[MarketFeed, Subscription]:
+        key = market_id.lower()
+        feed = self.feeds.get(key)
+        if feed is None:
+            feed = self.feeds[key] = MarketFeed(market_id, self.fetch, self.interval)
+        subscription = Subscription(self.max_pending)
+        feed.subscribe(subscription)
+        return feed, subscription
+
+    def unsubscribe(self, feed: MarketFeed, subscription: Subscription) -> None:
+        feed.unsubscribe(subscription)
+        if not feed.subscriptions:
+            feed.stop()
+            self.feeds.pop(feed.market_id.lower(), None)
+
+    async def updates(
+        self, market_id: str, heartbeat: float
+    ) -> AsyncIterator[MarketSpread | None]:
+        """
+        Yields each spread change of the market, and None after `heartbeat`
+        seconds without changes so callers can keep the connection alive.
+        """
+        feed, subscription = self.subscribe(market_id)
+        try:
+            while True:
+                yield await subscription.get(heartbeat)
+        finally:
+            self.unsubscribe(feed, subscription)
+
+
+spread_stream_hub = SpreadStreamHub(
+    fetch=aget_market_spread,
+    interval=settings.SPREAD_STREAM_INTERVAL,
+    max_pending=settings.SPREAD_STREAM_MAX_PENDING,
+)
+
+
+async def stream_market_spread(
+    market_id: str,
+) -> AsyncIterator[MarketSpread | None]:
+    async for spread in spread_stream_hub.updates(
+        market_id, settings.SPREAD_STREAM_HEARTBEAT
+    ):
+        yield spread
+
+
+async def stream_alert_status(
+    spread_alert: SpreadAlert,
+) -> AsyncIterator[SpreadAlertTracking | None]:
+    """Yields the alert tracking data whenever its status changes."""
+    status = None
+    async for spread in stream_market_spread(spread_alert.market_id):
+        if spread is None:
+            yield None
+            continue
+        new_status = SpreadAlertStatus.from_difference(
+            spread.spread_amount, spread_alert.alert_threshold
+        )
+        if new_status == status:
+            continue
+        status = new_status
+        yield _track(spread_alert, spread)
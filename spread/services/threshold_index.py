@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from bisect import bisect_right
+from bisect import insort
+from collections.abc import Iterable
+
+from ..models import SpreadAlert
+
+
+class ThresholdIndex:
+    """
+    Alert thresholds of every market kept in sorted order.
+
+    When a market spread moves from `old` to `new`, exactly the alerts with
+    a threshold in [min(old, new), max(old, new)] change status (an alert
+    sitting on either bound switches to or from EQUAL), so `crossings`
+    answers with two binary searches plus the size of the result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # market id -> sorted [(threshold, alert id)]
+        self._markets: dict[str, list[tuple[float, int]]] = {}
+        # alert id -> (market id, threshold), to drop or move an alert by id
+        self._alerts: dict[int, tuple[str, float]] = {}
+        self.loaded = False
+
+    def load(self, alerts: Iterable[tuple[int, str, float]]) -> None:
+        markets: dict[str, list[tuple[float, int]]] = {}
+        entries: dict[int, tuple[str, float]] = {}
+        for alert_id, market_id, threshold in alerts:
+            market_id = market_id.lower()
+            markets.setdefault(market_id, []).append((threshold, alert_id))
+            entries[alert_id] = (market_id, threshold)
+        for thresholds in markets.values():
+            thresholds.sort()
+        with self._lock:
+            self._markets = markets
+            self._alerts = entries
+            self.loaded = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._markets = {}
+            self._alerts = {}
+            self.loaded = False
+
+    def add(self, alert_id: int, market_id: str, threshold: float) -> None:
+        with self._lock:
+            self._discard(alert_id)
+            market_id = market_id.lower()
+            insort(self._markets.setdefault(market_id, []), (threshold, alert_id))
+            self._alerts[alert_id] = (market_id, threshold)
+
+    def discard(self, alert_id: int) -> None:
+        with self._lock:
+            self._discard(alert_id)
+
+    def _discard(self, alert_id: int) -> None:
+        entry = self._alerts.pop(alert_id, None)
+        if entry is None:
+            return
+        market_id, threshold = entry
+        thresholds = self._markets[market_id]
+        del thresholds[bisect_left(thresholds, (threshold, alert_id))]
+        if not thresholds:
+            del self._markets[market_id]
+
+    def alerts(self, market_id: str) -> list[tuple[float, int]]:
+        """(threshold, alert id) of every alert of the market."""
+        with self._lock:
+            return list(self._markets.get(market_id.lower(), []))
+
+    def crossings(
+        self, market_id: str, old_spread: float, new_spread: float
+    ) -> list[tuple[float, int]]:
+        """(threshold, alert id) of the alerts whose status changes."""
+        if old_spread == new_spread:
+            return []
+        low, high = sorted((old_spread, new_spread))
+        with self._lock:
+            thresholds = self._markets.get(market_id.lower(), [])
+            start = bisect_left(thresholds, (low, float("-inf")))
+            end = bisect_right(thresholds, (high, float("inf")))
+            return thresholds[start:end]
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+
+threshold_index = ThresholdIndex()
+
+
+def get_threshold_index() -> ThresholdIndex:
+    """Process-wide index, loaded from the database on first use."""
+    if not threshold_index.loaded:
+        threshold_index.load(
+            SpreadAlert.objects.values_list("pk", "market_id", "alert_threshold")
+        )
+    return threshold_index
+
+
+def get_crossed_alerts(
+    market_id: str, old_spread: float, new_spread: float
+) -> list[int]:
+    crossed = get_threshold_index().crossings(market_id, old_spread, new_spread)
+    return [alert_id for _, alert_id in crossed]
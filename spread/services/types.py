@@ -2,8 +2,12 @@ from __future__ import annotations
 from typing import Self
 from enum import Enum
 from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
 
 from spread.clients.buda.types import Ticker
+from spread.metrics import timed
 
 
 class SpreadAlertStatus(str, Enum):
@@ -19,8 +23,16 @@ class SpreadAlertStatus(str, Enum):
             return cls.SMALLER
         return cls.EQUAL
 
+    @classmethod
+    def from_differences(
+        cls, spreads: np.ndarray, thresholds: np.ndarray
+    ) -> list[Self]:
+        """Vectorized `from_difference` over paired spread and threshold arrays."""
+        by_sign = np.array([cls.SMALLER, cls.EQUAL, cls.GREATER], dtype=object)
+        return list(by_sign[np.sign(spreads - thresholds).astype(np.intp) + 1])
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SpreadAlertTracking:
     alert_id: str
     market_id: str
@@ -29,16 +41,18 @@ class SpreadAlertTracking:
     status: SpreadAlertStatus
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MarketSpread:
     market_id: str
     spread_amount: float
+    updated_at: datetime | None = None
 
     @classmethod
-    def from_ticker(cls, ticker: Ticker) -> Self:
+    @timed()
+    def from_ticker(cls, ticker: Ticker, updated_at: datetime | None = None) -> Self:
         min_ask_price = ticker.min_ask.amount
         max_bid_price = ticker.max_bid.amount
         spread_amount = min_ask_price - max_bid_price
         if spread_amount <= 0:
-            spread_amount = 0
-        return cls(ticker.market_id, spread_amount)
+            spread_amount = 0.0
+        return cls(ticker.market_id, spread_amount, updated_at)
@@ -0,0 +1,40 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import SpreadAlert
+from .services.threshold_index import threshold_index
+
+
+@receiver(post_save, sender=SpreadAlert)
+def index_spread_alert(sender, instance, **kwargs):
+    # Before the first load the index is built straight from the table
+    if threshold_index.loaded:
+        transaction.on_commit(
+            partial(
+                threshold_index.add,
+                instance.pk,
+                instance.market_id,
+                instance.alert_threshold,
+            )
+        )
+
+
+@receiver(post_delete, sender=SpreadAlert)
+def unindex_spread_alert(sender, instance, **kwargs):
+    if threshold_index.loaded:
+        transaction.on_commit(partial(threshold_index.discard, instance.pk))
+
+
+@receiver(connection_created)
+def enable_sqlite_wal(sender, connection, **kwargs):
+    # In WAL mode a commit only needs the log synced, NORMAL skips the rest
+    if connection.vendor == "sqlite" and settings.DATABASE_SQLITE_WAL:
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
@@ -0,0 +1,15 @@
+from django.urls import include
+from django.urls import path
+
+from rest_framework.routers import SimpleRouter
+
+from spread.views import AsyncMarketViewSet
+from spread.views import AsyncSpreadAlertViewSet
+
+# The routes project.urls serves with SPREAD_ASYNC_VIEWS, which is read once
+# at import time
+router = SimpleRouter()
+router.register(r"markets", AsyncMarketViewSet, basename="markets")
+router.register(r"spread-alerts", AsyncSpreadAlertViewSet, basename="spread-alerts")
+
+urlpatterns = [path("api/v1/", include(router.urls))]
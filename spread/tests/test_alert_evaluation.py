@@ -0,0 +1,165 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from spread.clients.buda import BudaAPIClient
+from spread.models import MarketEvaluation
+from spread.models import SpreadAlert
+from spread.models import SpreadAlertStatusChange
+from spread.services.alert_evaluation import AlertEvaluator
+from spread.services.spread import ticker_cache
+from spread.services.types import MarketSpread
+from spread.services.types import SpreadAlertStatus
+from spread.tests.test_async_views import make_ticker
+
+
+def spreads(**amounts: float) -> list[MarketSpread]:
+    return [
+        MarketSpread(market_id.replace("_", "-").upper(), amount)
+        for market_id, amount in amounts.items()
+    ]
+
+
+class AlertEvaluatorTestCase(TestCase):
+    def setUp(self):
+        self.evaluator = AlertEvaluator(reload_interval=300.0, batch_size=2)
+        self.low = SpreadAlert.objects.create(market_id="BTC-CLP", alert_threshold=10)
+        self.high = SpreadAlert.objects.create(market_id="btc-clp", alert_threshold=50)
+        self.other = SpreadAlert.objects.create(market_id="ETH-CLP", alert_threshold=5)
+
+    def test_first_round_materializes_every_alert(self):
+        changes = self.evaluator.evaluate(spreads(btc_clp=20.0, eth_clp=5.0))
+
+        self.assertEqual(len(changes), 3)
+        self.low.refresh_from_db()
+        self.high.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.low.status, SpreadAlertStatus.GREATER)
+        self.assertIsNotNone(self.low.status_changed_at)
+        self.assertEqual(self.high.status, SpreadAlertStatus.SMALLER)
+        self.assertEqual(self.other.status, SpreadAlertStatus.EQUAL)
+
+    def test_only_crossed_alerts_are_written(self):
+        self.evaluator.evaluate(spreads(btc_clp=20.0))
+        self.low.refresh_from_db()
+
+        changes = self.evaluator.evaluate(spreads(btc_clp=60.0))
+        changed_at = self.low.status_changed_at
+        self.low.refresh_from_db()
+
+        self.assertEqual([change.alert_id for change in changes], [self.high.pk])
+        self.assertEqual(self.low.status_changed_at, changed_at)
+        self.assertEqual(
+            list(
+                SpreadAlertStatusChange.objects.filter(alert=self.high).values_list(
+                    "previous_status", "status"
+                )
+            ),
+            [(None, "SMALLER"), ("SMALLER", "GRATER")],
+        )
+
+    def test_unchanged_round_only_checks_for_new_alerts(self):
+        self.evaluator.evaluate(spreads(btc_clp=20.0))
+        evaluated_at = MarketEvaluation.objects.get().evaluated_at
+
+        # The new alerts and the market evaluations, no alert row
+        with self.assertNumQueries(2):
+            changes = self.evaluator.evaluate(spreads(btc_clp=30.0))
+
+        self.assertEqual(changes, [])
+        evaluation = MarketEvaluation.objects.get()
+        self.assertEqual((evaluation.market_id, evaluation.spread), ("btc-clp", 30.0))
+        self.assertGreater(evaluation.evaluated_at, evaluated_at)
+
+    def test_new_alert_is_evaluated_without_crossing(self):
+        self.evaluator.evaluate(spreads(btc_clp=20.0))
+        alert = SpreadAlert.objects.create(market_id="BTC-CLP", alert_threshold=100)
+
+        self.evaluator.evaluate(spreads(btc_clp=20.0))
+
+        alert.refresh_from_db()
+        self.assertEqual(alert.status, SpreadAlertStatus.SMALLER)
+
+
+class MaterializedAlertStatusTestCase(TestCase):
+    def setUp(self):
+        ticker_cache.clear()
+        self.client = APIClient()
+
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_retrieve_reads_stored_status(self):
+        alert = SpreadAlert.objects.create(market_id="BTC-CLP", alert_threshold=1)
+        evaluator = AlertEvaluator(reload_interval=300.0, batch_size=100)
+        evaluator.evaluate(spreads(btc_clp=5.0))
+        evaluator.evaluate(spreads(btc_clp=7.0))
+
+        # The alert and its market evaluation
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/v1/spread-alerts/{alert.pk}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "GRATER")
+        # The spread of the last round, not of the last status change
+        self.assertEqual(response.json()["spread"], 7.0)
+        BudaAPIClient.get_ticker.assert_not_awaited()
+
+    @override_settings(ROOT_URLCONF="spread.tests.async_urls")
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_async_retrieve_reads_stored_status(self):
+        alert = SpreadAlert.objects.create(market_id="BTC-CLP", alert_threshold=1)
+        AlertEvaluator(reload_interval=300.0, batch_size=100).evaluate(
+            spreads(btc_clp=5.0)
+        )
+
+        with self.assertNumQueries(1):
+            response = async_to_sync(self.async_client.get)(
+                f"/api/v1/spread-alerts/{alert.pk}/"
+            )
+
+        self.assertEqual(response.json()["status"], "GRATER")
+        self.assertEqual(response.json()["spread"], 5.0)
+        BudaAPIClient.get_ticker.assert_not_awaited()
+
+    @override_settings(SPREAD_ALERT_STATUS_MAX_AGE=30.0)
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_stale_status_is_tracked_live(self):
+        BudaAPIClient.get_ticker.return_value = make_ticker("BTC-CLP")
+        alert = SpreadAlert.objects.create(market_id="BTC-CLP", alert_threshold=1)
+        AlertEvaluator(reload_interval=300.0, batch_size=100).evaluate(
+            spreads(btc_clp=0.5)
+        )
+        evaluation = MarketEvaluation.objects.get()
+        evaluation.evaluated_at -= timedelta(seconds=31)
+        evaluation.save()
+
+        response = self.client.get(f"/api/v1/spread-alerts/{alert.pk}/")
+
+        self.assertEqual(response.json()["status"], "GRATER")
+        self.assertEqual(response.json()["spread"], 2.0)
+        BudaAPIClient.get_ticker.assert_awaited_once()
+
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_statuses_mix_stored_and_live(self):
+        BudaAPIClient.get_ticker.return_value = make_ticker("ETH-CLP")
+        stored = SpreadAlert.objects.create(market_id="BTC-CLP", alert_threshold=1)
+        AlertEvaluator(reload_interval=300.0, batch_size=100).evaluate(
+            spreads(btc_clp=5.0)
+        )
+        live = SpreadAlert.objects.create(market_id="ETH-CLP", alert_threshold=1)
+
+        # The alerts and their market evaluations, the live one through Buda
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                f"/api/v1/spread-alerts/status/?ids={stored.pk}&ids={live.pk}"
+            )
+
+        self.assertEqual(
+            [tracking["alert_id"] for tracking in response.json()],
+            [str(stored.pk), str(live.pk)],
+        )
+        BudaAPIClient.get_ticker.assert_awaited_once()
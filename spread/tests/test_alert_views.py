@@ -0,0 +1,115 @@
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from spread.clients.buda import BudaAPIClient
+from spread.models import SpreadAlert
+from spread.services.markets import market_registry
+from spread.services.spread import ticker_cache
+from spread.tests.test_async_views import make_market
+from spread.tests.test_async_views import make_ticker
+
+
+class SpreadAlertViewSetTests:
+    """Cases shared by the sync and async alert viewsets."""
+
+    def setUp(self):
+        market_registry.clear()
+        ticker_cache.clear()
+        patcher = patch.object(
+            BudaAPIClient,
+            "get_markets",
+            AsyncMock(return_value=[make_market("BTC-CLP")]),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_create(self):
+        response = self.post(
+            "/api/v1/spread-alerts/", {"market_id": "BTC-CLP", "alert_threshold": 5.0}
+        )
+
+        self.assertEqual(response.status_code, 201)
+        alert = SpreadAlert.objects.get()
+        self.assertEqual(
+            response.json(),
+            {"id": alert.pk, "market_id": "BTC-CLP", "alert_threshold": 5.0},
+        )
+
+    def test_create_for_unknown_market(self):
+        response = self.post(
+            "/api/v1/spread-alerts/", {"market_id": "LOL-CLP", "alert_threshold": 5.0}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("market_id", response.json())
+        self.assertFalse(SpreadAlert.objects.exists())
+
+    def test_retrieve(self):
+        mock_get_ticker = AsyncMock(return_value=make_ticker("BTC-CLP"))
+        alert = SpreadAlert.objects.create(market_id="BTC-CLP", alert_threshold=1.0)
+
+        with patch.object(BudaAPIClient, "get_ticker", mock_get_ticker):
+            response = self.get(f"/api/v1/spread-alerts/{alert.pk}/")
+            missing = self.get(f"/api/v1/spread-alerts/{alert.pk + 1}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "GRATER")
+        self.assertEqual(response.json()["spread"], 2.0)
+        self.assertEqual(missing.status_code, 404)
+
+    def test_statuses(self):
+        mock_get_ticker = AsyncMock(side_effect=make_ticker)
+        low = SpreadAlert.objects.create(market_id="BTC-CLP", alert_threshold=1.0)
+        high = SpreadAlert.objects.create(market_id="ETH-CLP", alert_threshold=3.0)
+
+        with patch.object(BudaAPIClient, "get_ticker", mock_get_ticker):
+            response = self.get(
+                f"/api/v1/spread-alerts/status/?ids={high.pk}&ids={low.pk}"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [
+                (tracking["alert_id"], tracking["status"])
+                for tracking in response.json()
+            ],
+            [(str(low.pk), "GRATER"), (str(high.pk), "SMALLER")],
+        )
+        self.assertEqual(mock_get_ticker.await_count, 2)
+
+    def test_list_field_errors(self):
+        statuses = self.get("/api/v1/spread-alerts/status/?ids=1,2")
+        bulk = self.post("/api/v1/spread-alerts/bulk/", {"alerts": [5]})
+
+        self.assertEqual(statuses.status_code, 400)
+        self.assertEqual(list(statuses.json()["ids"]), ["0"])
+        self.assertEqual(bulk.status_code, 400)
+        self.assertEqual(list(bulk.json()["alerts"]), ["0"])
+
+
+class SpreadAlertViewSetTestCase(SpreadAlertViewSetTests, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def get(self, path):
+        return self.client.get(path)
+
+    def post(self, path, data):
+        return self.client.post(path, data, format="json")
+
+
+@override_settings(ROOT_URLCONF="spread.tests.async_urls")
+class AsyncSpreadAlertViewSetTestCase(SpreadAlertViewSetTests, TestCase):
+    def get(self, path):
+        return async_to_sync(self.async_client.get)(path)
+
+    def post(self, path, data):
+        return async_to_sync(self.async_client.post)(
+            path, data, content_type="application/json"
+        )
@@ -0,0 +1,100 @@
+import json
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory
+from django.test import TestCase
+
+from spread.clients.buda import BudaAPIClient
+from spread.clients.buda.types import Market
+from spread.clients.buda.types import MoneyAmount
+from spread.clients.buda.types import Ticker
+from spread.services.markets import market_registry
+from spread.services.spread import ticker_cache
+from spread.views import AsyncMarketViewSet
+
+
+def make_ticker(market_id: str) -> Ticker:
+    return Ticker.from_response(
+        {
+            "market_id": market_id,
+            "last_price": ["100.0", "CLP"],
+            "min_ask": ["101.0", "CLP"],
+            "max_bid": ["99.0", "CLP"],
+            "volume": ["500.0", "BTC"],
+            "price_variation_24h": "0.05",
+            "price_variation_7d": "0.1",
+        }
+    )
+
+
+def content(response):
+    return json.loads(response.render().content)
+
+
+def make_market(market_id: str) -> Market:
+    return Market(
+        id=market_id,
+        name=market_id,
+        base_currency="BTC",
+        quote_currency="CLP",
+        minimum_order_amount=MoneyAmount(0.001, "BTC"),
+        taker_fee="0.8",
+        maker_fee="0.4",
+        max_orders_per_minute="100",
+        maker_discount_percentage="0.0",
+        taker_discount_percentage="0.0",
+        disabled=False,
+    )
+
+
+class AsyncMarketViewSetTestCase(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        ticker_cache.clear()
+        market_registry.clear()
+
+    @async_to_sync
+    async def test_spread(self):
+        view = AsyncMarketViewSet.as_view({"get": "spread"})
+        mock_get_ticker = AsyncMock(return_value=make_ticker("BTC-CLP"))
+
+        with patch.object(BudaAPIClient, "get_ticker", mock_get_ticker):
+            response = await view(self.factory.get("/"), pk="BTC-CLP")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content(response)["market_id"], "BTC-CLP")
+        self.assertEqual(content(response)["spread_amount"], 2.0)
+
+    @async_to_sync
+    async def test_all_spreads(self):
+        view = AsyncMarketViewSet.as_view({"get": "all_spreads"})
+        mock_get_tickers = AsyncMock(
+            return_value=[make_ticker("BTC-CLP"), make_ticker("ETH-CLP")]
+        )
+
+        with patch.object(BudaAPIClient, "get_tickers", mock_get_tickers):
+            response = await view(self.factory.get("/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [spread["market_id"] for spread in content(response)],
+            ["BTC-CLP", "ETH-CLP"],
+        )
+
+    @async_to_sync
+    async def test_list_and_retrieve(self):
+        list_view = AsyncMarketViewSet.as_view({"get": "list"})
+        retrieve_view = AsyncMarketViewSet.as_view({"get": "retrieve"})
+        mock_get_markets = AsyncMock(return_value=[make_market("BTC-CLP")])
+
+        with patch.object(BudaAPIClient, "get_markets", mock_get_markets):
+            listed = await list_view(self.factory.get("/"))
+            found = await retrieve_view(self.factory.get("/"), pk="btc-clp")
+            missing = await retrieve_view(self.factory.get("/"), pk="LOL-CLP")
+
+        self.assertEqual([market["id"] for market in content(listed)], ["BTC-CLP"])
+        self.assertEqual(content(found)["id"], "BTC-CLP")
+        self.assertEqual(missing.status_code, 404)
+        mock_get_markets.assert_awaited_once()
@@ -0,0 +1,180 @@
+import asyncio
+
+from aiohttp import ClientResponseError
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+
+from spread.clients.buda.types import Ticker
+from spread.services.cache import TickerCache
+
+
+def make_ticker(market_id: str, min_ask: str = "101.0") -> Ticker:
+    return Ticker.from_response(
+        {
+            "market_id": market_id,
+            "last_price": ["100.0", "CLP"],
+            "min_ask": [min_ask, "CLP"],
+            "max_bid": ["99.0", "CLP"],
+            "volume": ["500.0", "BTC"],
+            "price_variation_24h": "0.05",
+            "price_variation_7d": "0.1",
+        }
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TickerCacheTestCase(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.clock = FakeClock()
+        self.cache = TickerCache(
+            fetch=self.fetch, ttl=2.0, max_stale=10.0, max_size=2, clock=self.clock
+        )
+
+    async def fetch(self, market_id: str) -> Ticker:
+        self.calls.append(market_id)
+        await asyncio.sleep(0)
+        return make_ticker(market_id, min_ask=str(101.0 + len(self.calls)))
+
+    @async_to_sync
+    async def test_miss_then_hit(self):
+        first = await self.cache.get("BTC-CLP")
+        second = await self.cache.get("BTC-CLP")
+
+        self.assertIs(first, second)
+        self.assertEqual(self.calls, ["BTC-CLP"])
+        self.assertEqual(self.cache.stats.misses, 1)
+        self.assertEqual(self.cache.stats.hits, 1)
+
+    @async_to_sync
+    async def test_concurrent_misses_share_one_request(self):
+        results = await asyncio.gather(*[self.cache.get("BTC-CLP") for _ in range(10)])
+
+        self.assertEqual(self.calls, ["BTC-CLP"])
+        self.assertTrue(all(result is results[0] for result in results))
+
+    @async_to_sync
+    async def test_stale_entry_is_served_while_refreshing(self):
+        fresh = await self.cache.get("BTC-CLP")
+        self.clock.now = 5.0
+
+        stale = await asyncio.gather(
+            self.cache.get("BTC-CLP"), self.cache.get("BTC-CLP")
+        )
+        await asyncio.sleep(0.01)
+        refreshed = await self.cache.get("BTC-CLP")
+
+        self.assertIs(stale[0], fresh)
+        self.assertIs(stale[1], fresh)
+        self.assertEqual(self.calls, ["BTC-CLP", "BTC-CLP"])
+        self.assertEqual(refreshed.ticker.min_ask.amount, 103.0)
+        self.assertEqual(self.cache.stats.stale, 2)
+
+    @async_to_sync
+    async def test_entry_past_max_stale_is_a_miss(self):
+        await self.cache.get("BTC-CLP")
+        self.clock.now = 20.0
+
+        await self.cache.get("BTC-CLP")
+
+        self.assertEqual(self.cache.stats.misses, 2)
+        self.assertEqual(self.cache.stats.stale, 0)
+
+    @async_to_sync
+    async def test_least_recently_used_entry_is_evicted(self):
+        await self.cache.get("BTC-CLP")
+        await self.cache.get("ETH-CLP")
+        await self.cache.get("BTC-CLP")
+        await self.cache.get("LTC-CLP")
+        await self.cache.get("BTC-CLP")
+        await self.cache.get("ETH-CLP")
+
+        self.assertEqual(self.calls, ["BTC-CLP", "ETH-CLP", "LTC-CLP", "ETH-CLP"])
+
+    @async_to_sync
+    async def test_failed_miss_propagates_and_is_not_cached(self):
+        async def failing_fetch(market_id):
+            raise RuntimeError("upstream down")
+
+        self.cache.fetch = failing_fetch
+
+        with self.assertRaises(RuntimeError):
+            await self.cache.get("BTC-CLP")
+
+        self.assertEqual(self.cache._in_flight, {})
+
+    @async_to_sync
+    async def test_expired_entry_is_served_while_upstream_fails(self):
+        self.cache.max_stale_if_error = 60.0
+        entry = await self.cache.get("BTC-CLP")
+
+        async def failing_fetch(market_id):
+            raise ClientResponseError(None, None, status=503)
+
+        self.cache.fetch = failing_fetch
+        self.clock.now = 30.0
+        served = await self.cache.get("BTC-CLP")
+        self.clock.now = 100.0
+
+        with self.assertRaises(ClientResponseError):
+            await self.cache.get("BTC-CLP")
+        self.assertIs(served, entry)
+
+    @async_to_sync
+    async def test_clear_cancels_refreshes_in_flight(self):
+        started = asyncio.Event()
+
+        async def slow_fetch(market_id):
+            started.set()
+            await asyncio.sleep(60)
+            return make_ticker(market_id)
+
+        self.cache.fetch = slow_fetch
+        pending = asyncio.ensure_future(self.cache.get("BTC-CLP"))
+        await started.wait()
+
+        self.cache.clear()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(self.cache._in_flight, {})
+        self.assertIsNone(self.cache.peek("BTC-CLP"))
+
+    @async_to_sync
+    async def test_refresh_finishing_after_clear_is_not_stored(self):
+        release = asyncio.Event()
+
+        async def gated_fetch(market_id):
+            await release.wait()
+            return make_ticker(market_id)
+
+        self.cache.fetch = gated_fetch
+        refresh = self.cache._refresh("BTC-CLP")
+        await asyncio.sleep(0)
+        # Cleared from another thread, the cancellation is not delivered yet
+        self.cache._in_flight.clear()
+        release.set()
+
+        await refresh
+        self.assertIsNone(self.cache.peek("BTC-CLP"))
+
+    def test_peek_all_until_any_entry_expires(self):
+        self.cache.max_size = 3
+        self.assertIsNone(self.cache.peek_all())
+
+        stored = self.cache.put_all([make_ticker("BTC-CLP"), make_ticker("ETH-CLP")])
+        self.clock.now = 1.0
+        self.cache.put("BTC-CLP", make_ticker("BTC-CLP"))
+        peeked = self.cache.peek_all()
+        self.clock.now = 2.5
+
+        self.assertEqual(len(peeked), 2)
+        self.assertIs(peeked[1], stored[1])
+        self.assertIsNone(self.cache.peek_all())
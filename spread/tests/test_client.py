@@ -139,3 +139,34 @@ class TestGetMarket(BudaAPIClientTestBase):
         self.assertIsInstance(market, Market)
         self.assertEqual(market.id, market_id)
         self.assertEqual(market.name, "Market 1")
+
+
+class TestGetTickers(BudaAPIClientTestBase):
+    @async_to_sync
+    async def test_get_tickers(self):
+        mock_data = {
+            "tickers": [
+                {
+                    "market_id": market_id,
+                    "last_price": ["100.0", "USD"],
+                    "min_ask": ["101.0", "USD"],
+                    "max_bid": ["99.0", "USD"],
+                    "volume": ["500.0", "BTC"],
+                    "price_variation_24h": "0.05",
+                    "price_variation_7d": "0.1",
+                }
+                for market_id in ("market1", "market2")
+            ]
+        }
+        self.mock_aiohttp.get(
+            f"{self.client.base_url}{BudaAPIEndpoint.TICKERS.value}",
+            payload=mock_data,
+        )
+
+        tickers = await self.client.get_tickers()
+
+        self.assertEqual(len(tickers), 2)
+        self.assertIsInstance(tickers[0], Ticker)
+        self.assertEqual(tickers[0].market_id, "market1")
+        self.assertEqual(tickers[1].market_id, "market2")
+        self.assertEqual(tickers[1].min_ask.amount, 101.0)
@@ -0,0 +1,118 @@
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from spread.clients.buda import BudaAPIClient
+from spread.services.markets import market_registry
+from spread.services.spread import ticker_cache
+from spread.tests.test_async_views import make_market
+from spread.tests.test_async_views import make_ticker
+from spread.views import AsyncMarketViewSet
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        ticker_cache.clear()
+        market_registry.clear()
+        self.client = APIClient()
+
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_spread_not_modified(self):
+        BudaAPIClient.get_ticker.return_value = make_ticker("BTC-CLP")
+
+        response = self.client.get("/api/v1/markets/BTC-CLP/spread/")
+        etag = response.headers["ETag"]
+        repeated = self.client.get(
+            "/api/v1/markets/BTC-CLP/spread/", HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Cache-Control"], "max-age=2")
+        self.assertIn("Last-Modified", response.headers)
+        self.assertEqual(repeated.status_code, 304)
+        self.assertEqual(repeated.content, b"")
+        self.assertEqual(repeated.headers["ETag"], etag)
+        BudaAPIClient.get_ticker.assert_awaited_once()
+
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_spread_modified(self):
+        BudaAPIClient.get_ticker.return_value = make_ticker("BTC-CLP")
+
+        etag = self.client.get("/api/v1/markets/BTC-CLP/spread/").headers["ETag"]
+        ticker_cache.clear()
+        response = self.client.get(
+            "/api/v1/markets/BTC-CLP/spread/", HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    @patch.object(BudaAPIClient, "get_markets", AsyncMock())
+    def test_markets_not_modified(self):
+        BudaAPIClient.get_markets.return_value = [make_market("BTC-CLP")]
+
+        listed = self.client.get("/api/v1/markets/")
+        repeated = self.client.get(
+            "/api/v1/markets/", HTTP_IF_NONE_MATCH=listed.headers["ETag"]
+        )
+        retrieved = self.client.get(
+            "/api/v1/markets/btc-clp/", HTTP_IF_NONE_MATCH=listed.headers["ETag"]
+        )
+        missing = self.client.get(
+            "/api/v1/markets/lol-clp/", HTTP_IF_NONE_MATCH=listed.headers["ETag"]
+        )
+
+        self.assertEqual(listed.status_code, 200)
+        self.assertEqual(listed.headers["Cache-Control"], "max-age=300")
+        self.assertEqual(repeated.status_code, 304)
+        self.assertEqual(retrieved.status_code, 304)
+        self.assertEqual(missing.status_code, 404)
+        self.assertNotIn("ETag", missing.headers)
+
+    @patch.object(BudaAPIClient, "get_tickers", AsyncMock())
+    def test_all_spreads_are_tagged(self):
+        BudaAPIClient.get_tickers.return_value = [make_ticker("BTC-CLP")]
+
+        response = self.client.get("/api/v1/markets/spreads/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response.headers)
+
+    @patch.object(BudaAPIClient, "get_tickers", AsyncMock())
+    def test_all_spreads_not_modified(self):
+        # Default config: no poller nor ring buffer, only the ticker cache
+        BudaAPIClient.get_tickers.return_value = [
+            make_ticker("BTC-CLP"),
+            make_ticker("ETH-CLP"),
+        ]
+
+        listed = self.client.get("/api/v1/markets/spreads/")
+        again = self.client.get("/api/v1/markets/spreads/")
+        repeated = self.client.get(
+            "/api/v1/markets/spreads/", HTTP_IF_NONE_MATCH=listed.headers["ETag"]
+        )
+
+        self.assertEqual(again.headers["ETag"], listed.headers["ETag"])
+        self.assertEqual(again.json(), listed.json())
+        self.assertEqual(repeated.status_code, 304)
+        BudaAPIClient.get_tickers.assert_awaited_once()
+
+    @async_to_sync
+    async def test_async_spread_not_modified(self):
+        view = AsyncMarketViewSet.as_view({"get": "spread"})
+        factory = AsyncRequestFactory()
+        mock_get_ticker = AsyncMock(return_value=make_ticker("BTC-CLP"))
+
+        with patch.object(BudaAPIClient, "get_ticker", mock_get_ticker):
+            response = await view(factory.get("/"), pk="BTC-CLP")
+            repeated = await view(
+                factory.get("/", headers={"If-None-Match": response.headers["ETag"]}),
+                pk="BTC-CLP",
+            )
+
+        self.assertEqual(repeated.status_code, 304)
+        mock_get_ticker.assert_awaited_once()
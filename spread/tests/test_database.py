@@ -0,0 +1,54 @@
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import TestCase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from spread.models import SpreadAlert
+from spread.services.spread_alert import list_alerts
+
+
+class SQLiteTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = Path(directory.name) / "db.sqlite3"
+
+    def journal_mode(self) -> str:
+        file_connection = DatabaseWrapper(
+            {**connection.settings_dict, "NAME": self.name}, alias="file"
+        )
+        try:
+            with file_connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                return cursor.fetchone()[0]
+        finally:
+            file_connection.close()
+
+    def test_connections_use_wal(self):
+        self.assertEqual(self.journal_mode(), "wal")
+
+    @override_settings(DATABASE_SQLITE_WAL=False)
+    def test_wal_can_be_disabled(self):
+        self.assertEqual(self.journal_mode(), "delete")
+
+    def test_market_lookup_uses_index(self):
+        alerts = SpreadAlert.objects.filter(
+            market_id="BTC-CLP", alert_threshold__range=(1.0, 2.0)
+        )
+
+        self.assertIn("USING INDEX", alerts.explain())
+
+    def test_alert_list_market_filter_uses_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            list_alerts(("market_id",), limit=10, cursor=5, market_id="BTC-CLP")
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries[0]['sql']}")
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+
+        self.assertIn("USING INDEX spread_alert_market_lower_idx", plan)
+        # The index also yields the ids in order
+        self.assertNotIn("TEMP B-TREE", plan)
@@ -0,0 +1,151 @@
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from spread.clients.buda import BudaAPIClient
+from spread.services import history
+from spread.services.history import SpreadHistoryStore
+from spread.services.markets import market_registry
+from spread.tests.test_async_views import make_market
+
+# 2024-01-01T00:00:00Z
+EPOCH = 1704067200.0
+
+
+def at(seconds: float) -> datetime:
+    return datetime.fromtimestamp(EPOCH + seconds, timezone.utc)
+
+
+class SpreadHistoryStoreTestCase(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.store = SpreadHistoryStore(self.root)
+        # Two samples per minute for two hours and a bit
+        seconds = [minute * 60 + offset for minute in range(125) for offset in (0, 30)]
+        self.store.append(
+            "BTC-CLP",
+            [EPOCH + second for second in seconds],
+            [float(second % 600) for second in seconds],
+        )
+
+    def test_raw_query(self):
+        points = self.store.query("BTC-CLP", at(60), at(120), "raw")
+
+        self.assertEqual([point.timestamp for point in points], [at(60), at(90)])
+        self.assertEqual([point.close for point in points], [60.0, 90.0])
+        self.assertEqual({point.count for point in points}, {1})
+
+    def test_minute_rollup(self):
+        self.store.rollup("BTC-CLP", now=EPOCH + 125 * 60)
+
+        points = self.store.query("BTC-CLP", at(0), at(180), "1m")
+
+        self.assertEqual(len(points), 3)
+        self.assertEqual(points[1].timestamp, at(60))
+        self.assertEqual(points[1].open, 60.0)
+        self.assertEqual(points[1].close, 90.0)
+        self.assertEqual(points[1].high, 90.0)
+        self.assertEqual(points[1].low, 60.0)
+        self.assertEqual(points[1].mean, 75.0)
+        self.assertEqual(points[1].count, 2)
+
+    def test_hour_rollup_reads_only_its_tier(self):
+        self.store.rollup("BTC-CLP", now=EPOCH + 125 * 60)
+        shutil.rmtree(self.root / "btc-clp" / "raw")
+        shutil.rmtree(self.root / "btc-clp" / "1m")
+
+        points = self.store.query("BTC-CLP", at(0), at(10 * 3600), "1h")
+
+        self.assertEqual([point.timestamp for point in points], [at(0), at(3600)])
+        self.assertEqual(points[0].count, 120)
+        self.assertEqual(points[0].high, 570.0)
+        self.assertEqual(points[0].low, 0.0)
+        self.assertAlmostEqual(points[0].mean, 285.0)
+
+    def test_rollup_is_incremental(self):
+        self.store.rollup("BTC-CLP", now=EPOCH + 60 * 60)
+        self.store.rollup("BTC-CLP", now=EPOCH + 60 * 60)
+        self.store.rollup("BTC-CLP", now=EPOCH + 125 * 60)
+
+        minutes = self.store.query("BTC-CLP", at(0), at(10 * 3600), "1m")
+        hours = self.store.query("BTC-CLP", at(0), at(10 * 3600), "1h")
+
+        self.assertEqual(len(minutes), 125)
+        self.assertEqual(len(hours), 2)
+        self.assertEqual(
+            [point.timestamp for point in minutes],
+            sorted(point.timestamp for point in minutes),
+        )
+
+    def test_partially_written_row_is_ignored(self):
+        with open(self.root / "btc-clp" / "raw" / "timestamp.f8", "ab") as column:
+            column.write(b"\x00" * 8)
+
+        points = self.store.query("BTC-CLP", at(0), at(10 * 3600), "raw")
+
+        self.assertEqual(len(points), 250)
+
+    def test_append_after_interrupted_append_keeps_columns_aligned(self):
+        # A writer died after the timestamp of one row and half a spread
+        raw = self.root / "btc-clp" / "raw"
+        with open(raw / "timestamp.f8", "ab") as column:
+            column.write(b"\x00" * 8)
+        with open(raw / "spread.f8", "ab") as column:
+            column.write(b"\x00" * 4)
+
+        self.store.append("BTC-CLP", [EPOCH + 125 * 60], [42.0])
+
+        points = self.store.query("BTC-CLP", at(125 * 60), at(10 * 3600), "raw")
+        self.assertEqual(
+            [(point.timestamp, point.close) for point in points], [(at(125 * 60), 42.0)]
+        )
+        self.assertEqual(
+            (raw / "timestamp.f8").stat().st_size, (raw / "spread.f8").stat().st_size
+        )
+
+    def test_invalid_market_id(self):
+        with self.assertRaises(ValueError):
+            self.store.query("../etc", at(0), at(60), "raw")
+
+
+class SpreadHistoryViewTestCase(TestCase):
+    def setUp(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        store = SpreadHistoryStore(root)
+        store.append("BTC-CLP", [EPOCH, EPOCH + 30, EPOCH + 60], [1.0, 3.0, 5.0])
+        store.rollup_all(now=EPOCH + 120)
+        patcher = patch.object(history, "spread_history", store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        market_registry.clear()
+
+    def test_spread_history(self):
+        mock_get_markets = AsyncMock(return_value=[make_market("BTC-CLP")])
+
+        with patch.object(BudaAPIClient, "get_markets", mock_get_markets):
+            response = APIClient().get(
+                "/api/v1/markets/btc-clp/spread/history/",
+                {"from": at(0).isoformat(), "to": at(120).isoformat()},
+            )
+            missing = APIClient().get("/api/v1/markets/lol-clp/spread/history/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(response.json()[0]["mean"], 2.0)
+        self.assertEqual(missing.status_code, 404)
+
+    def test_from_after_to(self):
+        response = APIClient().get(
+            "/api/v1/markets/btc-clp/spread/history/",
+            {"from": at(120).isoformat(), "to": at(0).isoformat()},
+        )
+
+        self.assertEqual(response.status_code, 400)
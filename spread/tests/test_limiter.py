@@ -0,0 +1,128 @@
+import asyncio
+
+from aioresponses import aioresponses
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+
+from spread.clients.buda import BudaAPIClient
+from spread.clients.buda import BudaAPIEndpoint
+from spread.clients.buda.limiter import TokenBucket
+from spread.clients.buda.limiter import UpstreamLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTestCase(TestCase):
+    def test_waits_past_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+
+        delays = [bucket.reserve() for _ in range(4)]
+
+        self.assertEqual(delays, [0.0, 0.0, 0.5, 1.0])
+
+    def test_refills_up_to_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        clock.now = 10.0
+        delays = [bucket.reserve() for _ in range(3)]
+
+        self.assertEqual(delays, [0.0, 0.0, 0.5])
+
+
+class UpstreamLimiterTestCase(TestCase):
+    @async_to_sync
+    async def test_same_key_shares_call(self):
+        limiter = UpstreamLimiter(rate=None, burst=1, max_concurrency=10)
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0)
+            return b"body"
+
+        results = await asyncio.gather(
+            *(limiter.request(call, key="url") for _ in range(10))
+        )
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, [b"body"] * 10)
+        self.assertEqual(limiter.stats.requests, 10)
+        self.assertEqual(limiter.stats.coalesced, 9)
+
+    @async_to_sync
+    async def test_shared_failure_reaches_every_caller(self):
+        limiter = UpstreamLimiter(rate=None, burst=1, max_concurrency=10)
+
+        async def call():
+            await asyncio.sleep(0)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(
+            *(limiter.request(call, key="url") for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(limiter._in_flight, {})
+
+    @async_to_sync
+    async def test_bounds_concurrency(self):
+        limiter = UpstreamLimiter(rate=None, burst=1, max_concurrency=2)
+        active = peak = 0
+
+        async def call():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        await asyncio.gather(*(limiter.request(call) for _ in range(6)))
+
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.stats.max_queue_depth, 4)
+        self.assertEqual(limiter.stats.queue_depth, 0)
+        self.assertEqual(limiter.stats.waited, 6)
+        self.assertGreater(limiter.stats.max_wait_time, 0)
+
+
+class LimitedClientTestCase(TestCase):
+    @async_to_sync
+    async def test_concurrent_tickers_share_request(self):
+        client = BudaAPIClient(
+            limiter=UpstreamLimiter(rate=20.0, burst=20, max_concurrency=10)
+        )
+        url = client.build_url(BudaAPIEndpoint.TICKER, {"market_id": "BTC-CLP"})
+        payload = {
+            "ticker": {
+                "last_price": ["879789.0", "CLP"],
+                "market_id": "BTC-CLP",
+                "max_bid": ["876531.11", "CLP"],
+                "min_ask": ["879658.0", "CLP"],
+                "price_variation_24h": "0.005",
+                "price_variation_7d": "0.1",
+                "volume": ["102.0", "BTC"],
+            }
+        }
+
+        with aioresponses() as mock_aiohttp:
+            mock_aiohttp.get(url, payload=payload)
+            tickers = await asyncio.gather(
+                *(client.get_ticker("BTC-CLP") for _ in range(10))
+            )
+            requests = sum(len(calls) for calls in mock_aiohttp.requests.values())
+        await client.close()
+
+        self.assertEqual(requests, 1)
+        self.assertEqual({ticker.market_id for ticker in tickers}, {"BTC-CLP"})
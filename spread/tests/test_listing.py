@@ -0,0 +1,150 @@
+from dataclasses import replace
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from spread.clients.buda import BudaAPIClient
+from spread.listing import decode_cursor
+from spread.listing import encode_cursor
+from spread.models import SpreadAlert
+from spread.services.markets import market_registry
+from spread.services.spread import ticker_cache
+from spread.tests.test_async_views import content
+from spread.tests.test_async_views import make_market
+from spread.tests.test_async_views import make_ticker
+from spread.views import AsyncMarketViewSet
+
+MARKETS = [
+    make_market("BTC-CLP"),
+    replace(make_market("ETH-BTC"), base_currency="ETH", quote_currency="BTC"),
+    replace(make_market("ETH-CLP"), base_currency="ETH", disabled=True),
+    replace(make_market("BTC-COP"), quote_currency="COP"),
+]
+
+
+class MarketListingTestCase(TestCase):
+    def setUp(self):
+        market_registry.clear()
+        ticker_cache.clear()
+        self.client = APIClient()
+        patcher = patch.object(
+            BudaAPIClient, "get_markets", AsyncMock(return_value=MARKETS)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, query: str, **headers):
+        return self.client.get(f"/api/v1/markets/?{query}", **headers)
+
+    def test_filters(self):
+        clp = self.get("quote_currency=clp").json()
+        enabled_eth = self.get("base_currency=ETH&disabled=false").json()
+
+        self.assertEqual([market["id"] for market in clp], ["BTC-CLP", "ETH-CLP"])
+        self.assertEqual([market["id"] for market in enabled_eth], ["ETH-BTC"])
+        self.assertEqual(len(self.get("").json()), 4)
+
+    def test_projection(self):
+        markets = self.get("fields=disabled,id").json()
+
+        self.assertEqual(markets[2], {"id": "ETH-CLP", "disabled": True})
+
+    def test_pages_follow_the_cursor(self):
+        first = self.get("limit=3&fields=id").json()
+        second = self.get(f"limit=3&fields=id&cursor={first['next']}").json()
+
+        self.assertEqual(
+            [market["id"] for market in first["results"]],
+            ["BTC-CLP", "BTC-COP", "ETH-BTC"],
+        )
+        self.assertEqual(second, {"results": [{"id": "ETH-CLP"}], "next": None})
+
+    def test_page_keeps_the_list_version(self):
+        whole = self.get("")
+        first = self.get("limit=1")
+
+        self.assertEqual(first["ETag"], whole["ETag"])
+        self.assertEqual(
+            self.get("limit=1", HTTP_IF_NONE_MATCH=whole["ETag"]).status_code, 304
+        )
+
+    def test_invalid_query(self):
+        unknown = self.get("fields=id,price")
+        cursor = self.get("cursor=not-a-cursor")
+
+        self.assertEqual(unknown.status_code, 400)
+        self.assertEqual(unknown.json()["fields"], ["Unknown fields: price"])
+        self.assertEqual(cursor.status_code, 400)
+
+    @async_to_sync
+    async def test_async_list(self):
+        view = AsyncMarketViewSet.as_view({"get": "list"})
+        request = AsyncRequestFactory().get("/", {"quote_currency": "CLP"})
+
+        response = await view(request)
+
+        self.assertEqual(
+            [market["id"] for market in content(response)], ["BTC-CLP", "ETH-CLP"]
+        )
+
+
+class MarketSpreadListingTestCase(TestCase):
+    def setUp(self):
+        ticker_cache.clear()
+        self.client = APIClient()
+
+    @patch.object(BudaAPIClient, "get_tickers", AsyncMock())
+    def test_filter_and_projection(self):
+        BudaAPIClient.get_tickers.return_value = [
+            make_ticker("BTC-CLP"),
+            make_ticker("ETH-BTC"),
+        ]
+
+        response = self.client.get(
+            "/api/v1/markets/spreads/?quote_currency=CLP&fields=market_id,spread_amount"
+        )
+
+        self.assertEqual(
+            response.json(), [{"market_id": "BTC-CLP", "spread_amount": 2.0}]
+        )
+
+
+class SpreadAlertListingTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.alerts = [
+            SpreadAlert.objects.create(market_id=market_id, alert_threshold=1.0)
+            for market_id in ("BTC-CLP", "ETH-CLP", "btc-clp", "BTC-CLP")
+        ]
+
+    def test_pages_by_id(self):
+        with self.assertNumQueries(1):
+            first = self.client.get("/api/v1/spread-alerts/?limit=2").json()
+        second = self.client.get(
+            f"/api/v1/spread-alerts/?limit=2&cursor={first['next']}"
+        ).json()
+
+        ids = [alert.pk for alert in self.alerts]
+        self.assertEqual([alert["id"] for alert in first["results"]], ids[:2])
+        self.assertEqual([alert["id"] for alert in second["results"]], ids[2:])
+        self.assertIsNone(second["next"])
+        self.assertEqual(decode_cursor(first["next"]), ids[1])
+
+    def test_market_filter_and_projection(self):
+        response = self.client.get(
+            "/api/v1/spread-alerts/?market_id=BTC-CLP&fields=id"
+        ).json()
+
+        btc_clp = [self.alerts[0], self.alerts[2], self.alerts[3]]
+        self.assertEqual(response["results"], [{"id": alert.pk} for alert in btc_clp])
+
+    def test_cursor_of_another_list_is_rejected(self):
+        response = self.client.get(
+            f"/api/v1/spread-alerts/?cursor={encode_cursor('btc-clp')}"
+        )
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,92 @@
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from spread import metrics
+from spread.clients.buda import BudaAPIClient
+from spread.metrics import Histogram
+from spread.metrics import timed
+from spread.services.spread import ticker_cache
+from spread.tests.test_async_views import make_ticker
+
+
+class HistogramTestCase(TestCase):
+    def test_samples_are_cumulative(self):
+        histogram = Histogram("latency_seconds", "Latency.", ("view",), (0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 2.0):
+            histogram.observe(value, "spread")
+
+        samples = list(histogram.samples())
+
+        self.assertEqual(
+            samples,
+            [
+                "# HELP latency_seconds Latency.",
+                "# TYPE latency_seconds histogram",
+                'latency_seconds_bucket{view="spread",le="0.1"} 1',
+                'latency_seconds_bucket{view="spread",le="1.0"} 3',
+                'latency_seconds_bucket{view="spread",le="+Inf"} 4',
+                'latency_seconds_sum{view="spread"} 3.05',
+                'latency_seconds_count{view="spread"} 4',
+            ],
+        )
+
+
+class TimedTestCase(TestCase):
+    def setUp(self):
+        metrics.stage_seconds.clear()
+
+    @override_settings(SPREAD_METRICS_ENABLED=False)
+    def test_disabled_leaves_function_untouched(self):
+        def stage():
+            ...
+
+        self.assertIs(timed()(stage), stage)
+
+    @override_settings(SPREAD_METRICS_ENABLED=True)
+    def test_records_sync_and_async_calls(self):
+        @timed("parse")
+        def parse():
+            return 1
+
+        @timed()
+        async def fetch():
+            return 2
+
+        self.assertEqual(parse(), 1)
+        self.assertEqual(async_to_sync(fetch)(), 2)
+
+        samples = "\n".join(metrics.stage_seconds.samples())
+        self.assertIn('spread_stage_seconds_count{stage="parse"} 1', samples)
+        self.assertIn("fetch", samples)
+
+
+class MetricsEndpointTestCase(TestCase):
+    def setUp(self):
+        ticker_cache.clear()
+        metrics.request_seconds.clear()
+        self.client = APIClient()
+
+    @override_settings(SPREAD_METRICS_ENABLED=False)
+    def test_disabled_endpoint_is_not_found(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+    @override_settings(SPREAD_METRICS_ENABLED=True)
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_view_latency_is_exported(self):
+        BudaAPIClient.get_ticker.return_value = make_ticker("BTC-CLP")
+
+        self.client.get("/api/v1/markets/BTC-CLP/spread/")
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        self.assertIn(
+            'spread_request_seconds_count{view="markets-spread",method="GET",'
+            'status="200"} 1',
+            response.content.decode(),
+        )
@@ -0,0 +1,88 @@
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from spread.clients.buda import BudaAPIClient
+from spread.clients.buda.types import OrderBook
+from spread.services.markets import ObjectDoesNotExist
+from spread.services.markets import market_registry
+from spread.services.order_book import compute_order_book_spread
+from spread.services.order_book import get_order_book_spread
+
+
+def make_order_book(asks, bids) -> OrderBook:
+    return OrderBook.from_response(
+        {
+            "order_book": {
+                "asks": [[str(price), str(amount)] for price, amount in asks],
+                "bids": [[str(price), str(amount)] for price, amount in bids],
+            }
+        }
+    )
+
+
+class OrderBookSpreadTestCase(TestCase):
+    def setUp(self):
+        self.order_book = make_order_book(
+            asks=[(101.0, 1.0), (102.0, 2.0), (110.0, 5.0)],
+            bids=[(99.0, 1.0), (98.0, 2.0), (90.0, 5.0)],
+        )
+
+    def test_top_of_book_spread(self):
+        spread = compute_order_book_spread("BTC-CLP", self.order_book, 0.0, 0.0)
+
+        self.assertEqual(spread.best_ask, 101.0)
+        self.assertEqual(spread.best_bid, 99.0)
+        self.assertEqual(spread.spread_amount, 2.0)
+        self.assertIsNone(spread.effective_spread_amount)
+
+    def test_effective_spread_walks_levels(self):
+        spread = compute_order_book_spread("BTC-CLP", self.order_book, 203.0, 0.0)
+
+        # 101 buys 1.0 at 101 and 102 buys 1.0 at 102
+        self.assertAlmostEqual(spread.effective_ask, 101.5)
+        # 99 sells 1.0 at 99 and 104 sells 104 / 98 at 98
+        self.assertAlmostEqual(spread.effective_bid, 203.0 / (1.0 + 104.0 / 98.0))
+        self.assertAlmostEqual(
+            spread.effective_spread_amount, spread.effective_ask - spread.effective_bid
+        )
+
+    def test_effective_spread_beyond_book_depth(self):
+        spread = compute_order_book_spread("BTC-CLP", self.order_book, 10_000.0, 0.0)
+
+        self.assertIsNone(spread.effective_ask)
+        self.assertIsNone(spread.effective_bid)
+        self.assertIsNone(spread.effective_spread_amount)
+
+    def test_depth_within_bps_of_mid(self):
+        # mid is 100, 250 bps is a 2.5 band around it
+        spread = compute_order_book_spread("BTC-CLP", self.order_book, 0.0, 250.0)
+
+        self.assertEqual(spread.ask_depth, 3.0)
+        self.assertEqual(spread.bid_depth, 3.0)
+
+    def test_depth_includes_levels_on_the_band_edge(self):
+        # 200 bps is a 2.0 band, right on 102 and 98
+        on_edge = compute_order_book_spread("BTC-CLP", self.order_book, 0.0, 200.0)
+        no_band = compute_order_book_spread("BTC-CLP", self.order_book, 0.0, 0.0)
+
+        self.assertEqual((on_edge.ask_depth, on_edge.bid_depth), (3.0, 3.0))
+        self.assertEqual((no_band.ask_depth, no_band.bid_depth), (0.0, 0.0))
+
+    def test_empty_side(self):
+        order_book = make_order_book(asks=[(101.0, 1.0)], bids=[])
+
+        spread = compute_order_book_spread("BTC-CLP", order_book, 50.0, 100.0)
+
+        self.assertEqual(spread.best_ask, 101.0)
+        self.assertIsNone(spread.best_bid)
+        self.assertIsNone(spread.spread_amount)
+        self.assertEqual(spread.ask_depth, 0.0)
+
+    def test_unknown_market(self):
+        market_registry.clear()
+
+        with patch.object(BudaAPIClient, "get_markets", AsyncMock(return_value=[])):
+            with self.assertRaises(ObjectDoesNotExist):
+                get_order_book_spread("LOL-CLP", 0.0, 0.0)
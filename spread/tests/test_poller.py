@@ -0,0 +1,150 @@
+import asyncio
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from aiohttp.client_exceptions import ClientResponseError
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.test import override_settings
+
+from spread.clients.buda import BudaAPIClient
+from spread.clients.buda.types import Ticker
+from spread.services.poller import MarketDataPoller
+from spread.services.poller import MarketDataSnapshot
+from spread.services.poller import market_data_poller
+from spread.services.spread import get_all_spreads
+from spread.services.spread import get_market_spread
+from spread.services.spread import ticker_cache
+
+
+def make_ticker(market_id: str, min_ask: str = "101.0") -> Ticker:
+    return Ticker.from_response(
+        {
+            "market_id": market_id,
+            "last_price": ["100.0", "CLP"],
+            "min_ask": [min_ask, "CLP"],
+            "max_bid": ["99.0", "CLP"],
+            "volume": ["500.0", "BTC"],
+            "price_variation_24h": "0.05",
+            "price_variation_7d": "0.1",
+        }
+    )
+
+
+class MarketDataSnapshotTestCase(TestCase):
+    def test_merge_publishes_new_version(self):
+        empty = MarketDataSnapshot()
+
+        first = empty.merge([make_ticker("BTC-CLP"), make_ticker("ETH-CLP")])
+        second = first.merge([make_ticker("BTC-CLP", min_ask="105.0")])
+
+        self.assertIsNone(empty.age)
+        self.assertEqual(len(empty.tickers), 0)
+        self.assertEqual(first.version, 1)
+        self.assertEqual(second.version, 2)
+        self.assertEqual(first.get("BTC-CLP").ticker.min_ask.amount, 101.0)
+        self.assertEqual(second.get("btc-clp").ticker.min_ask.amount, 105.0)
+        self.assertIs(second.get("ETH-CLP"), first.get("ETH-CLP"))
+        self.assertGreaterEqual(second.age, 0)
+
+    def test_snapshot_is_read_only(self):
+        snapshot = MarketDataSnapshot().merge([make_ticker("BTC-CLP")])
+
+        with self.assertRaises(TypeError):
+            snapshot.tickers["eth-clp"] = snapshot.get("BTC-CLP")
+
+
+class MarketDataPollerTestCase(TestCase):
+    def setUp(self):
+        self.fetch_all = AsyncMock(return_value=[make_ticker("BTC-CLP")])
+        self.fetch_one = AsyncMock(return_value=make_ticker("ETH-CLP"))
+        self.poller = MarketDataPoller(
+            fetch_all=self.fetch_all,
+            fetch_one=self.fetch_one,
+            interval=5.0,
+            market_intervals={"ETH-CLP": 1.0},
+        )
+
+    @async_to_sync
+    async def test_poll_all_and_single_market(self):
+        await self.poller.poll()
+        await self.poller.poll("ETH-CLP")
+
+        self.assertEqual(self.poller.snapshot.version, 2)
+        self.assertIsNotNone(self.poller.snapshot.get("BTC-CLP"))
+        self.assertIsNotNone(self.poller.snapshot.get("ETH-CLP"))
+        self.fetch_one.assert_awaited_once_with("ETH-CLP")
+
+    @async_to_sync
+    async def test_failed_poll_keeps_snapshot(self):
+        await self.poller.poll()
+        snapshot = self.poller.snapshot
+        self.fetch_all.side_effect = ClientResponseError(None, None, status=503)
+
+        await self.poller.poll()
+
+        self.assertIs(self.poller.snapshot, snapshot)
+
+    @async_to_sync
+    async def test_run_outlives_unexpected_errors(self):
+        self.fetch_all.side_effect = [
+            ValueError("bad payload"),
+            [make_ticker("BTC-CLP")],
+        ]
+        poller = MarketDataPoller(
+            fetch_all=self.fetch_all,
+            fetch_one=self.fetch_one,
+            interval=0.001,
+            market_intervals={},
+        )
+
+        with self.assertLogs("spread.services.poller", "ERROR"):
+            task = asyncio.create_task(poller.run())
+            while poller.snapshot.version == 0 and not task.done():
+                await asyncio.sleep(0.001)
+        task.cancel()
+
+        self.assertEqual(poller.snapshot.version, 1)
+
+
+@override_settings(SPREAD_POLLER_ENABLED=True)
+class SnapshotServicesTestCase(TestCase):
+    def setUp(self):
+        ticker_cache.clear()
+        self.snapshot = market_data_poller.snapshot
+        market_data_poller.snapshot = MarketDataSnapshot().merge(
+            [make_ticker("BTC-CLP"), make_ticker("ETH-CLP", min_ask="110.0")]
+        )
+        patcher = patch.object(market_data_poller, "start")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        market_data_poller.snapshot = self.snapshot
+
+    def test_spreads_are_read_from_snapshot(self):
+        mock_get_ticker = AsyncMock()
+        mock_get_tickers = AsyncMock()
+
+        with patch.object(BudaAPIClient, "get_ticker", mock_get_ticker), patch.object(
+            BudaAPIClient, "get_tickers", mock_get_tickers
+        ):
+            spread = get_market_spread("eth-clp")
+            all_spreads = get_all_spreads()
+
+        self.assertEqual(spread.spread_amount, 11.0)
+        self.assertEqual(
+            spread.updated_at, market_data_poller.snapshot.get("ETH-CLP").updated_at
+        )
+        self.assertEqual(len(all_spreads), 2)
+        mock_get_ticker.assert_not_awaited()
+        mock_get_tickers.assert_not_awaited()
+
+    def test_market_missing_from_snapshot_falls_back_to_cache(self):
+        mock_get_ticker = AsyncMock(return_value=make_ticker("LTC-CLP"))
+
+        with patch.object(BudaAPIClient, "get_ticker", mock_get_ticker):
+            spread = get_market_spread("LTC-CLP")
+
+        self.assertEqual(spread.market_id, "LTC-CLP")
+        mock_get_ticker.assert_awaited_once()
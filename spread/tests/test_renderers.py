@@ -0,0 +1,71 @@
+import json
+from datetime import datetime, timezone
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from spread.renderers import FastJSONRenderer
+from spread.serializers import MarketSerializer
+from spread.serializers import MarketSpreadDataSerializer
+from spread.serializers import OrderBookSpreadSerializer
+from spread.serializers import SpreadAlertTrackingSerializer
+from spread.services.order_book import OrderBookSpread
+from spread.services.types import MarketSpread
+from spread.services.types import SpreadAlertStatus
+from spread.services.types import SpreadAlertTracking
+from spread.tests.test_async_views import make_market
+
+
+class FastJSONRendererTestCase(TestCase):
+    def assertRendersLikeSerializer(self, instance, serializer_class):
+        expected = JSONRenderer().render(serializer_class(instance=instance).data)
+        self.assertEqual(FastJSONRenderer().render(instance), expected)
+        self.assertEqual(
+            FastJSONRenderer().render([instance, instance]),
+            JSONRenderer().render(
+                serializer_class(instance=[instance, instance], many=True).data
+            ),
+        )
+
+    def test_market(self):
+        self.assertRendersLikeSerializer(make_market("BTC-CLP"), MarketSerializer)
+
+    def test_market_spread(self):
+        updated_at = datetime(2024, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        self.assertRendersLikeSerializer(
+            MarketSpread("BTC-CLP", 0, updated_at), MarketSpreadDataSerializer
+        )
+        self.assertRendersLikeSerializer(
+            MarketSpread("BTC-CLP", 12.5), MarketSpreadDataSerializer
+        )
+
+    def test_alert_tracking(self):
+        self.assertRendersLikeSerializer(
+            SpreadAlertTracking(7, "BTC-CLP", 1.0, 2.0, SpreadAlertStatus.GREATER),
+            SpreadAlertTrackingSerializer,
+        )
+
+    def test_optional_fields(self):
+        self.assertRendersLikeSerializer(
+            OrderBookSpread(
+                "BTC-CLP", None, None, None, 0.0, None, None, None, 10.0, 0.0, 0.0
+            ),
+            OrderBookSpreadSerializer,
+        )
+
+    def test_plain_data_and_indent(self):
+        renderer = FastJSONRenderer()
+        data = {"detail": "Not found.", "ids": [1, 2]}
+
+        self.assertEqual(renderer.render(data), JSONRenderer().render(data))
+        self.assertIsNone(json.loads(renderer.render([None]))[0])
+        self.assertEqual(
+            renderer.render(data, "application/json; indent=4"),
+            JSONRenderer().render(data, "application/json; indent=4"),
+        )
+
+    def test_list_field_errors_keyed_by_index(self):
+        renderer = FastJSONRenderer()
+        data = {"ids": {0: ["A valid integer is required."]}}
+
+        self.assertEqual(renderer.render(data), JSONRenderer().render(data))
@@ -0,0 +1,154 @@
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from aiohttp import ClientResponseError
+from aioresponses import aioresponses
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from spread.clients.buda import BudaAPIClient
+from spread.clients.buda import BudaAPIEndpoint
+from spread.clients.buda.resilience import CircuitBreaker
+from spread.clients.buda.resilience import CircuitOpenError
+from spread.services.spread import ticker_cache
+from spread.tests.test_limiter import FakeClock
+
+
+def upstream_error(status: int = 503) -> ClientResponseError:
+    return ClientResponseError(None, None, status=status)
+
+
+class CircuitBreakerTestCase(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            failure_threshold=2, reset_timeout=30.0, clock=self.clock
+        )
+
+    async def fail(self, status: int = 503):
+        raise upstream_error(status)
+
+    async def succeed(self):
+        return "ok"
+
+    @async_to_sync
+    async def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            with self.assertRaises(ClientResponseError):
+                await self.breaker.call(self.fail)
+
+        with self.assertRaises(CircuitOpenError):
+            await self.breaker.call(self.succeed)
+        self.assertEqual(self.breaker.state, "open")
+
+    @async_to_sync
+    async def test_client_errors_keep_circuit_closed(self):
+        for _ in range(3):
+            with self.assertRaises(ClientResponseError):
+                await self.breaker.call(lambda: self.fail(404))
+
+        self.assertEqual(self.breaker.state, "closed")
+
+    @async_to_sync
+    async def test_trial_call_closes_circuit(self):
+        for _ in range(2):
+            with self.assertRaises(ClientResponseError):
+                await self.breaker.call(self.fail)
+
+        self.clock.now = 30.0
+        self.assertEqual(self.breaker.state, "half-open")
+        self.assertEqual(await self.breaker.call(self.succeed), "ok")
+        self.assertEqual(self.breaker.state, "closed")
+
+    @async_to_sync
+    async def test_failed_trial_reopens_circuit(self):
+        for _ in range(2):
+            with self.assertRaises(ClientResponseError):
+                await self.breaker.call(self.fail)
+
+        self.clock.now = 30.0
+        with self.assertRaises(ClientResponseError):
+            await self.breaker.call(self.fail)
+
+        self.assertEqual(self.breaker.state, "open")
+
+
+@override_settings(BUDA_API_RETRY_BACKOFF=0.0)
+class ResilientClientTestCase(TestCase):
+    def setUp(self):
+        self.client = BudaAPIClient()
+        self.url = self.client.build_url(BudaAPIEndpoint.MARKETS)
+
+    @async_to_sync
+    async def tearDown(self):
+        await self.client.close()
+
+    @async_to_sync
+    async def test_server_errors_are_retried(self):
+        with aioresponses() as mock_aiohttp:
+            mock_aiohttp.get(self.url, status=502)
+            mock_aiohttp.get(self.url, payload={"markets": []})
+
+            markets = await self.client.get_markets()
+
+        self.assertEqual(markets, [])
+
+    @async_to_sync
+    async def test_retries_are_bounded(self):
+        with aioresponses() as mock_aiohttp:
+            for _ in range(self.client.retries + 2):
+                mock_aiohttp.get(self.url, status=503)
+
+            with self.assertRaises(ClientResponseError):
+                await self.client.get_markets()
+            requests = sum(len(calls) for calls in mock_aiohttp.requests.values())
+
+        self.assertEqual(requests, self.client.retries + 1)
+
+    @async_to_sync
+    async def test_client_errors_are_not_retried(self):
+        with aioresponses() as mock_aiohttp:
+            mock_aiohttp.get(self.url, status=404)
+            mock_aiohttp.get(self.url, payload={"markets": []})
+
+            with self.assertRaises(ClientResponseError):
+                await self.client.get_markets()
+
+    @async_to_sync
+    async def test_open_circuit_fails_without_request(self):
+        self.client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+        self.client.retries = 0
+
+        with aioresponses() as mock_aiohttp:
+            mock_aiohttp.get(self.url, status=503)
+            with self.assertRaises(ClientResponseError):
+                await self.client.get_markets()
+            with self.assertRaises(CircuitOpenError):
+                await self.client.get_markets()
+            requests = sum(len(calls) for calls in mock_aiohttp.requests.values())
+
+        self.assertEqual(requests, 1)
+
+
+class UpstreamFailureViewTestCase(TestCase):
+    def setUp(self):
+        ticker_cache.clear()
+        self.client = APIClient()
+
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_upstream_failure_is_service_unavailable(self):
+        BudaAPIClient.get_ticker.side_effect = upstream_error()
+
+        response = self.client.get("/api/v1/markets/BTC-CLP/spread/")
+
+        self.assertEqual(response.status_code, 503)
+
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_unknown_market_is_not_found(self):
+        BudaAPIClient.get_ticker.side_effect = upstream_error(404)
+
+        response = self.client.get("/api/v1/markets/LOL-CLP/spread/")
+
+        self.assertEqual(response.status_code, 404)
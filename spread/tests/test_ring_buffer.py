@@ -0,0 +1,160 @@
+import shutil
+import struct
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.test import override_settings
+
+from spread.clients.buda import BudaAPIClient
+from spread.services import ring_buffer
+from spread.services.ring_buffer import HEADER_SIZE
+from spread.services.ring_buffer import RECORD
+from spread.services.ring_buffer import SpreadRecord
+from spread.services.ring_buffer import SpreadRingBuffer
+from spread.services.spread import get_all_spreads
+from spread.services.spread import get_market_spread
+from spread.services.spread import ticker_cache
+from spread.tests.test_async_views import make_ticker
+
+
+def record(market_id: str, spread: float, timestamp: float | None = None):
+    timestamp = time.time() if timestamp is None else timestamp
+    return SpreadRecord(market_id, 100.0, 100.0 + spread, spread, timestamp)
+
+
+class SpreadRingBufferTestCase(TestCase):
+    def setUp(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        self.path = root / "spread.ring"
+        self.writer = SpreadRingBuffer.create(self.path, capacity=4)
+        self.reader = SpreadRingBuffer.open(self.path)
+
+    def test_reader_sees_latest_record_of_each_market(self):
+        self.writer.append(
+            [record("BTC-CLP", 1.0), record("ETH-CLP", 2.0), record("BTC-CLP", 3.0)]
+        )
+
+        latest = self.reader.latest()
+
+        self.assertCountEqual(latest, ["btc-clp", "eth-clp"])
+        self.assertEqual(latest["btc-clp"].spread, 3.0)
+        self.assertEqual(self.reader.get("btc-clp").spread, 3.0)
+        self.assertEqual(self.reader.get("ETH-CLP").market_id, "ETH-CLP")
+        self.assertIsNone(self.reader.get("LTC-CLP"))
+
+    def test_oldest_records_are_overwritten(self):
+        self.writer.append([record(f"M{index}-CLP", index) for index in range(6)])
+
+        self.assertEqual(self.reader.written, 6)
+        self.assertEqual(
+            sorted(self.reader.latest()), ["m2-clp", "m3-clp", "m4-clp", "m5-clp"]
+        )
+
+    def test_records_being_written_are_skipped(self):
+        self.writer.append([record("BTC-CLP", 1.0), record("BTC-CLP", 2.0)])
+        # Slot 1 caught halfway through a rewrite: its sequence number is odd
+        struct.pack_into("<Q", self.writer.buffer, HEADER_SIZE + RECORD.itemsize, 5)
+
+        self.assertEqual(self.reader.get("BTC-CLP").spread, 1.0)
+
+    def test_records_rewritten_while_copied_are_skipped(self):
+        self.writer.append([record("BTC-CLP", 1.0), record("BTC-CLP", 2.0)])
+        records = self.reader.records
+        writer = self.writer
+
+        class Rewritten:
+            """Slots whose sequence numbers are read before a rewrite lands."""
+
+            def __getitem__(self, key):
+                if isinstance(key, str):
+                    return records[key]
+                seq = records["seq"][key].copy()
+                # Wraps around the 4 slots onto the ones being read
+                writer.append([record("BTC-CLP", 9.0)] * 4)
+                copied = records[key].copy()
+                copied["seq"] = seq
+                return copied
+
+        self.reader.records = Rewritten()
+
+        self.assertIsNone(self.reader.get("BTC-CLP"))
+
+    def test_old_records_are_ignored(self):
+        self.writer.append([record("BTC-CLP", 1.0, timestamp=time.time() - 60)])
+
+        self.assertIsNone(self.reader.get("BTC-CLP", max_age=30))
+        self.assertEqual(self.reader.latest(max_age=30), {})
+
+    def test_writer_reuses_compatible_file(self):
+        self.writer.append([record("BTC-CLP", 1.0)])
+
+        writer = SpreadRingBuffer.create(self.path, capacity=4)
+        writer.append([record("BTC-CLP", 2.0)])
+
+        self.assertEqual(writer.inode, self.reader.inode)
+        self.assertEqual(self.reader.get("BTC-CLP").spread, 2.0)
+
+    def test_open_rejects_other_files(self):
+        self.path.write_bytes(b"\0" * 128)
+
+        with self.assertRaises(ValueError):
+            SpreadRingBuffer.open(self.path)
+
+
+class RingBufferSpreadServiceTestCase(TestCase):
+    def setUp(self):
+        ticker_cache.clear()
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        self.path = root / "spread.ring"
+        settings = override_settings(SPREAD_RING_BUFFER_PATH=str(self.path))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(setattr, ring_buffer, "_reader", None)
+
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_spread_is_read_from_ring_buffer(self):
+        writer = ring_buffer.open_ring_buffer_writer()
+        writer.append([record("BTC-CLP", 7.0)])
+
+        spread = get_market_spread("btc-clp")
+
+        self.assertEqual(spread.market_id, "BTC-CLP")
+        self.assertEqual(spread.spread_amount, 7.0)
+        BudaAPIClient.get_ticker.assert_not_awaited()
+
+    def test_replaced_ring_is_unmapped(self):
+        ring_buffer.open_ring_buffer_writer()
+        reader = ring_buffer.get_ring_buffer()
+
+        SpreadRingBuffer.create(self.path, capacity=8)
+
+        self.assertEqual(ring_buffer.get_ring_buffer().capacity, 8)
+        self.assertTrue(reader.buffer.closed)
+
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_spread_falls_back_to_cache_without_writer(self):
+        BudaAPIClient.get_ticker.return_value = make_ticker("BTC-CLP")
+
+        spread = get_market_spread("BTC-CLP")
+
+        self.assertEqual(spread.market_id, "BTC-CLP")
+        BudaAPIClient.get_ticker.assert_awaited_once()
+
+    @patch.object(BudaAPIClient, "get_tickers", AsyncMock())
+    def test_all_spreads_are_read_from_ring_buffer(self):
+        writer = ring_buffer.open_ring_buffer_writer()
+        writer.append([record("BTC-CLP", 1.0), record("ETH-CLP", 2.0)])
+
+        spreads = get_all_spreads()
+
+        self.assertEqual(
+            {spread.market_id: spread.spread_amount for spread in spreads},
+            {"BTC-CLP": 1.0, "ETH-CLP": 2.0},
+        )
+        BudaAPIClient.get_tickers.assert_not_awaited()
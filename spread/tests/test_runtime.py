@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from spread.clients.buda import BudaAPIClient
+from spread.clients.buda.runtime import BudaClientRuntime
+from spread.clients.buda.types import Ticker
+from spread.services.spread import get_market_spread
+from spread.services.spread import ticker_cache
+
+
+class BudaClientRuntimeTestCase(TestCase):
+    def setUp(self):
+        self.runtime = BudaClientRuntime()
+
+    def tearDown(self):
+        self.runtime.shutdown()
+
+    def test_run_returns_coroutine_result(self):
+        async def answer():
+            return 42
+
+        self.assertEqual(self.runtime.run(answer()), 42)
+
+    def test_session_is_reused(self):
+        first = self.runtime.session
+        second = self.runtime.session
+
+        self.assertIs(first, second)
+        self.assertFalse(first.closed)
+
+    def test_shutdown_closes_session(self):
+        session = self.runtime.session
+
+        self.runtime.shutdown()
+
+        self.assertTrue(session.closed)
+        self.assertFalse(self.runtime.running)
+
+    def test_shared_session_not_closed_by_client(self):
+        client = BudaAPIClient(session=self.runtime.session)
+
+        self.runtime.run(client.close())
+
+        self.assertFalse(self.runtime.session.closed)
+
+
+class SharedRuntimeServicesTestCase(TestCase):
+    def setUp(self):
+        ticker_cache.clear()
+
+    def test_consecutive_calls_share_session(self):
+        mock_ticker = Ticker.from_response(
+            {
+                "last_price": ["879789.0", "CLP"],
+                "market_id": "BTC-CLP",
+                "max_bid": ["876531.11", "CLP"],
+                "min_ask": ["879658.0", "CLP"],
+                "price_variation_24h": "0.005",
+                "price_variation_7d": "0.1",
+                "volume": ["102.0", "BTC"],
+            }
+        )
+        sessions = []
+
+        async def get_ticker(client, market_id):
+            sessions.append(client.async_session)
+            return mock_ticker
+
+        with patch.object(BudaAPIClient, "get_ticker", get_ticker):
+            get_market_spread("BTC-CLP")
+            get_market_spread("ETH-CLP")
+
+        self.assertEqual(len(sessions), 2)
+        self.assertIs(sessions[0], sessions[1])
@@ -1,23 +1,53 @@
 from unittest.mock import AsyncMock
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 from django.test import TestCase
+from rest_framework.test import APIClient
 
 from spread.clients.buda import BudaAPIClient
 from spread.clients.buda.types import Market
+from spread.clients.buda.types import MoneyAmount
 from spread.clients.buda.types import Ticker
 from spread.services.markets import get_market
 from spread.services.markets import get_markets
 from spread.services.markets import market_exists
+from spread.services.markets import market_registry
 from spread.services.markets import ObjectDoesNotExist
 from spread.services.spread import get_all_spreads
 from spread.services.spread import get_market_spread
+from spread.services.spread import ticker_cache
+from spread.services.spread_alert import get_alert_status
+from spread.services.spread_alert import get_alert_statuses
+from spread.services.threshold_index import threshold_index
 from spread.services.types import MarketSpread
+from spread.services.types import SpreadAlertStatus
+from spread.models import SpreadAlert
+from spread.tests.test_async_views import make_market
+from spread.tests.test_async_views import make_ticker
 
 from aiohttp.client_exceptions import ClientResponseError
 
 
 class MarketServicesTestCase(TestCase):
+    def setUp(self):
+        market_registry.clear()
+
+    @staticmethod
+    def make_market(market_id: str) -> Market:
+        return Market(
+            id=market_id,
+            name=market_id,
+            base_currency="BTC",
+            quote_currency="CLP",
+            minimum_order_amount=MoneyAmount(0.001, "BTC"),
+            taker_fee="0.8",
+            maker_fee="0.4",
+            max_orders_per_minute="100",
+            maker_discount_percentage="0.0",
+            taker_discount_percentage="0.0",
+            disabled=False,
+        )
+
     def test_get_markets(self):
         expected = [
             Market(
@@ -76,38 +106,69 @@ class MarketServicesTestCase(TestCase):
             }
         )
         mock_func = AsyncMock()
-        mock_func.return_value = expected
+        mock_func.return_value = [expected]
 
-        with patch.object(BudaAPIClient, "get_market", mock_func):
+        with patch.object(BudaAPIClient, "get_markets", mock_func):
             market = get_market("market_id")
 
             self.assertEqual(market, expected)
 
-    @patch("spread.services.markets.BudaAPIClient")
-    def test_get_market_not_found(self, mock_client):
-        mock_client.return_value.get_market.side_effect = ClientResponseError(
-            None, None, status=404
-        )
+    def test_get_market_not_found(self):
+        mock_func = AsyncMock()
+        mock_func.return_value = []
 
-        with self.assertRaises(ObjectDoesNotExist):
-            get_market("market_id")
+        with patch.object(BudaAPIClient, "get_markets", mock_func):
+            with self.assertRaises(ObjectDoesNotExist):
+                get_market("market_id")
 
-    @patch("spread.services.markets.get_market")
-    def test_market_exists(self, mock_get_market):
-        exists = market_exists("market_id")
+    def test_market_exists(self):
+        mock_func = AsyncMock()
+        mock_func.return_value = [self.make_market("BTC-CLP")]
 
-        self.assertTrue(exists)
+        with patch.object(BudaAPIClient, "get_markets", mock_func):
+            self.assertTrue(market_exists("BTC-CLP"))
+            self.assertTrue(market_exists("btc-clp"))
 
-    @patch("spread.services.markets.get_market")
-    def test_market_does_not_exist(self, mock_get_market):
-        mock_get_market.side_effect = ObjectDoesNotExist
+    def test_market_does_not_exist(self):
+        mock_func = AsyncMock()
+        mock_func.return_value = [self.make_market("BTC-CLP")]
 
-        exists = market_exists("market_id")
+        with patch.object(BudaAPIClient, "get_markets", mock_func):
+            exists = market_exists("market_id")
 
         self.assertFalse(exists)
 
+    def test_catalogue_is_fetched_once(self):
+        mock_func = AsyncMock()
+        mock_func.return_value = [self.make_market("BTC-CLP")]
+
+        with patch.object(BudaAPIClient, "get_markets", mock_func):
+            for _ in range(100):
+                market_exists("BTC-CLP")
+            get_market("BTC-CLP")
+            get_markets()
+
+        mock_func.assert_awaited_once()
+
+    def test_failed_refresh_keeps_catalogue(self):
+        mock_func = AsyncMock()
+        mock_func.return_value = [self.make_market("BTC-CLP")]
+
+        with patch.object(BudaAPIClient, "get_markets", mock_func):
+            get_markets()
+        market_registry._next_refresh = 0
+        mock_func.side_effect = ClientResponseError(None, None, status=503)
+        with patch.object(BudaAPIClient, "get_markets", mock_func):
+            exists = market_exists("BTC-CLP")
+
+        self.assertTrue(exists)
+        self.assertEqual(mock_func.await_count, 2)
+
 
 class MarketSpreadTestCase(TestCase):
+    def setUp(self):
+        ticker_cache.clear()
+
     def test_get_zero_spread(self):
         max_bid_amount = 879658.0
         min_ask_amount = 876531.11
@@ -216,12 +277,200 @@ class MarketSpreadTestCase(TestCase):
         mock_get_ticker.side_effect = mock_tickers
         mock_get_markets = AsyncMock()
         mock_get_markets.return_value = mock_markets
+        mock_get_tickers = AsyncMock()
+        mock_get_tickers.side_effect = ClientResponseError(None, None, status=503)
 
         with patch.object(BudaAPIClient, "get_ticker", mock_get_ticker), patch.object(
             BudaAPIClient, "get_markets", mock_get_markets
-        ):
+        ), patch.object(BudaAPIClient, "get_tickers", mock_get_tickers):
             all_spreads = get_all_spreads()
 
         self.assertEqual(len(all_spreads), 2)
         self.assertIsInstance(all_spreads[0], MarketSpread)
         self.assertIsInstance(all_spreads[1], MarketSpread)
+
+    def test_get_all_spreads_uses_bulk_tickers(self):
+        mock_tickers = [
+            Ticker.from_response(
+                {
+                    "last_price": ["879789.0", "CLP"],
+                    "market_id": market_id,
+                    "max_bid": ["879789.0", "CLP"],
+                    "min_ask": ["890789.0", "CLP"],
+                    "price_variation_24h": "0.005",
+                    "price_variation_7d": "0.1",
+                    "volume": ["102.0", "BTC"],
+                }
+            )
+            for market_id in ("BTC-CLP", "ETH-CLP")
+        ]
+        mock_get_tickers = AsyncMock()
+        mock_get_tickers.return_value = mock_tickers
+        mock_get_ticker = AsyncMock()
+        mock_get_markets = AsyncMock()
+
+        with patch.object(BudaAPIClient, "get_ticker", mock_get_ticker), patch.object(
+            BudaAPIClient, "get_markets", mock_get_markets
+        ), patch.object(BudaAPIClient, "get_tickers", mock_get_tickers):
+            all_spreads = get_all_spreads()
+
+        self.assertEqual(
+            [spread.market_id for spread in all_spreads], ["BTC-CLP", "ETH-CLP"]
+        )
+        self.assertEqual(all_spreads[0].spread_amount, 11000.0)
+        mock_get_tickers.assert_awaited_once()
+        mock_get_markets.assert_not_awaited()
+        mock_get_ticker.assert_not_awaited()
+
+    def test_get_all_spreads_skips_failing_markets(self):
+        mock_get_tickers = AsyncMock()
+        mock_get_tickers.side_effect = ClientResponseError(None, None, status=503)
+        mock_get_markets = AsyncMock()
+        mock_get_markets.return_value = [make_market("BTC-CLP"), make_market("ETH-CLP")]
+        mock_get_ticker = AsyncMock()
+        mock_get_ticker.side_effect = [
+            make_ticker("BTC-CLP"),
+            ClientResponseError(None, None, status=503),
+        ]
+
+        with patch.object(BudaAPIClient, "get_ticker", mock_get_ticker), patch.object(
+            BudaAPIClient, "get_markets", mock_get_markets
+        ), patch.object(BudaAPIClient, "get_tickers", mock_get_tickers):
+            all_spreads = get_all_spreads()
+
+        self.assertEqual([spread.market_id for spread in all_spreads], ["BTC-CLP"])
+
+
+class SpreadAlertStatusesTestCase(TestCase):
+    def setUp(self):
+        ticker_cache.clear()
+
+    def test_get_alert_statuses(self):
+        def make_ticker(market_id, min_ask):
+            return Ticker.from_response(
+                {
+                    "last_price": ["100.0", "CLP"],
+                    "market_id": market_id,
+                    "max_bid": ["100.0", "CLP"],
+                    "min_ask": [min_ask, "CLP"],
+                    "price_variation_24h": "0.005",
+                    "price_variation_7d": "0.1",
+                    "volume": ["102.0", "BTC"],
+                }
+            )
+
+        tickers = {
+            "BTC-CLP": make_ticker("BTC-CLP", "110.0"),
+            "ETH-CLP": make_ticker("ETH-CLP", "105.0"),
+        }
+        mock_get_ticker = AsyncMock(side_effect=lambda market_id: tickers[market_id])
+        alerts = [
+            SpreadAlert(pk=1, market_id="BTC-CLP", alert_threshold=5.0),
+            SpreadAlert(pk=2, market_id="ETH-CLP", alert_threshold=5.0),
+            SpreadAlert(pk=3, market_id="BTC-CLP", alert_threshold=10.0),
+            SpreadAlert(pk=4, market_id="ETH-CLP", alert_threshold=7.5),
+            SpreadAlert(pk=5, market_id="BTC-CLP", alert_threshold=20.0),
+        ]
+
+        with patch.object(BudaAPIClient, "get_ticker", mock_get_ticker):
+            statuses = get_alert_statuses(alerts)
+
+        self.assertEqual(mock_get_ticker.await_count, 2)
+        self.assertEqual([status.alert_id for status in statuses], [1, 2, 3, 4, 5])
+        self.assertEqual(
+            [status.status for status in statuses],
+            [
+                SpreadAlertStatus.GREATER,
+                SpreadAlertStatus.EQUAL,
+                SpreadAlertStatus.EQUAL,
+                SpreadAlertStatus.SMALLER,
+                SpreadAlertStatus.SMALLER,
+            ],
+        )
+        self.assertEqual(statuses[0].spread, 10.0)
+        self.assertEqual(
+            statuses,
+            [get_alert_status(alert) for alert in alerts],
+        )
+
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_alerts_of_failing_markets_are_left_out(self):
+        def get_ticker(market_id):
+            if market_id == "ETH-CLP":
+                raise ClientResponseError(None, None, status=503)
+            return make_ticker(market_id)
+
+        BudaAPIClient.get_ticker.side_effect = get_ticker
+        alerts = [
+            SpreadAlert(pk=1, market_id="BTC-CLP", alert_threshold=1.0),
+            SpreadAlert(pk=2, market_id="ETH-CLP", alert_threshold=1.0),
+            SpreadAlert(pk=3, market_id="BTC-CLP", alert_threshold=5.0),
+        ]
+
+        statuses = get_alert_statuses(alerts)
+
+        self.assertEqual([status.alert_id for status in statuses], [1, 3])
+
+    @patch.object(BudaAPIClient, "get_ticker", AsyncMock())
+    def test_statuses_fail_when_every_market_fails(self):
+        BudaAPIClient.get_ticker.side_effect = ClientResponseError(
+            None, None, status=503
+        )
+        alerts = [SpreadAlert(pk=1, market_id="BTC-CLP", alert_threshold=1.0)]
+
+        with self.assertRaises(ClientResponseError):
+            get_alert_statuses(alerts)
+
+
+class SpreadAlertBulkCreateTestCase(TestCase):
+    def setUp(self):
+        market_registry.clear()
+        threshold_index.clear()
+        self.client = APIClient()
+
+    def test_bulk_create_reports_invalid_items(self):
+        mock_get_markets = AsyncMock(
+            return_value=[make_market("BTC-CLP"), make_market("ETH-CLP")]
+        )
+        threshold_index.load([])
+        alerts = [
+            {"market_id": "BTC-CLP", "alert_threshold": 5.0},
+            {"market_id": "LOL-CLP", "alert_threshold": 5.0},
+            {"market_id": "eth-clp", "alert_threshold": 7.5},
+            {"market_id": "BTC-CLP"},
+        ]
+
+        with patch.object(BudaAPIClient, "get_markets", mock_get_markets):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    "/api/v1/spread-alerts/bulk/", {"alerts": alerts}, format="json"
+                )
+
+        self.assertEqual(response.status_code, 201)
+        created = response.json()["created"]
+        self.assertEqual(
+            [alert["market_id"] for alert in created], ["BTC-CLP", "eth-clp"]
+        )
+        self.assertEqual(
+            [error["index"] for error in response.json()["errors"]], [1, 3]
+        )
+        self.assertEqual(SpreadAlert.objects.count(), 2)
+        mock_get_markets.assert_awaited_once()
+        self.assertEqual(
+            threshold_index.crossings("ETH-CLP", 0.0, 10.0),
+            [(7.5, created[1]["id"])],
+        )
+
+    def test_bulk_create_without_valid_items(self):
+        mock_get_markets = AsyncMock(return_value=[make_market("BTC-CLP")])
+
+        with patch.object(BudaAPIClient, "get_markets", mock_get_markets):
+            response = self.client.post(
+                "/api/v1/spread-alerts/bulk/",
+                {"alerts": [{"market_id": "LOL-CLP", "alert_threshold": 1.0}]},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["created"], [])
+        self.assertFalse(SpreadAlert.objects.exists())
@@ -0,0 +1,127 @@
+import asyncio
+from unittest import skipIf
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import TestCase
+
+from spread.models import SpreadAlert
+from spread.services import streaming
+from spread.services.streaming import SpreadStreamHub
+from spread.services.streaming import Subscription
+from spread.services.streaming import stream_alert_status
+from spread.services.types import MarketSpread
+from spread.services.types import SpreadAlertStatus
+
+
+class FakeSpreadSource:
+    def __init__(self, *amounts):
+        self.amounts = list(amounts)
+        self.calls = 0
+
+    async def __call__(self, market_id):
+        amount = self.amounts[min(self.calls, len(self.amounts) - 1)]
+        self.calls += 1
+        return MarketSpread(market_id, amount)
+
+
+class SubscriptionTestCase(TestCase):
+    @async_to_sync
+    async def test_slow_consumer_drops_oldest_updates(self):
+        subscription = Subscription(max_pending=2)
+
+        for amount in (1.0, 2.0, 3.0):
+            subscription.push(MarketSpread("BTC-CLP", amount))
+
+        self.assertEqual(subscription.dropped, 1)
+        self.assertEqual((await subscription.get(1)).spread_amount, 2.0)
+        self.assertEqual((await subscription.get(1)).spread_amount, 3.0)
+        self.assertIsNone(await subscription.get(0.01))
+
+
+class SpreadStreamHubTestCase(TestCase):
+    @async_to_sync
+    async def test_subscribers_share_one_feed_and_get_only_changes(self):
+        source = FakeSpreadSource(1.0, 1.0, 2.0, 2.0, 3.0)
+        hub = SpreadStreamHub(fetch=source, interval=0.001, max_pending=8)
+        first = hub.updates("BTC-CLP", heartbeat=1)
+        second = hub.updates("btc-clp", heartbeat=1)
+
+        received = [await anext(first) for _ in range(3)]
+        received_second = await anext(second)
+
+        self.assertEqual(len(hub.feeds), 1)
+        self.assertEqual([spread.spread_amount for spread in received], [1, 2, 3])
+        self.assertEqual(received_second.spread_amount, 3.0)
+        await first.aclose()
+        self.assertEqual(len(hub.feeds), 1)
+        await second.aclose()
+        self.assertEqual(hub.feeds, {})
+
+    @async_to_sync
+    async def test_heartbeat_when_idle(self):
+        hub = SpreadStreamHub(
+            fetch=FakeSpreadSource(1.0), interval=0.001, max_pending=8
+        )
+        updates = hub.updates("BTC-CLP", heartbeat=0.05)
+
+        self.assertEqual((await anext(updates)).spread_amount, 1.0)
+        self.assertIsNone(await anext(updates))
+        await updates.aclose()
+
+    @async_to_sync
+    async def test_feed_outlives_unexpected_errors(self):
+        source = FakeSpreadSource(1.0)
+
+        async def fetch(market_id):
+            if source.calls == 0:
+                source.calls += 1
+                raise ValueError("unexpected payload")
+            return await source(market_id)
+
+        hub = SpreadStreamHub(fetch=fetch, interval=0.001, max_pending=8)
+        updates = hub.updates("BTC-CLP", heartbeat=1)
+
+        with self.assertLogs("spread.services.streaming", "ERROR"):
+            self.assertEqual((await anext(updates)).spread_amount, 1.0)
+        await updates.aclose()
+
+
+class StreamRoutesTestCase(TestCase):
+    @skipIf(settings.SPREAD_ASYNC_VIEWS, "streams are routed with async views")
+    def test_not_routed_without_async_views(self):
+        alert = SpreadAlert.objects.create(market_id="BTC-CLP", alert_threshold=1)
+
+        market = self.client.get("/api/v1/markets/BTC-CLP/spread/stream/")
+        status = self.client.get(f"/api/v1/spread-alerts/{alert.pk}/stream/")
+
+        self.assertEqual(market.status_code, 404)
+        self.assertEqual(status.status_code, 404)
+
+
+class AlertStatusStreamTestCase(TestCase):
+    @async_to_sync
+    async def test_only_status_transitions_are_streamed(self):
+        hub = SpreadStreamHub(
+            fetch=FakeSpreadSource(1.0, 2.0, 6.0, 7.0, 5.0),
+            interval=0.001,
+            max_pending=8,
+        )
+        alert = SpreadAlert(pk=1, market_id="BTC-CLP", alert_threshold=5.0)
+        original_hub = streaming.spread_stream_hub
+        streaming.spread_stream_hub = hub
+        try:
+            updates = stream_alert_status(alert)
+            statuses = [(await anext(updates)).status for _ in range(3)]
+            await updates.aclose()
+        finally:
+            streaming.spread_stream_hub = original_hub
+
+        self.assertEqual(
+            statuses,
+            [
+                SpreadAlertStatus.SMALLER,
+                SpreadAlertStatus.GREATER,
+                SpreadAlertStatus.EQUAL,
+            ],
+        )
@@ -0,0 +1,78 @@
+from django.test import TestCase
+
+from spread.models import SpreadAlert
+from spread.services.threshold_index import ThresholdIndex
+from spread.services.threshold_index import get_crossed_alerts
+from spread.services.threshold_index import threshold_index
+
+
+class ThresholdIndexTestCase(TestCase):
+    def setUp(self):
+        self.index = ThresholdIndex()
+        self.index.load(
+            [
+                (1, "BTC-CLP", 10.0),
+                (2, "BTC-CLP", 20.0),
+                (3, "BTC-CLP", 30.0),
+                (4, "BTC-CLP", 20.0),
+                (5, "ETH-CLP", 15.0),
+            ]
+        )
+
+    def test_spread_going_up(self):
+        crossed = self.index.crossings("BTC-CLP", 12.0, 25.0)
+
+        self.assertEqual(crossed, [(20.0, 2), (20.0, 4)])
+
+    def test_spread_going_down(self):
+        crossed = self.index.crossings("btc-clp", 30.0, 10.0)
+
+        self.assertEqual([alert_id for _, alert_id in crossed], [1, 2, 4, 3])
+
+    def test_thresholds_on_bounds_are_included(self):
+        self.assertEqual(
+            self.index.crossings("BTC-CLP", 20.0, 21.0), [(20.0, 2), (20.0, 4)]
+        )
+        self.assertEqual(
+            self.index.crossings("BTC-CLP", 19.0, 20.0), [(20.0, 2), (20.0, 4)]
+        )
+
+    def test_unchanged_spread(self):
+        self.assertEqual(self.index.crossings("BTC-CLP", 20.0, 20.0), [])
+
+    def test_unknown_market(self):
+        self.assertEqual(self.index.crossings("LOL-CLP", 0.0, 100.0), [])
+
+    def test_add_and_discard(self):
+        self.index.add(6, "ETH-CLP", 16.0)
+        self.index.add(2, "BTC-CLP", 25.0)
+        self.index.discard(5)
+        self.index.discard(42)
+
+        self.assertEqual(self.index.crossings("ETH-CLP", 0.0, 100.0), [(16.0, 6)])
+        self.assertEqual(self.index.crossings("BTC-CLP", 19.0, 21.0), [(20.0, 4)])
+        self.assertEqual(len(self.index), 5)
+
+
+class ThresholdIndexSyncTestCase(TestCase):
+    def setUp(self):
+        threshold_index.clear()
+        self.addCleanup(threshold_index.clear)
+
+    def test_index_is_loaded_from_database(self):
+        alert = SpreadAlert.objects.create(market_id="BTC-CLP", alert_threshold=10.0)
+
+        self.assertEqual(get_crossed_alerts("BTC-CLP", 5.0, 15.0), [alert.pk])
+
+    def test_index_follows_creates_and_deletes(self):
+        get_crossed_alerts("BTC-CLP", 0.0, 0.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            alert = SpreadAlert.objects.create(
+                market_id="BTC-CLP", alert_threshold=10.0
+            )
+        self.assertEqual(get_crossed_alerts("BTC-CLP", 5.0, 15.0), [alert.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            alert.delete()
+        self.assertEqual(get_crossed_alerts("BTC-CLP", 5.0, 15.0), [])
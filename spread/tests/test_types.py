@@ -0,0 +1,141 @@
+import json
+from dataclasses import FrozenInstanceError
+
+import orjson
+from django.test import TestCase
+
+from spread.clients.buda.types import MoneyAmount
+from spread.clients.buda.types import Order
+from spread.clients.buda.types import OrderBook
+from spread.clients.buda.types import OrderBookSide
+
+
+class FrozenTypesTestCase(TestCase):
+    def test_instances_are_immutable(self):
+        amount = MoneyAmount(1.0, "CLP")
+
+        with self.assertRaises(FrozenInstanceError):
+            amount.amount = 2.0
+        with self.assertRaises((AttributeError, TypeError)):
+            amount.extra = True
+        self.assertFalse(hasattr(amount, "__dict__"))
+
+    def test_instances_are_hashable(self):
+        self.assertEqual(hash(Order(100.0, 1.5)), hash(Order(100.0, 1.5)))
+        self.assertEqual(repr(Order(100.0, 1.5)), "Order(price=100.0, amount=1.5)")
+
+    def test_money_amount_converts_its_amount(self):
+        amount = MoneyAmount("1.5", "CLP")
+
+        self.assertEqual(amount, MoneyAmount(1.5, "CLP"))
+        self.assertIs(type(amount.amount), float)
+        with self.assertRaises(ValueError):
+            MoneyAmount("not a number", "CLP")
+
+    def test_money_amount_from_response(self):
+        amount = MoneyAmount.from_response(["1500.5", "CLP"])
+
+        self.assertEqual(amount, MoneyAmount(1500.5, "CLP"))
+        self.assertIs(type(amount.amount), float)
+
+    def test_money_amount_from_malformed_response(self):
+        with self.assertRaises(ValueError):
+            MoneyAmount.from_response(["1500.5"])
+        with self.assertRaises(ValueError):
+            MoneyAmount.from_response(["not a number", "CLP"])
+
+
+class OrderBookSideTestCase(TestCase):
+    def setUp(self):
+        self.order_book = OrderBook.from_response(
+            {
+                "order_book": {
+                    "asks": [["100.0", "1.0"], ["101.0", "2.0"], ["105.5", "0.5"]],
+                    "bids": [["99.0", "1.5"], ["98.0", "2.5"], ["90.0", "4.0"]],
+                }
+            }
+        )
+
+    def test_levels_are_order_views(self):
+        asks = self.order_book.asks
+
+        self.assertEqual(len(asks), 3)
+        self.assertEqual(asks[0], Order(100.0, 1.0))
+        self.assertEqual(asks[-1], Order(105.5, 0.5))
+        self.assertEqual(list(self.order_book.bids)[1], Order(98.0, 2.5))
+        self.assertEqual(asks.prices.dtype.name, "float64")
+
+    def test_top_levels_share_the_buffer(self):
+        top = self.order_book.bids.top(2)
+
+        self.assertIsInstance(top, OrderBookSide)
+        self.assertEqual(list(top), [Order(99.0, 1.5), Order(98.0, 2.5)])
+        self.assertIs(top.prices.base, self.order_book.bids.prices)
+
+    def test_sides_are_contiguous(self):
+        for side in (self.order_book.asks, self.order_book.bids):
+            self.assertTrue(side.prices.flags.c_contiguous)
+            self.assertTrue(side.amounts.flags.c_contiguous)
+
+    def test_price_level_lookup(self):
+        self.assertEqual(self.order_book.asks.index_of(101.0), 1)
+        self.assertIsNone(self.order_book.asks.index_of(102.0))
+        self.assertEqual(self.order_book.bids.index_of(90.0), 2)
+        self.assertEqual(self.order_book.bids.amount_at(98.0), 2.5)
+        self.assertEqual(self.order_book.bids.amount_at(97.0), 0.0)
+
+    def test_price_level_lookup_at_every_position(self):
+        prices = [float(price) for price in range(100, 110)]
+        for descending in (False, True):
+            levels = sorted(prices, reverse=descending)
+            side = OrderBookSide.from_levels(
+                [[str(price), "1.0"] for price in levels], descending
+            )
+
+            for index, price in enumerate(levels):
+                self.assertEqual(side.index_of(price), index)
+            for price in (99.0, 104.5, 110.0):
+                self.assertIsNone(side.index_of(price))
+
+    def test_empty_side(self):
+        order_book = OrderBook.from_response({"order_book": {"asks": [], "bids": []}})
+
+        self.assertEqual(len(order_book.asks), 0)
+        self.assertEqual(list(order_book.bids), [])
+        self.assertIsNone(order_book.asks.index_of(100.0))
+
+
+class OrderBookFromBytesTestCase(TestCase):
+    def test_matches_json_parse(self):
+        data = {
+            "order_book": {
+                "asks": [["100.0", "1.0"], ["101.0", "2.0"], ["105.5", "0.5"]],
+                "bids": [["99.0", "1.5"], ["98.0", "2.5"], ["90.0", "4.0"]],
+                "market_id": "BTC-CLP",
+            }
+        }
+        expected = OrderBook.from_response(data)
+
+        self.assertEqual(OrderBook.from_bytes(json.dumps(data).encode()), expected)
+        self.assertEqual(OrderBook.from_bytes(orjson.dumps(data)), expected)
+        self.assertEqual(
+            OrderBook.from_bytes(json.dumps(data, indent=2).encode()), expected
+        )
+
+    def test_empty_side(self):
+        order_book = OrderBook.from_bytes(
+            b'{"order_book":{"asks":[ ],"bids":[["99.0","1.5"]]}}'
+        )
+
+        self.assertEqual(len(order_book.asks), 0)
+        self.assertEqual(list(order_book.bids), [Order(99.0, 1.5)])
+
+    def test_malformed_levels_fall_back_to_json(self):
+        with self.assertRaises(ValueError):
+            OrderBookSide.from_json(b'[["100.0","1.0"],["oops","2.0"]]', False)
+        with self.assertRaises(KeyError):
+            OrderBook.from_bytes(b'{"order_book":{"asks":[]}}')
+        self.assertEqual(
+            OrderBook.from_bytes(b'{"order_book":{"bids":[],"asks":[["1","2"]]}}'),
+            OrderBook.from_response({"order_book": {"bids": [], "asks": [["1", "2"]]}}),
+        )
@@ -1,3 +1,12 @@
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.http import Http404
+from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+
+from adrf.viewsets import ViewSet as AsyncViewSet
+
 from rest_framework import mixins
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
@@ -7,51 +16,169 @@ from rest_framework.decorators import action
 from .services.markets import get_market
 from .services.markets import ObjectDoesNotExist
 from .services.markets import get_markets
+from .services.markets import aget_market
+from .services.markets import aget_markets
+from .services.markets import peek_market
+from .services.markets import peek_markets
 from .services.spread import get_market_spread
 from .services.spread import get_all_spreads
+from .services.spread import aget_market_spread
+from .services.spread import aget_all_spreads
+from .services.spread import peek_all_spreads
+from .services.spread import peek_market_spread
+from .services.history import get_spread_history
+from .services.order_book import get_order_book_spread
+from .services.order_book import aget_order_book_spread
 from .services.spread_alert import get_alert_status
+from .services.spread_alert import aget_alert_status
+from .services.spread_alert import get_alert_statuses
+from .services.spread_alert import aget_alert_statuses
+from .services.spread_alert import create_alerts
+from .services.spread_alert import list_alerts
+from .services.spread_alert import with_evaluated_spread
+from .services.streaming import stream_alert_status
+from .services.streaming import stream_market_spread
+from .services.types import MarketSpread
+
+from .clients.buda.types import Market
 
 from .serializers import MarketSerializer
+from .serializers import MarketListQuerySerializer
+from .serializers import MarketSpreadListQuerySerializer
 from .serializers import MarketSpreadDataSerializer
+from .serializers import OrderBookSpreadSerializer
+from .serializers import OrderBookSpreadQuerySerializer
 from .serializers import SpreadAlertTrackingSerializer
+from .serializers import SpreadHistoryPointSerializer
+from .serializers import SpreadHistoryQuerySerializer
 from .serializers import SpreadAlertSerializer
+from .serializers import SpreadAlertBulkCreateSerializer
+from .serializers import SpreadAlertBulkResultSerializer
+from .serializers import SpreadAlertListQuerySerializer
+from .serializers import SpreadAlertStatusQuerySerializer
 
 from .models import SpreadAlert
 
+from .renderers import dumps
+
+from . import metrics as spread_metrics
+
+from .conditional import conditional
+from .conditional import markets_version
+from .conditional import spread_version
+from .conditional import spreads_version
+
+from .listing import KeysetPagination
+from .listing import OptionalKeysetPagination
+from .listing import listing
+from .listing import page
+
 from drf_spectacular.utils import extend_schema_view
 from drf_spectacular.utils import extend_schema
 from drf_spectacular.utils import OpenApiParameter
 
+MARKETS_MAX_AGE = settings.SPREAD_MARKET_REGISTRY_REFRESH_INTERVAL
+SPREADS_MAX_AGE = settings.SPREAD_TICKER_CACHE_TTL
+SPREAD_ALERT_FIELDS = tuple(SpreadAlertSerializer.Meta.fields)
+
+
+def _currency_matches(currency: str, wanted: str) -> bool:
+    return currency.lower() == wanted.lower()
+
+
+market_listing = listing(
+    MarketListQuerySerializer,
+    Market,
+    key=lambda market: market.id.lower(),
+    filters={
+        "quote_currency": lambda market, currency: _currency_matches(
+            market.quote_currency, currency
+        ),
+        "base_currency": lambda market, currency: _currency_matches(
+            market.base_currency, currency
+        ),
+        "disabled": lambda market, disabled: market.disabled == disabled,
+    },
+)
+
+spread_listing = listing(
+    MarketSpreadListQuerySerializer,
+    MarketSpread,
+    key=lambda spread: spread.market_id.lower(),
+    filters={
+        # Buda market ids are <base>-<quote>
+        "quote_currency": lambda spread, currency: _currency_matches(
+            spread.market_id.rpartition("-")[2], currency
+        ),
+    },
+)
+
+list_alerts_schema = extend_schema(
+    parameters=[SpreadAlertListQuerySerializer],
+    responses=SpreadAlertSerializer,
+)
+
+
+def _list_alerts_query(request) -> dict:
+    query = SpreadAlertListQuerySerializer(
+        data=request.query_params, context={"fields": SPREAD_ALERT_FIELDS}
+    )
+    query.is_valid(raise_exception=True)
+    return {
+        "fields": SPREAD_ALERT_FIELDS,
+        "limit": settings.SPREAD_LIST_PAGE_SIZE,
+        **query.validated_data,
+    }
+
+
+def _bulk_created(created, errors):
+    result = SpreadAlertBulkResultSerializer({"created": created, "errors": errors})
+    return Response(result.data, status=201 if created else 400)
+
+
+bulk_create_schema = extend_schema(
+    request=SpreadAlertBulkCreateSerializer,
+    responses={
+        201: SpreadAlertBulkResultSerializer,
+        400: SpreadAlertBulkResultSerializer,
+    },
+)
+
 
 class MarketViewSet(ViewSet):
     serializer_class = MarketSerializer
+    pagination_class = OptionalKeysetPagination
 
+    @extend_schema(parameters=[MarketListQuerySerializer])
+    @market_listing
+    @conditional(peek_markets, markets_version, MARKETS_MAX_AGE)
     def list(self, request, *args, **kwargs):
         markets = get_markets()
-        data = [self.serializer_class(instance=market).data for market in markets]
-        return Response(data)
+        return Response(markets)
 
     @extend_schema(
         parameters=[
             OpenApiParameter(name="id", type=str, location=OpenApiParameter.PATH)
         ],
     )
+    @conditional(lambda pk: peek_market(pk), markets_version, MARKETS_MAX_AGE)
     def retrieve(self, request, pk=None):
         try:
-            spread = get_market(pk)
+            market = get_market(pk)
         except ObjectDoesNotExist:
             return Response(status=404)
-        serializer = self.serializer_class(instance=spread)
-        return Response(serializer.data)
+        return Response(market)
 
     @extend_schema(
+        parameters=[MarketSpreadListQuerySerializer],
         responses=MarketSpreadDataSerializer(many=True),
     )
     @action(methods=["GET"], detail=False, url_path="spreads")
+    @spread_listing
+    @conditional(peek_all_spreads, spreads_version, SPREADS_MAX_AGE)
     def all_spreads(self, request):
         spreads = get_all_spreads()
-        serializer = MarketSpreadDataSerializer(instance=spreads, many=True)
-        return Response(serializer.data)
+        return Response(spreads)
 
     @extend_schema(
         responses={200: MarketSpreadDataSerializer},
@@ -60,10 +187,47 @@ class MarketViewSet(ViewSet):
         ],
     )
     @action(methods=["GET"], detail=True, url_path="spread")
+    @conditional(lambda pk: peek_market_spread(pk), spread_version, SPREADS_MAX_AGE)
     def spread(self, request, pk=None):
         spread = get_market_spread(pk)
-        serializer = MarketSpreadDataSerializer(instance=spread)
-        return Response(serializer.data)
+        return Response(spread)
+
+    @extend_schema(
+        responses={200: OrderBookSpreadSerializer},
+        parameters=[
+            OpenApiParameter(name="id", type=str, location=OpenApiParameter.PATH),
+            OrderBookSpreadQuerySerializer,
+        ],
+    )
+    @action(methods=["GET"], detail=True, url_path="order-book-spread")
+    def order_book_spread(self, request, pk=None):
+        query = OrderBookSpreadQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        try:
+            spread = get_order_book_spread(pk, **query.validated_data)
+        except ObjectDoesNotExist:
+            return Response(status=404)
+        return Response(spread)
+
+    @extend_schema(
+        responses=SpreadHistoryPointSerializer(many=True),
+        parameters=[
+            OpenApiParameter(name="id", type=str, location=OpenApiParameter.PATH),
+            SpreadHistoryQuerySerializer,
+        ],
+    )
+    @action(
+        methods=["GET"], detail=True, url_path="spread/history", pagination_class=None
+    )
+    def spread_history(self, request, pk=None):
+        query = SpreadHistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        try:
+            market = get_market(pk)
+        except ObjectDoesNotExist:
+            return Response(status=404)
+        points = get_spread_history(market.id, **query.validated_data)
+        return Response(points)
 
 
 @extend_schema_view(retrieve=extend_schema(responses=SpreadAlertTrackingSerializer))
@@ -72,12 +236,241 @@ class SpreadAlertViewSet(
 ):
     queryset = SpreadAlert.objects.all()
     serializer_class = SpreadAlertSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return with_evaluated_spread(super().get_queryset())
 
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
 
+    @list_alerts_schema
+    def list(self, request):
+        alerts, next_id = list_alerts(**_list_alerts_query(request))
+        return Response(page(alerts, next_id))
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         status = get_alert_status(instance)
-        serializer = SpreadAlertTrackingSerializer(instance=status)
-        return Response(serializer.data)
+        return Response(status)
+
+    @extend_schema(
+        parameters=[SpreadAlertStatusQuerySerializer],
+        responses=SpreadAlertTrackingSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="status", pagination_class=None)
+    def statuses(self, request):
+        query = SpreadAlertStatusQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        alerts = self.get_queryset().filter(pk__in=query.validated_data["ids"])
+        statuses = get_alert_statuses(alerts.order_by("pk"))
+        return Response(statuses)
+
+    @bulk_create_schema
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    def bulk(self, request):
+        serializer = SpreadAlertBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        alerts = serializer.validated_data["alerts"]
+        created = create_alerts(alerts["valid"])
+        return _bulk_created(created, alerts["errors"])
+
+
+class AsyncMarketViewSet(AsyncViewSet):
+    serializer_class = MarketSerializer
+    pagination_class = OptionalKeysetPagination
+
+    @extend_schema(parameters=[MarketListQuerySerializer])
+    @market_listing
+    @conditional(peek_markets, markets_version, MARKETS_MAX_AGE)
+    async def list(self, request, *args, **kwargs):
+        markets = await aget_markets()
+        return Response(markets)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="id", type=str, location=OpenApiParameter.PATH)
+        ],
+    )
+    @conditional(lambda pk: peek_market(pk), markets_version, MARKETS_MAX_AGE)
+    async def retrieve(self, request, pk=None):
+        try:
+            market = await aget_market(pk)
+        except ObjectDoesNotExist:
+            return Response(status=404)
+        return Response(market)
+
+    @extend_schema(
+        parameters=[MarketSpreadListQuerySerializer],
+        responses=MarketSpreadDataSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="spreads")
+    @spread_listing
+    @conditional(peek_all_spreads, spreads_version, SPREADS_MAX_AGE)
+    async def all_spreads(self, request):
+        spreads = await aget_all_spreads()
+        return Response(spreads)
+
+    @extend_schema(
+        responses={200: MarketSpreadDataSerializer},
+        parameters=[
+            OpenApiParameter(name="id", type=str, location=OpenApiParameter.PATH)
+        ],
+    )
+    @action(methods=["GET"], detail=True, url_path="spread")
+    @conditional(lambda pk: peek_market_spread(pk), spread_version, SPREADS_MAX_AGE)
+    async def spread(self, request, pk=None):
+        spread = await aget_market_spread(pk)
+        return Response(spread)
+
+    @extend_schema(
+        responses={200: OrderBookSpreadSerializer},
+        parameters=[
+            OpenApiParameter(name="id", type=str, location=OpenApiParameter.PATH),
+            OrderBookSpreadQuerySerializer,
+        ],
+    )
+    @action(methods=["GET"], detail=True, url_path="order-book-spread")
+    async def order_book_spread(self, request, pk=None):
+        query = OrderBookSpreadQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        try:
+            spread = await aget_order_book_spread(pk, **query.validated_data)
+        except ObjectDoesNotExist:
+            return Response(status=404)
+        return Response(spread)
+
+    @extend_schema(
+        responses=SpreadHistoryPointSerializer(many=True),
+        parameters=[
+            OpenApiParameter(name="id", type=str, location=OpenApiParameter.PATH),
+            SpreadHistoryQuerySerializer,
+        ],
+    )
+    @action(
+        methods=["GET"], detail=True, url_path="spread/history", pagination_class=None
+    )
+    async def spread_history(self, request, pk=None):
+        query = SpreadHistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        try:
+            market = await aget_market(pk)
+        except ObjectDoesNotExist:
+            return Response(status=404)
+        points = await sync_to_async(get_spread_history)(
+            market.id, **query.validated_data
+        )
+        return Response(points)
+
+
+@extend_schema_view(
+    create=extend_schema(
+        request=SpreadAlertSerializer, responses=SpreadAlertSerializer
+    ),
+    retrieve=extend_schema(
+        responses=SpreadAlertTrackingSerializer,
+        parameters=[
+            OpenApiParameter(
+                name="id",
+                type=int,
+                location=OpenApiParameter.PATH,
+                description="A unique integer value identifying this spread alert.",
+            )
+        ],
+    ),
+)
+class AsyncSpreadAlertViewSet(AsyncViewSet):
+    serializer_class = SpreadAlertSerializer
+    pagination_class = KeysetPagination
+
+    async def create(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await sync_to_async(serializer.save)()
+        return Response(serializer.data, status=201)
+
+    @list_alerts_schema
+    async def list(self, request):
+        query = _list_alerts_query(request)
+        alerts, next_id = await sync_to_async(list_alerts)(**query)
+        return Response(page(alerts, next_id))
+
+    async def retrieve(self, request, pk=None):
+        try:
+            alerts = with_evaluated_spread(SpreadAlert.objects.all())
+            instance = await alerts.aget(pk=pk)
+        except (SpreadAlert.DoesNotExist, ValueError):
+            return Response(status=404)
+        status = await aget_alert_status(instance)
+        return Response(status)
+
+    @extend_schema(
+        parameters=[SpreadAlertStatusQuerySerializer],
+        responses=SpreadAlertTrackingSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, url_path="status", pagination_class=None)
+    async def statuses(self, request):
+        query = SpreadAlertStatusQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        alerts = with_evaluated_spread(SpreadAlert.objects.all())
+        alerts = alerts.filter(pk__in=query.validated_data["ids"]).order_by("pk")
+        alerts = [alert async for alert in alerts]
+        statuses = await aget_alert_statuses(alerts)
+        return Response(statuses)
+
+    @bulk_create_schema
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    async def bulk(self, request):
+        serializer = SpreadAlertBulkCreateSerializer(data=request.data)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        alerts = serializer.validated_data["alerts"]
+        created = await sync_to_async(create_alerts)(alerts["valid"])
+        return _bulk_created(created, alerts["errors"])
+
+
+def _server_sent_events(updates, event):
+    async def events():
+        async for update in updates:
+            if update is None:
+                yield ": keep-alive\n\n"
+                continue
+            data = dumps(update).decode()
+            yield f"event: {event}\ndata: {data}\n\n"
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def market_spread_stream(request, pk):
+    """
+    Server-sent events with the spread of a market, pushed when it changes.
+    Only routed with SPREAD_ASYNC_VIEWS, served through ASGI.
+    """
+    try:
+        market = await aget_market(pk)
+    except ObjectDoesNotExist:
+        raise Http404
+    return _server_sent_events(stream_market_spread(market.id), "spread")
+
+
+async def spread_alert_stream(request, pk):
+    """
+    Server-sent events with the tracking data of an alert, pushed when its
+    status changes. Only routed with SPREAD_ASYNC_VIEWS, served through ASGI.
+    """
+    try:
+        spread_alert = await SpreadAlert.objects.aget(pk=pk)
+    except SpreadAlert.DoesNotExist:
+        raise Http404
+    return _server_sent_events(stream_alert_status(spread_alert), "status")
+
+
+def metrics(request):
+    """Latency histograms and upstream counters in Prometheus text format."""
+    if not settings.SPREAD_METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(
+        spread_metrics.render(), content_type=spread_metrics.CONTENT_TYPE
+    )